@@ -0,0 +1,129 @@
+# --- Admission control for chat messages ---
+#
+# Two checks guard the knowledge-base path (never the safeguarding flag path,
+# so reports are always stored):
+#
+#   SessionRateLimiter  a token bucket per session_id, checked in
+#                       handle_message, so one runaway tab or crawler can't
+#                       send more than its share of questions
+#   AdmissionGate       a per-worker cap on OpenAI calls (question embedding,
+#                       answer synthesis) in flight at once, with a short
+#                       bounded queue behind it; when the queue is full (or a
+#                       slot doesn't free up in time) the message is turned
+#                       away immediately. Cached and BM25-decided answers
+#                       never wait for a slot
+#
+# Shedding early keeps latency flat for everyone already admitted instead of
+# piling up thousands of greenlets waiting on the API. Queue depth and slots
+# in use are exported as gauges on /metrics.
+import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import metrics
+
+RATE_PER_MIN    = float(os.getenv("CHAT_RATE_PER_MIN", "20"))
+RATE_BURST      = float(os.getenv("CHAT_RATE_BURST", "5"))
+MAX_SESSIONS    = int(os.getenv("CHAT_RATE_MAX_SESSIONS", "10000"))
+MAX_CONCURRENT  = int(os.getenv("ADMISSION_MAX_CONCURRENT", "32"))
+MAX_QUEUE       = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+QUEUE_TIMEOUT   = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+
+
+class Overloaded(Exception):
+    """No upstream slot is available; reason is 'queue_full' or 'timeout'."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class SessionRateLimiter:
+    """Token bucket per session: burst messages at once, refilled at rate_per_min."""
+
+    def __init__(self, rate_per_min=RATE_PER_MIN, burst=RATE_BURST, max_sessions=MAX_SESSIONS):
+        self.rate = rate_per_min / 60.0
+        self.burst = burst
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # session_id -> [tokens, last refill], least recently seen first
+
+    def allow(self, session_id):
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.pop(session_id, None)
+            if bucket is None:
+                bucket = [self.burst, now]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            # Re-inserting moves the session to the end; forget the idlest ones
+            self._buckets[session_id] = bucket
+            while len(self._buckets) > self.max_sessions:
+                self._buckets.popitem(last=False)
+            if bucket[0] < 1.0:
+                return False
+            bucket[0] -= 1.0
+            return True
+
+
+class AdmissionGate:
+    """At most limit holders at once; up to max_queue more wait up to timeout seconds."""
+
+    def __init__(self, limit=MAX_CONCURRENT, max_queue=MAX_QUEUE, timeout=QUEUE_TIMEOUT):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+
+    def _publish(self):
+        metrics.gauge("admission_in_flight", self.active)
+        metrics.gauge("admission_queue_depth", self.waiting)
+
+    def acquire(self):
+        """Take a slot or raise Overloaded."""
+        start = time.perf_counter()
+        with self._cond:
+            try:
+                if self.active >= self.limit:
+                    if self.waiting >= self.max_queue:
+                        raise Overloaded("queue_full")
+                    self.waiting += 1
+                    self._publish()
+                    deadline = time.monotonic() + self.timeout
+                    try:
+                        while self.active >= self.limit:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                raise Overloaded("timeout")
+                            self._cond.wait(remaining)
+                    finally:
+                        self.waiting -= 1
+                self.active += 1
+            finally:
+                # Every exit, shed or admitted, leaves the gauges current
+                self._publish()
+        metrics.observe("admission_wait_seconds", time.perf_counter() - start)
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._publish()
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        return {"active": self.active, "waiting": self.waiting, "limit": self.limit, "max_queue": self.max_queue}
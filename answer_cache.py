@@ -0,0 +1,83 @@
+# --- Semantic answer cache ---
+#
+# Remembers (query vector, answer) pairs. A new question whose unit vector is
+# within max_distance (cosine distance) of a cached one gets the cached answer
+# back without re-running retrieval or synthesis. Vectors live in a
+# preallocated matrix so a lookup is one matrix-vector product over at most
+# max_entries rows; eviction is least-recently-used. Entries are tagged with
+# the knowledge-base generation (which only grows) and dropped as soon as a
+# newer one is seen, so a reloaded index never serves answers from the old
+# one. Requests still running on an older snapshot during a reload neither
+# read nor write the cache, instead of flushing it back and forth.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    def __init__(self, dim, max_entries=2048, max_distance=0.05):
+        self.dim = dim
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._used = np.zeros(max_entries, dtype=bool)
+        self._answers = [None] * max_entries
+        self._lru = OrderedDict()  # slot -> None, oldest first
+        self._version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        """Adopt a newer version, dropping every entry; False for an older one."""
+        if self._version is None or version > self._version:
+            if self._version is not None:
+                self.invalidations += 1
+            self._used[:] = False
+            self._answers = [None] * self.max_entries
+            self._lru.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, vector, version):
+        """Return the answer cached for the nearest vector within range, or None."""
+        with self._lock:
+            if not self._check_version(version) or not self._lru:
+                self.misses += 1
+                return None
+            scores = self._vectors @ vector
+            scores[~self._used] = -np.inf
+            slot = int(np.argmax(scores))
+            if 1.0 - scores[slot] <= self.max_distance:
+                self._lru.move_to_end(slot)
+                self.hits += 1
+                return self._answers[slot]
+            self.misses += 1
+            return None
+
+    def put(self, vector, answer, version):
+        with self._lock:
+            if not self._check_version(version):
+                return
+            if len(self._lru) < self.max_entries:
+                slot = int(np.argmin(self._used))
+            else:
+                slot, _ = self._lru.popitem(last=False)
+            self._vectors[slot] = vector
+            self._used[slot] = True
+            self._answers[slot] = answer
+            self._lru[slot] = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
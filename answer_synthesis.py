@@ -0,0 +1,62 @@
+# --- Answer synthesis over retrieved chunks ---
+#
+# Turns the top retrieved knowledge-base chunks into a short, parent-friendly
+# answer with a streaming chat completion. Each text delta is handed to
+# on_delta as it arrives, so the first words reach the browser while the rest
+# is still being generated.
+import os
+
+from openai_client import get_client, call_with_retry, record_usage
+from context_builder import build_context
+
+CHAT_MODEL       = os.getenv("CHAT_MODEL", "gpt-4o-mini")
+MAX_TOKENS       = int(os.getenv("SYNTHESIS_MAX_TOKENS", "300"))
+TEMPERATURE      = float(os.getenv("SYNTHESIS_TEMPERATURE", "0.3"))
+
+SYSTEM_PROMPT = (
+    "You are the admissions assistant for More House School, an independent Catholic "
+    "girls' school in London. Answer the parent's question in a warm, professional tone "
+    "using only the context below. Keep it to a few sentences. If the context does not "
+    "contain the answer, say so and suggest contacting the admissions team."
+)
+
+
+def build_messages(question, chunks):
+    # Instructions, then context, then the question: the system message is the
+    # cacheable prefix and is identical whenever the same chunks are chosen
+    return [
+        {"role": "system", "content": f"{SYSTEM_PROMPT}\n\nContext:\n{build_context(chunks)}"},
+        {"role": "user", "content": question},
+    ]
+
+
+def stream_answer(question, chunks, model=CHAT_MODEL):
+    """Yield answer text deltas from a streaming chat completion."""
+    stream = call_with_retry(
+        get_client().chat.completions.create,
+        model=model,
+        messages=build_messages(question, chunks),
+        max_tokens=MAX_TOKENS,
+        temperature=TEMPERATURE,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    for event in stream:
+        # The final event carries token usage and no choices
+        if getattr(event, "usage", None):
+            record_usage("completions", event.usage)
+        if not event.choices:
+            continue
+        delta = event.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+def synthesize_answer(question, chunks, on_delta=None, model=CHAT_MODEL):
+    """Return the full answer, calling on_delta(text) for every streamed piece."""
+    parts = []
+    for delta in stream_answer(question, chunks, model=model):
+        parts.append(delta)
+        if on_delta is not None:
+            on_delta(delta)
+    return "".join(parts).strip()
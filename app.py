@@ -1,19 +1,38 @@
 # --- Setup: Load Required Libraries ---
 import eventlet
-eventlet.monkey_patch()  # Ensure this is first
+# Ensure this is first. os stays unpatched so a preloading gunicorn master
+# (GUNICORN_PRELOAD=1) can still write to its signal pipe; the eventlet
+# workers patch everything again themselves after fork.
+eventlet.monkey_patch(os=False)
 
 import os
-import sqlite3
-import pickle
+import hmac
+import html
+import time
+import uuid
 import numpy as np
 from datetime import datetime
 import pytz
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
-from fuzzywuzzy import fuzz
-from openai import OpenAI
+
+from kb_index import load_index, MANIFEST_FILE, BASE_DIR
+from kb_reload import KBHolder
+from embed_cache import EmbeddingCache
+from openai_client import create_embeddings
+from embed_batcher import EmbeddingDispatcher
+from answer_cache import SemanticAnswerCache
+from answer_synthesis import synthesize_answer
+from lexical_index import fuse_hybrid
+from context_builder import select_chunks
+from static_matcher import StaticMatcher
+from static_qas import PAGE_LINKS, URL_LABELS, STATIC_QAS
+from keyword_engine import KeywordEngine, longest_non_overlapping
+from flag_store import FlagStore, STATUSES as FLAG_STATUSES
+from admission import SessionRateLimiter, AdmissionGate, Overloaded
+import metrics
 
 # --- Initialize Flask App ---
 app = Flask(__name__)
@@ -23,1016 +42,311 @@ socketio = SocketIO(app, async_mode='eventlet')
 # --- Configuration ---
 app.config['SECRET_KEY'] = os.urandom(24).hex()
 app.config['STATIC_FOLDER'] = 'static'
+DATA_DIR = os.getenv('DATA_DIR', '/data')
+EMB_MODEL = 'text-embedding-3-small'
+RAG_TOP_K = int(os.getenv('RAG_TOP_K', '5'))
+RAG_MIN_SIMILARITY = 0.6  # Lowered from 0.7
+# Stream a generated answer from the top chunks instead of returning raw chunk text
+ANSWER_SYNTHESIS = os.getenv('ANSWER_SYNTHESIS', '1') == '1'
+SYNTHESIS_MAX_CHUNKS = int(os.getenv('SYNTHESIS_MAX_CHUNKS', '3'))
+# BM25 hits this strong count as relevant; decisive short queries skip embedding
+LEXICAL_MIN_SCORE = float(os.getenv('LEXICAL_MIN_SCORE', '4.0'))
+LEXICAL_MARGIN = float(os.getenv('LEXICAL_MARGIN', '1.5'))
+LEXICAL_FAST_MAX_TERMS = int(os.getenv('LEXICAL_FAST_MAX_TERMS', '4'))
+# Seconds between checks for a rebuilt index (0 disables the watcher)
+KB_RELOAD_INTERVAL = float(os.getenv('KB_RELOAD_INTERVAL', '30'))
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
 
 # --- Load AI Embeddings and Metadata ---
+# Rows are L2-normalized on disk and memory-mapped, so workers share pages.
+# kb_holder.current is swapped atomically when the index is rebuilt on disk.
 try:
-    with open('embeddings.pkl', 'rb') as f:
-        embeddings = np.stack(pickle.load(f), axis=0)
-    with open('metadata.pkl', 'rb') as f:
-        metadata = pickle.load(f)
-    app.logger.info("✅ Successfully loaded AI data (embeddings & metadata)")
+    kb_holder = KBHolder(BASE_DIR, EMB_MODEL, poll_interval=KB_RELOAD_INTERVAL)
+    kb_stats = kb_holder.stats()
+    KB_DIM = kb_stats['dim']
+    app.logger.info(f"✅ Successfully loaded AI data ({kb_stats['chunks']} chunks, dim {KB_DIM}, {kb_stats['backend']} search)")
 except Exception as e:
     app.logger.error(f"❌ Error loading embeddings or metadata: {e}")
     raise
 
-# --- Initialize SQLite Database for Human Review Flags ---
+# --- Query Embedding Cache (in-process LRU + on-disk SQLite) ---
+query_cache = EmbeddingCache(
+    os.path.join(DATA_DIR, 'embed_cache.db'),
+    EMB_MODEL,
+    memory_size=int(os.getenv('EMBED_CACHE_MEMORY_SIZE', '2048')),
+    max_rows=int(os.getenv('EMBED_CACHE_MAX_ROWS', '50000')),
+    ttl_seconds=int(os.getenv('EMBED_CACHE_TTL_DAYS', '30')) * 24 * 3600,
+)
+
+# --- Micro-batched Question Embeddings ---
+# Concurrent questions share one embeddings request and one similarity matmul
+def search_batch(question_matrix):
+    snapshot = kb_holder.current
+    with metrics.timer('chat_stage_seconds', stage='similarity'):
+        ids, scores = snapshot.retriever.search_batch(question_matrix, RAG_TOP_K)
+    return [(question_matrix[i], ids[i], scores[i], snapshot) for i in range(len(question_matrix))]
+
+embed_dispatcher = EmbeddingDispatcher(
+    create_embeddings,
+    EMB_MODEL,
+    window_ms=float(os.getenv('EMBED_BATCH_WINDOW_MS', '5')),
+    max_batch=int(os.getenv('EMBED_BATCH_MAX', '64')),
+    postprocess=search_batch,
+)
+
+# --- Semantic Answer Cache (near-identical questions reuse the chosen answer) ---
+answer_cache = SemanticAnswerCache(
+    KB_DIM,
+    max_entries=int(os.getenv('ANSWER_CACHE_SIZE', '2048')),
+    max_distance=float(os.getenv('ANSWER_CACHE_MAX_DISTANCE', '0.05')),
+)
+
+# --- Admission Control (per-session rate limit, cap on messages calling OpenAI) ---
+session_limiter = SessionRateLimiter()
+admission_gate = AdmissionGate()
+BUSY_MESSAGE = "We're busy right now, please try again in a moment."
+RATE_LIMITED_MESSAGE = "You're sending messages very quickly, please wait a moment and try again."
+
+# --- Flag Store for Human Review (one file, WAL, batched background writes) ---
+FLAG_DB_PATH = os.path.join(DATA_DIR, 'flag.db')
+flag_store = FlagStore(FLAG_DB_PATH)
 try:
-    conn = sqlite3.connect('flag.db')  # Changed from /tmp/db to project directory
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS flagged_questions (
-            session_id TEXT,
-            question TEXT,
-            timestamp TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
-    app.logger.info("✅ Database 'flag.db' initialized successfully")
+    flag_store.init_schema()
+    app.logger.info(f"✅ Database '{FLAG_DB_PATH}' initialized successfully")
 except Exception as e:
     app.logger.error(f"❌ Error initializing database: {e}")
     raise
 
-# URL lookup
-PAGE_LINKS = {
-    "home": "https://www.morehouse.org.uk/",
-    "homepage": "https://www.morehouse.org.uk/",
-    "main page": "https://www.morehouse.org.uk/",
-    "open events": "https://www.morehouse.org.uk/admissions/our-open-events/",
-    "open morning": "https://www.morehouse.org.uk/admissions/our-open-events/",
-    "open day": "https://www.morehouse.org.uk/admissions/our-open-events/",
-    "open evening": "https://www.morehouse.org.uk/admissions/our-open-events/",
-    "admissions": "https://www.morehouse.org.uk/admissions/joining-more-house/",
-    "enquiry": "https://www.morehouse.org.uk/admissions/enquiry/",
-    "enquire": "https://www.morehouse.org.uk/admissions/enquiry/",
-    "inquire": "https://www.morehouse.org.uk/admissions/enquiry/",
-    "prospectus": "https://www.morehouse.org.uk/admissions/enquiry/",
-    "fees": "https://www.morehouse.org.uk/admissions/fees/",
-    "cost": "https://www.morehouse.org.uk/admissions/fees/",
-    "costs": "https://www.morehouse.org.uk/admissions/fees/",
-    "price": "https://www.morehouse.org.uk/admissions/fees/",
-    "tuition": "https://www.morehouse.org.uk/admissions/fees/",
-    "charges": "https://www.morehouse.org.uk/admissions/fees/",
-    "scholarships": "https://www.morehouse.org.uk/admissions/scholarships-and-bursaries/",
-    "scholarship": "https://www.morehouse.org.uk/admissions/scholarships-and-bursaries/",
-    "scholarships and bursaries": "https://www.morehouse.org.uk/admissions/scholarships-and-bursaries/",
-    "bursaries": "https://www.morehouse.org.uk/admissions/scholarships-and-bursaries/",
-    "bursary": "https://www.morehouse.org.uk/admissions/scholarships-and-bursaries/",
-    "bursary scholarships": "https://www.morehouse.org.uk/admissions/scholarships-and-bursaries/",
-    "registration deadline": "https://www.morehouse.org.uk/admissions/joining-more-house/",
-    "registration": "https://www.morehouse.org.uk/admissions/joining-more-house/",
-    "register": "https://www.morehouse.org.uk/admissions/joining-more-house/",
-    "registering": "https://www.morehouse.org.uk/admissions/joining-more-house/",
-    "deadline": "https://www.morehouse.org.uk/admissions/joining-more-house/",
-    "term dates": "https://www.morehouse.org.uk/news-and-calendar/term-dates/",
-    "terms": "https://www.morehouse.org.uk/news-and-calendar/term-dates/",
-    "calendar": "https://www.morehouse.org.uk/news-and-calendar/calendar/",
-    "school calendar": "https://www.morehouse.org.uk/news-and-calendar/calendar/",
-    "half term": "https://www.morehouse.org.uk/news-and-calendar/term-dates/",
-    "holiday dates": "https://www.morehouse.org.uk/news-and-calendar/term-dates/",
-    "uniform": "https://www.morehouse.org.uk/information/school-uniform/",
-    "dress code": "https://www.morehouse.org.uk/information/school-uniform/",
-    "contact": "https://www.morehouse.org.uk/contact/",
-    "contact us": "https://www.morehouse.org.uk/contact/",
-    "email": "https://www.morehouse.org.uk/contact/",
-    "phone": "https://www.morehouse.org.uk/contact/",
-    "telephone": "https://www.morehouse.org.uk/contact/",
-    "our ethos": "https://www.morehouse.org.uk/our-school/our-ethos/",
-    "ethos": "https://www.morehouse.org.uk/our-school/our-ethos/",
-    "history": "https://www.morehouse.org.uk/our-school/history/",
-    "our story": "https://www.morehouse.org.uk/our-school/more-house-stories/",
-    "staff": "https://www.morehouse.org.uk/information/our-staff-and-governors/",
-    "governors": "https://www.morehouse.org.uk/information/our-staff-and-governors/",
-    "staff and governors": "https://www.morehouse.org.uk/information/our-staff-and-governors/",
-    "head of school": "https://www.morehouse.org.uk/our-school/meet-the-head/",
-    "meet the head": "https://www.morehouse.org.uk/our-school/meet-the-head/",
-    "lettings": "https://www.morehouse.org.uk/information/lettings/",
-    "venues": "https://www.morehouse.org.uk/information/lettings/",
-    "school lunches": "https://www.morehouse.org.uk/information/school-lunches/",
-    "lunch": "https://www.morehouse.org.uk/information/school-lunches/",
-    "lunches": "https://www.morehouse.org.uk/information/school-lunches/",
-    "meals": "https://www.morehouse.org.uk/information/school-lunches/",
-    "pastoral care": "https://www.morehouse.org.uk/our-school/pastoral-care/",
-    "safeguarding": "https://www.morehouse.org.uk/information/safeguarding/",
-    "safety": "https://www.morehouse.org.uk/information/safeguarding/",
-    "inspection reports": "https://www.morehouse.org.uk/information/inspection-reports/",
-    "inspection": "https://www.morehouse.org.uk/information/inspection-reports/",
-    "reports": "https://www.morehouse.org.uk/information/inspection-reports/",
-    "school policies": "https://www.morehouse.org.uk/information/school-policies/",
-    "policy": "https://www.morehouse.org.uk/information/school-policies/",
-    "policies": "https://www.morehouse.org.uk/information/school-policies/",
-    "pre-senior": "https://www.morehouse.org.uk/pre-senior/",
-    "academic life": "https://www.morehouse.org.uk/learning/academic-life/",
-    "academics": "https://www.morehouse.org.uk/learning/academic-life/",
-    "subjects": "https://www.morehouse.org.uk/learning/subjects/",
-    "sixth form": "https://www.morehouse.org.uk/learning/sixth-form/",
-    "creative suite": "https://www.morehouse.org.uk/learning/our-creative-suite/",
-    "creative": "https://www.morehouse.org.uk/learning/our-creative-suite/",
-    "learning support": "https://www.morehouse.org.uk/learning/learning-support/",
-    "support": "https://www.morehouse.org.uk/learning/learning-support/",
-    "results and destinations": "https://www.morehouse.org.uk/learning/results-and-destinations/",
-    "destinations": "https://www.morehouse.org.uk/learning/results-and-destinations/",
-    "results": "https://www.morehouse.org.uk/learning/results-and-destinations/",
-    "be more": "https://www.morehouse.org.uk/learning/be-more/",
-    "houses": "https://www.morehouse.org.uk/our-school/houses/",
-    "co-curricular": "https://www.morehouse.org.uk/beyond-the-classroom/co-curricular-programme/",
-    "sport": "https://www.morehouse.org.uk/beyond-the-classroom/sport/",
-    "faith life": "https://www.morehouse.org.uk/beyond-the-classroom/faith-life/",
-}
+# Fuzzy matcher over STATIC_QAS keys, compiled once at startup
+STATIC_MATCH_THRESHOLD = 70  # Lowered from 80
+static_matcher = StaticMatcher(STATIC_QAS, threshold=STATIC_MATCH_THRESHOLD)
+
+# Semantic matcher over precomputed STATIC_QAS key/paraphrase embeddings
+# (python build_static_index.py); reuses the query vector from the RAG path
+STATIC_INDEX_DIR = os.path.join(BASE_DIR, 'static_index')
+STATIC_SEMANTIC_THRESHOLD = float(os.getenv('STATIC_SEMANTIC_THRESHOLD', '0.7'))
+static_embeddings, static_keys = None, []
+if os.path.exists(os.path.join(STATIC_INDEX_DIR, MANIFEST_FILE)):
+    try:
+        static_index = load_index(STATIC_INDEX_DIR)
+        if static_index.model != EMB_MODEL or static_index.dim != KB_DIM:
+            raise ValueError(f"built with {static_index.model} ({static_index.dim} dims)")
+        # Drop rows for keys removed from STATIC_QAS since the last build
+        keep = [i for i, m in enumerate(static_index.metadata) if m['key'] in STATIC_QAS]
+        static_embeddings = np.ascontiguousarray(static_index.embeddings[keep])
+        static_keys = [static_index.metadata[i]['key'] for i in keep]
+        app.logger.info(f"✅ Loaded {len(static_keys)} static answer embeddings")
+    except Exception as e:
+        app.logger.error(f"❌ Static answer index unusable, semantic static matching disabled: {e}")
+else:
+    app.logger.warning("Static answer index not built; semantic static matching disabled")
 
-# Human labels for fallback links
-URL_LABELS = {
-    PAGE_LINKS["enquiry"]: "More about Enquiries",
-    PAGE_LINKS["fees"]: "More about Fees",
-    PAGE_LINKS["registration deadline"]: "More about Deadlines",
-    PAGE_LINKS["term dates"]: "More about Term Dates",
-    PAGE_LINKS["open events"]: "More about Open Events",
-    PAGE_LINKS["uniform"]: "More about Uniform",
-    PAGE_LINKS["school lunches"]: "More about Lunch Menu",
-    PAGE_LINKS["academic life"]: "More about Academic Life",
-    PAGE_LINKS["subjects"]: "More about Subjects",
-    PAGE_LINKS["pre-senior"]: "More about Pre-Senior",
-    PAGE_LINKS["houses"]: "More about Houses",
-    PAGE_LINKS["co-curricular"]: "More about Co-curricular",
-    PAGE_LINKS["sport"]: "More about Sport",
-    PAGE_LINKS["faith life"]: "More about Faith Life",
-    PAGE_LINKS["results and destinations"]: "More about Results",
-    PAGE_LINKS["inspection reports"]: "More about Inspection Reports",
-    PAGE_LINKS["school policies"]: "More about Policies",
-    PAGE_LINKS["scholarships"]: "More about Scholarships",
-    PAGE_LINKS["contact"]: "More about Contact",
-    PAGE_LINKS["sixth form"]: "More about Sixth Form",
-    PAGE_LINKS["pastoral care"]: "More about Pastoral Care",
-    PAGE_LINKS["safeguarding"]: "More about Safeguarding",
-    PAGE_LINKS["head of school"]: "Meet the Head",
-    PAGE_LINKS["lettings"]: "More about Facilities",
-    PAGE_LINKS["learning support"]: "More about Learning Support",
-    PAGE_LINKS["ethos"]: "More about Our Ethos",
-    PAGE_LINKS["admissions"]: "More about Admissions",
-    PAGE_LINKS["prospectus"]: "More about Prospectus",
-    PAGE_LINKS["staff"]: "Meet Our Staff",
-    "https://www.morehouse.org.uk/information/school-policies/": "More about Policies",
-}
+def format_static_answer(key):
+    answer, link, label = STATIC_QAS[key]
+    if link:
+        answer += f' <a href="{link}" target="_blank">{label}</a>'
+    return answer
 
-# Static QAs
-STATIC_QAS = {
-    "enquiry": (
-        "Please complete our enquiry form and we will tailor a prospectus exactly for you and your child.",
-        PAGE_LINKS["enquiry"],
-        "More about Enquiries"
-    ),
-    "ask about enquiry": (
-        "Please complete our enquiry form and we will tailor a prospectus exactly for you and your child.",
-        PAGE_LINKS["enquiry"],
-        "More about Enquiries"
-    ),
-    "prospectus": (
-        "Please complete our enquiry form and we will tailor a prospectus exactly for you and your child.",
-        PAGE_LINKS["prospectus"],
-        "More about Prospectus"
-    ),
-    "what are the school fees": (
-        "Our current tuition fees for 2024–25 are £10,530 per term, inclusive of VAT.",
-        PAGE_LINKS["fees"],
-        "More about Fees"
-    ),
-    "fees": (
-        "Our current tuition fees for 2024–25 are £10,530 per term, inclusive of VAT.",
-        PAGE_LINKS["fees"],
-        "More about Fees"
-    ),
-    "price": (
-        "Are you referring to school fees? If so, our current tuition fees for 2024–25 are £10,530 per term, inclusive of VAT.",
-        PAGE_LINKS["fees"],
-        "More about Fees"
-    ),
-    "charges": (
-        "Are you referring to school fees? If so, our current tuition fees for 2024–25 are £10,530 per term, inclusive of VAT.",
-        PAGE_LINKS["fees"],
-        "More about Fees"
-    ),
-    "cost": (
-        "Are you referring to school fees? If so, our current tuition fees for 2024–25 are £10,530 per term, inclusive of VAT.",
-        PAGE_LINKS["fees"],
-        "More about Fees"
-    ),
-    "costs": (
-        "Are you referring to school fees? If so, our current tuition fees for 2024–25 are £10,530 per term, inclusive of VAT.",
-        PAGE_LINKS["fees"],
-        "More about Fees"
-    ),
-    "what is the school uniform": (
-        "The uniform comprises a navy More House blazer, navy v-neck jumper, gingham blouse, navy skirt or trousers and sensible black leather shoes. For full details, see below.",
-        PAGE_LINKS["uniform"],
-        "More about Uniform"
-    ),
-    "uniform": (
-        "The uniform comprises a navy More House blazer, navy v-neck jumper, gingham blouse, navy skirt or trousers and sensible black leather shoes. For full details, see below.",
-        PAGE_LINKS["uniform"],
-        "More about Uniform"
-    ),
-    "how do you cater for dietary requirements": (
-        "Our Connect Catering team provides vegetarian options, a salad bar, daily desserts, and a tuck shop. Download the Summer Term menu via the link below.",
-        PAGE_LINKS["school lunches"],
-        "View School Menus"
-    ),
-    "dietary requirements": (
-        "Our Connect Catering team provides vegetarian options, a salad bar, daily desserts, and a tuck shop. Download the Summer Term menu via the link below.",
-        PAGE_LINKS["school lunches"],
-        "View School Menus"
-    ),
-    "lunch menu": (
-        "You can download our current school lunch menus (including dietary options) here:",
-        PAGE_LINKS["school lunches"],
-        "View School Menus"
-    ),
-    "where can i find the school lunch menu": (
-        "You can download our current school lunch menus (including dietary options) here:",
-        PAGE_LINKS["school lunches"],
-        "View School Menus"
-    ),
-    "lunch": (
-        "You can download our current school lunch menus (including dietary options) here:",
-        PAGE_LINKS["school lunches"],
-        "View School Menus"
-    ),
-    "what are the term dates": (
-        "Our published term dates, half-terms and holiday dates can be found here:",
-        PAGE_LINKS["term dates"],
-        "View Term Dates"
-    ),
-    "term dates": (
-        "Our published term dates, half-terms and holiday dates can be found here:",
-        PAGE_LINKS["term dates"],
-        "View Term Dates"
-    ),
-    "half term": (
-        "Our published term dates, half-terms and holiday dates can be found here:",
-        PAGE_LINKS["term dates"],
-        "View Term Dates"
-    ),
-    "holiday dates": (
-        "Our published term dates, half-terms and holiday dates can be found here:",
-        PAGE_LINKS["term dates"],
-        "View Term Dates"
-    ),
-    "what are the registration deadlines": (
-        "11+ Entrance: noon, 7 November 2025; Sixth Form: 14 November 2025; Pre-Senior: year-round applications.",
-        PAGE_LINKS["registration deadline"],
-        "More about Registration"
-    ),
-    "registration deadlines": (
-        "11+ Entrance: noon, 7 November 2025; Sixth Form: 14 November 2025; Pre-Senior: year-round applications.",
-        PAGE_LINKS["registration deadline"],
-        "More about Registration"
-    ),
-    "register": (
-        "11+ Entrance: noon, 7 November 2025; Sixth Form: 14 November 2025; Pre-Senior: year-round applications.",
-        PAGE_LINKS["registration deadline"],
-        "More about Registration"
-    ),
-    "what are the open events": (
-        "Summer Term 2025: Open Morning on 18 June; Autumn Term 2025: Open Evening on 17 September, Open Mornings on 10 October & 5 November; Spring Term 2026: Open Morning on 23 January & Open Evening on 5 March; Summer Term 2026: Open Morning on 13 May & Open Evening on 17 June.",
-        PAGE_LINKS["open events"],
-        "View Open Events"
-    ),
-    "open events": (
-        "Summer Term 2025: Open Morning on 18 June; Autumn Term 2025: Open Evening on 17 September, Open Mornings on 10 October & 5 November; Spring Term 2026: Open Morning on 23 January & Open Evening on 5 March; Summer Term 2026: Open Morning on 13 May & Open Evening on 17 June.",
-        PAGE_LINKS["open events"],
-        "View Open Events"
-    ),
-    "tell me about scholarships and bursaries": (
-        "We offer a range of bursaries and scholarships to support families in need. For eligibility criteria and application details, please visit our Scholarships & Bursaries page.",
-        PAGE_LINKS["scholarships"],
-        "More about Scholarships"
-    ),
-    "bursaries": (
-        "We offer a range of bursaries and scholarships to support families in need. For eligibility criteria and application details, please visit our Scholarships & Bursaries page.",
-        PAGE_LINKS["scholarships"],
-        "More about Scholarships"
-    ),
-    "scholarships": (
-        "We offer a range of bursaries and scholarships to support families in need. For eligibility criteria and application details, please visit our Scholarships & Bursaries page.",
-        PAGE_LINKS["scholarships"],
-        "More about Scholarships"
-    ),
-    "tell me about the sixth form": (
-        "Thank you for your question! For full details of our Sixth Form—including courses, results and admissions—please visit our Sixth Form page.",
-        PAGE_LINKS["sixth form"],
-        "More about Sixth Form"
-    ),
-    "sixth form": (
-        "Thank you for your question! For full details of our Sixth Form—including courses, results and admissions—please visit our Sixth Form page.",
-        PAGE_LINKS["sixth form"],
-        "More about Sixth Form"
-    ),
-    "how can i contact the school": (
-        "You can contact our Admissions team by email at registrar@morehousemail.org.uk or by phone on 020 1234 5678. For full details, visit our Contact page.",
-        PAGE_LINKS["contact"],
-        "Contact Us"
-    ),
-    "contact": (
-        "You can contact our Admissions team by email at registrar@morehousemail.org.uk or by phone on 020 1234 5678. For full details, visit our Contact page.",
-        PAGE_LINKS["contact"],
-        "Contact Us"
-    ),
-    "who is the head of school": (
-        "The Head of School is Ms Claire Phelps. For more about her vision and background, please visit our Meet the Head page.",
-        PAGE_LINKS["head of school"],
-        "Meet the Head"
-    ),
-    "head of school": (
-        "The Head of School is Ms Claire Phelps. For more about her vision and background, please visit our Meet the Head page.",
-        PAGE_LINKS["head of school"],
-        "Meet the Head"
-    ),
-    "how do you support students pastoral care": (
-        "We offer dedicated pastoral teams, regular check-ins and specialised programmes to support every student's wellbeing. See our Pastoral Care page for details.",
-        PAGE_LINKS["pastoral care"],
-        "More about Pastoral Care"
-    ),
-    "what are your safeguarding policies": (
-        "Our safeguarding policies ensure every pupil's safety both on and off campus. For full policy documents, visit our Safeguarding page.",
-        PAGE_LINKS["safeguarding"],
-        "View Safeguarding Policies"
-    ),
-    "what is academic life like": (
-        "Academic Life at More House blends rigorous coursework with personalised support. Explore our approach on the Academic Life page.",
-        PAGE_LINKS["academic life"],
-        "More about Academic Life"
-    ),
-    "which subjects do you offer": (
-        "We offer a wide range of subjects from STEM to humanities and creative arts. See the full list on our Subjects page.",
-        PAGE_LINKS["subjects"],
-        "View Subjects Offered"
-    ),
-    "tell me about pre-senior": (
-        "Pre-Senior (Years 5–6) prepares pupils with a broad curriculum and pastoral support. Learn more on our Pre-Senior page.",
-        PAGE_LINKS["pre-senior"],
-        "More about Pre-Senior"
-    ),
-    "how does your house system work": (
-        "Our house system fosters camaraderie and healthy competition across four houses. Find details on our Houses page.",
-        PAGE_LINKS["houses"],
-        "More about Houses"
-    ),
-    "what extracurricular activities do you offer": (
-        "We run sport, music, drama, Duke of Edinburgh and more. Discover all options on our Co-curricular Programme page.",
-        PAGE_LINKS["co-curricular"],
-        "View Co-curricular Activities"
-    ),
-    "what sports do you offer": (
-        "We offer netball, hockey, football, rowing, athletics and more. Details are on our Sport page.",
-        PAGE_LINKS["sport"],
-        "View Sports Offered"
-    ),
-    "tell me about faith life": (
-        "Faith Life includes regular reflection sessions and chaplaincy support. Visit our Faith Life page to learn more.",
-        PAGE_LINKS["faith life"],
-        "More about Faith Life"
-    ),
-    "what are your exam results": (
-        "50% A*–A and 82% A*–B at A-Level; 95% progress to first-choice university or apprenticeship. See more on our Results & Destinations page.",
-        PAGE_LINKS["results and destinations"],
-        "View Results & Destinations"
-    ),
-    "results": (
-        "50% A*–A and 82% A*–B at A-Level; 95% progress to first-choice university or apprenticeship. See more on our Results & Destinations page.",
-        PAGE_LINKS["results and destinations"],
-        "View Results & Destinations"
-    ),
-    "destinations": (
-        "50% A*–A and 82% A*–B at A-Level; 95% progress to first-choice university or apprenticeship. See more on our Results & Destinations page.",
-        PAGE_LINKS["results and destinations"],
-        "View Results & Destinations"
-    ),
-    "where can i find inspection reports": (
-        "All our latest inspection reports are published here:",
-        PAGE_LINKS["inspection reports"],
-        "View Inspection Reports"
-    ),
-    "inspection reports": (
-        "All our latest inspection reports are published here:",
-        PAGE_LINKS["inspection reports"],
-        "View Inspection Reports"
-    ),
-    "inspection": (
-        "All our latest inspection reports are published here:",
-        PAGE_LINKS["inspection reports"],
-        "View Inspection Reports"
-    ),
-    "exams": (
-        "At More House School, our Public Exams Policy covers assessment methods, regulations and the support we offer students. You can read the full policy in our School Policies section.",
-        PAGE_LINKS["school policies"],
-        "View School Policies"
-    ),
-    "exam policy": (
-        "At More House School, our Public Exams Policy covers assessment methods, regulations and the support we offer students. You can read the full policy in our School Policies section.",
-        PAGE_LINKS["school policies"],
-        "View School Policies"
-    ),
-    "teachers": (
-        "Our dedicated teaching staff at More House School are experts in their subjects and committed to each pupil’s growth, both academically and personally. For full profiles, please visit our Staff & Governors page.",
-        PAGE_LINKS["staff"],
-        "Meet Our Staff"
-    ),
-    "teaching staff": (
-        "Our dedicated teaching staff at More House School are experts in their subjects and committed to each pupil’s growth, both academically and personally. For full profiles, please visit our Staff & Governors page.",
-        PAGE_LINKS["staff"],
-        "Meet Our Staff"
-    ),
-    "universities": (
-        "In our Sixth Form, students receive tailored university guidance—including Oxbridge support, mock interviews and visits to leading institutions. For full details, please visit our Results & Destinations page.",
-        PAGE_LINKS["results and destinations"],
-        "View Results & Destinations"
-    ),
-    "university guidance": (
-        "In our Sixth Form, students receive tailored university guidance—including Oxbridge support, mock interviews and visits to leading institutions. For full details, please visit our Results & Destinations page.",
-        PAGE_LINKS["results and destinations"],
-        "View Results & Destinations"
-    ),
-    "transport": (
-        "We run dedicated school buses from X, Y and Z. See timetables and pick-up points here:",
-        None,
-        "View Bus Routes"
-    ),
-    "bus service": (
-        "We run dedicated school buses from X, Y and Z. See timetables and pick-up points here:",
-        None,
-        "View Bus Routes"
-    ),
-    "bus routes": (
-        "We run dedicated school buses from X, Y and Z. See timetables and pick-up points here:",
-        None,
-        "View Bus Routes"
-    ),
-    "after school clubs": (
-        "We offer chess, coding, drama, netball and more in our After-School Clubs. Full schedule here:",
-        None,
-        "View After-School Clubs"
-    ),
-    "clubs": (
-        "We offer chess, coding, drama, netball and more in our After-School Clubs. Full schedule here:",
-        None,
-        "View After-School Clubs"
-    ),
-    "after school": (
-        "We offer chess, coding, drama, netball and more in our After-School Clubs. Full schedule here:",
-        None,
-        "View After-School Clubs"
-    ),
-    "parents evening": (
-        "Our termly Parents’ Evenings let you meet teachers and review progress. Dates and booking info here:",
-        None,
-        "Book Parents’ Evening"
-    ),
-    "parent evenings": (
-        "Our termly Parents’ Evenings let you meet teachers and review progress. Dates and booking info here:",
-        None,
-        "Book Parents’ Evening"
-    ),
-    "pta": (
-        "Our PTA organises events and fundraising—everyone’s welcome. Learn more here:",
-        None,
-        "More about PTA"
-    ),
-    "friends of school": (
-        "Our PTA organises events and fundraising—everyone’s welcome. Learn more here:",
-        None,
-        "More about PTA"
-    ),
-    "parents association": (
-        "Our PTA organises events and fundraising—everyone’s welcome. Learn more here:",
-        None,
-        "More about PTA"
-    ),
-    "mental health": (
-        "We have an on-site counsellor and weekly wellbeing workshops. Details here:",
-        None,
-        "More about Wellbeing"
-    ),
-    "wellbeing support": (
-        "We have an on-site counsellor and weekly wellbeing workshops. Details here:",
-        None,
-        "More about Wellbeing"
-    ),
-    "sen": (
-        "Our Learning Support team provides one-to-one and group SEN support. Read more here:",
-        PAGE_LINKS["learning support"],
-        "More about Learning Support"
-    ),
-    "special educational needs": (
-        "Our Learning Support team provides one-to-one and group SEN support. Read more here:",
-        PAGE_LINKS["learning support"],
-        "More about Learning Support"
-    ),
-    "learning support": (
-        "Our Learning Support team provides one-to-one and group SEN support. Read more here:",
-        PAGE_LINKS["learning support"],
-        "More about Learning Support"
-    ),
-    "e-safety": (
-        "We teach digital citizenship and monitor online use. See our e-Safety policy here:",
-        PAGE_LINKS["school policies"],
-        "View School Policies"
-    ),
-    "online safety": (
-        "We teach digital citizenship and monitor online use. See our e-Safety policy here:",
-        PAGE_LINKS["school policies"],
-        "View School Policies"
-    ),
-    "alumni": (
-        "Our Alumnae network offers mentorship and events. Join here:",
-        None,
-        "Join Our Alumnae"
-    ),
-    "old girls": (
-        "Our Alumnae network offers mentorship and events. Join here:",
-        None,
-        "Join Our Alumnae"
-    ),
-    "past pupils": (
-        "Our Alumnae network offers mentorship and events. Join here:",
-        None,
-        "Join Our Alumnae"
-    ),
-    "faith": (
-        "At More House School, our Catholic faith is an integral part of our ethos and daily life. We foster a community where values of tolerance, justice and integrity are upheld. Daily prayers and weekly Chapel services help build our community spirit, and we celebrate special occasions such as St Thomas More’s Day and Days of Obligation.\n\n"
-        "Our Faith in Action programme empowers pupils to initiate change locally and globally, partnering with CAFOD, The Cardinal Hume Centre and The WE Foundation. These experiences instil a sense of global citizenship as students campaign on issues like climate change and homelessness.",
-        PAGE_LINKS["faith life"],
-        "More about Faith Life"
-    ),
-    "religion": (
-        "At More House School, our Catholic faith is an integral part of our ethos and daily life. We foster a community where values of tolerance, justice and integrity are upheld. Daily prayers and weekly Chapel services help build our community spirit, and we celebrate special occasions such as St Thomas More’s Day and Days of Obligation.\n\n"
-        "Our Faith in Action programme empowers pupils to initiate change locally and globally, partnering with CAFOD, The Cardinal Hume Centre and The WE Foundation. These experiences instil a sense of global citizenship as students campaign on issues like climate change and homelessness.",
-        PAGE_LINKS["faith life"],
-        "More about Faith Life"
-    ),
-    "education": (
-        "Education at More House School combines a rigorous academic curriculum with personalised support and enrichment from Years 5 through 13. For a full overview of our teaching approach, curriculum structure and support systems, please visit our Academic Life page.",
-        PAGE_LINKS["academic life"],
-        "More about Academic Life"
-    ),
-    "learning": (
-        "Education at More House School combines a rigorous academic curriculum with personalised support and enrichment from Years 5 through 13. For a full overview of our teaching approach, curriculum structure and support systems, please visit our Academic Life page.",
-        PAGE_LINKS["academic life"],
-        "More about Academic Life"
-    ),
-    "apply": (
-        "You can begin your application online via our Admissions page. For step-by-step guidance on entry requirements and key dates, please visit our Admissions page.",
-        PAGE_LINKS["admissions"],
-        "Apply Now"
-    ),
-    "application": (
-        "You can begin your application online via our Admissions page. For step-by-step guidance on entry requirements and key dates, please visit our Admissions page.",
-        PAGE_LINKS["admissions"],
-        "Apply Now"
-    ),
-    "application form": (
-        "You can begin your application online via our Admissions page. For step-by-step guidance on entry requirements and key dates, please visit our Admissions page.",
-        PAGE_LINKS["admissions"],
-        "Apply Now"
-    ),
-    "apply online": (
-        "You can begin your application online via our Admissions page. For step-by-step guidance on entry requirements and key dates, please visit our Admissions page.",
-        PAGE_LINKS["admissions"],
-        "Apply Now"
-    ),
-    "entry requirements": (
-        "Our entry requirements vary by year group; please see our Admissions page for detailed academic and age criteria for each entry point.",
-        PAGE_LINKS["admissions"],
-        "More about Admissions"
-    ),
-    "admissions criteria": (
-        "Our entry requirements vary by year group; please see our Admissions page for detailed academic and age criteria for each entry point.",
-        PAGE_LINKS["admissions"],
-        "More about Admissions"
-    ),
-    "requirements": (
-        "Our entry requirements vary by year group; please see our Admissions page for detailed academic and age criteria for each entry point.",
-        PAGE_LINKS["admissions"],
-        "More about Admissions"
-    ),
-    "virtual tour": (
-        "Take our online Virtual Tour to explore More House’s facilities and campus from anywhere in the world. Access the 360° walkthrough on our website.",
-        None,
-        "Take Virtual Tour"
-    ),
-    "tour": (
-        "Take our online Virtual Tour to explore More House’s facilities and campus from anywhere in the world. Access the 360° walkthrough on our website.",
-        None,
-        "Take Virtual Tour"
-    ),
-    "visit us online": (
-        "Take our online Virtual Tour to explore More House’s facilities and campus from anywhere in the world. Access the 360° walkthrough on our website.",
-        None,
-        "Take Virtual Tour"
-    ),
-    "facilities": (
-        "Our campus features science labs, a sports hall, arts studios and more. For full details on all our facilities and how to hire them, please visit our Lettings page.",
-        PAGE_LINKS["lettings"],
-        "More about Facilities"
-    ),
-    "labs": (
-        "Our campus features science labs, a sports hall, arts studios and more. For full details on all our facilities and how to hire them, please visit our Lettings page.",
-        PAGE_LINKS["lettings"],
-        "More about Facilities"
-    ),
-    "sports hall": (
-        "Our campus features science labs, a sports hall, arts studios and more. For full details on all our facilities and how to hire them, please visit our Lettings page.",
-        PAGE_LINKS["lettings"],
-        "More about Facilities"
-    ),
-    "drama": (
-        "Our Drama & Theatre programme runs regular productions, workshops and classes. Discover our Performing Arts offerings on the Co-curricular Programme page.",
-        PAGE_LINKS["co-curricular"],
-        "View Co-curricular Activities"
-    ),
-    "theatre": (
-        "Our Drama & Theatre programme runs regular productions, workshops and classes. Discover our Performing Arts offerings on the Co-curricular Programme page.",
-        PAGE_LINKS["co-curricular"],
-        "View Co-curricular Activities"
-    ),
-    "performing arts": (
-        "Our Drama & Theatre programme runs regular productions, workshops and classes. Discover our Performing Arts offerings on the Co-curricular Programme page.",
-        PAGE_LINKS["co-curricular"],
-        "View Co-curricular Activities"
-    ),
-    "robotics": (
-        "Our Robotics & Coding clubs inspire future engineers through hands-on projects. Learn more about STEM enrichment on the Academic Life page.",
-        PAGE_LINKS["academic life"],
-        "More about Academic Life"
-    ),
-    "coding": (
-        "Our Robotics & Coding clubs inspire future engineers through hands-on projects. Learn more about STEM enrichment on the Academic Life page.",
-        PAGE_LINKS["academic life"],
-        "More about Academic Life"
-    ),
-    "computer club": (
-        "Our Robotics & Coding clubs inspire future engineers through hands-on projects. Learn more about STEM enrichment on the Academic Life page.",
-        PAGE_LINKS["academic life"],
-        "More about Academic Life"
-    ),
-    "motto": (
-        "Our school motto is ‘Ad Altiora’—aiming always for higher standards in character, learning and service. For more on our values, visit the Ethos page.",
-        PAGE_LINKS["ethos"],
-        "More about Our Ethos"
-    ),
-    "mission statement": (
-        "Our school motto is ‘Ad Altiora’—aiming always for higher standards in character, learning and service. For more on our values, visit the Ethos page.",
-        PAGE_LINKS["ethos"],
-        "More about Our Ethos"
-    ),
-    "inset days": (
-        "Our INSET days (staff training) are scheduled throughout the year. For full term-by-term dates including INSET and holiday breaks, please visit the Term Dates page.",
-        PAGE_LINKS["term dates"],
-        "View Term Dates"
-    ),
-    "staff training": (
-        "Our INSET days (staff training) are scheduled throughout the year. For full term-by-term dates including INSET and holiday breaks, please visit the Term Dates page.",
-        PAGE_LINKS["term dates"],
-        "View Term Dates"
-    ),
-    "training day": (
-        "Our INSET days (staff training) are scheduled throughout the year. For full term-by-term dates including INSET and holiday breaks, please visit the Term Dates page.",
-        PAGE_LINKS["term dates"],
-        "View Term Dates"
-    ),
-    "health and safety": (
-        "Our Health & Safety policies safeguard every pupil on campus. For full details, please visit our Safeguarding page.",
-        PAGE_LINKS["safeguarding"],
-        "View Safeguarding Policies"
-    ),
-    "h&s": (
-        "Our Health & Safety policies safeguard every pupil on campus. For full details, please visit our Safeguarding page.",
-        PAGE_LINKS["safeguarding"],
-        "View Safeguarding Policies"
-    ),
-    "accessibility": (
-        "More House is committed to full accessibility across campus. For details on facilities and support, please visit our School Policies page.",
-        PAGE_LINKS["school policies"],
-        "View School Policies"
-    ),
-    "disabled access": (
-        "More House is committed to full accessibility across campus. For details on facilities and support, please visit our School Policies page.",
-        PAGE_LINKS["school policies"],
-        "View School Policies"
-    ),
-    "senco": (
-        "Our SENCO leads specialist support for pupils with special educational needs. Learn more about our SEN provision on the Learning Support page.",
-        PAGE_LINKS["learning support"],
-        "More about Learning Support"
-    ),
-    "send": (
-        "Our SENCO leads specialist support for pupils with special educational needs. Learn more about our SEN provision on the Learning Support page.",
-        PAGE_LINKS["learning support"],
-        "More about Learning Support"
-    ),
-    "special needs coordinator": (
-        "Our SENCO leads specialist support for pupils with special educational needs. Learn more about our SEN provision on the Learning Support page.",
-        PAGE_LINKS["learning support"],
-        "More about Learning Support"
-    ),
-    "deadlines": (
-        "Key application deadlines (11+, Sixth Form, Pre-Senior) are listed on our Admissions page. Please check the Admissions page for exact dates.",
-        PAGE_LINKS["admissions"],
-        "More about Admissions"
-    ),
-    "entry deadlines": (
-        "Key application deadlines (11+, Sixth Form, Pre-Senior) are listed on our Admissions page. Please check the Admissions page for exact dates.",
-        PAGE_LINKS["admissions"],
-        "More about Admissions"
-    ),
-    "apply by": (
-        "Key application deadlines (11+, Sixth Form, Pre-Senior) are listed on our Admissions page. Please check the Admissions page for exact dates.",
-        PAGE_LINKS["admissions"],
-        "More about Admissions"
-    ),
-    "values": (
-        "Our core values—confidence, character, community and compassion—drive everything we do. To learn more, please visit our Ethos page.",
-        PAGE_LINKS["ethos"],
-        "More about Our Ethos"
-    ),
-    "our values": (
-        "Our core values—confidence, character, community and compassion—drive everything we do. To learn more, please visit our Ethos page.",
-        PAGE_LINKS["ethos"],
-        "More about Our Ethos"
-    ),
-    "what are the values of the school": (
-        "Our core values—confidence, character, community and compassion—drive everything we do. To learn more, please visit our Ethos page.",
-        PAGE_LINKS["ethos"],
-        "More about Our Ethos"
-    ),
-    "tell me about your values": (
-        "Our core values—confidence, character, community and compassion—drive everything we do. To learn more, please visit our Ethos page.",
-        PAGE_LINKS["ethos"],
-        "More about Our Ethos"
-    ),
-    "alumni events": (
-        "Our Alumnae network hosts reunions, mentorship programmes and regional events. For details and to register, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Join Our Alumnae"
-    ),
-    "reunion": (
-        "Our Alumnae network hosts reunions, mentorship programmes and regional events. For details and to register, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Join Our Alumnae"
-    ),
-    "old girls": (
-        "Our Alumnae network hosts reunions, mentorship programmes and regional events. For details and to register, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Join Our Alumnae"
-    ),
-    "parent portal": (
-        "Our Parent Portal (ParentPay) lets you view invoices, pay fees and track attendance. For login details or support, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Access Parent Portal"
-    ),
-    "parentpay": (
-        "Our Parent Portal (ParentPay) lets you view invoices, pay fees and track attendance. For login details or support, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Access Parent Portal"
-    ),
-    "portal": (
-        "Our Parent Portal (ParentPay) lets you view invoices, pay fees and track attendance. For login details or support, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Access Parent Portal"
-    ),
-    "jobs": (
-        "All current staff vacancies and application details are listed on our Vacancies page. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Vacancies"
-    ),
-    "vacancies": (
-        "All current staff vacancies and application details are listed on our Vacancies page. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Vacancies"
-    ),
-    "careers at school": (
-        "All current staff vacancies and application details are listed on our Vacancies page. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Vacancies"
-    ),
-    "behaviour policy": (
-        "Our Behaviour Policy sets out expectations, support systems and procedures for student conduct. For any questions, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Behaviour Policy"
-    ),
-    "discipline": (
-        "Our Behaviour Policy sets out expectations, support systems and procedures for student conduct. For any questions, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Behaviour Policy"
-    ),
-    "student conduct": (
-        "Our Behaviour Policy sets out expectations, support systems and procedures for student conduct. For any questions, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Behaviour Policy"
-    ),
-    "uniform supplier": (
-        "Our official uniform supplier is XYZ Outfitters. You can order via their website or contact the Director of Admissions at registrar@morehousemail.org.uk for assistance.",
-        None,
-        "Order Uniform"
-    ),
-    "where to buy uniform": (
-        "Our official uniform supplier is XYZ Outfitters. You can order via their website or contact the Director of Admissions at registrar@morehousemail.org.uk for assistance.",
-        None,
-        "Order Uniform"
-    ),
-    "kit supplier": (
-        "Our official uniform supplier is XYZ Outfitters. You can order via their website or contact the Director of Admissions at registrar@morehousemail.org.uk for assistance.",
-        None,
-        "Order Uniform"
-    ),
-    "lost property": (
-        "Please check our Lost Property Office in reception during school hours. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Contact Lost Property"
-    ),
-    "found items": (
-        "Please check our Lost Property Office in reception during school hours. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Contact Lost Property"
-    ),
-    "misplaced items": (
-        "Please check our Lost Property Office in reception during school hours. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Contact Lost Property"
-    ),
-    "breakfast club": (
-        "We run Breakfast Club from 7.30 am and After-School care until 6 pm. For bookings, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Book Wraparound Care"
-    ),
-    "after school care": (
-        "We run Breakfast Club from 7.30 am and After-School care until 6 pm. For bookings, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Book Wraparound Care"
-    ),
-    "wraparound": (
-        "We run Breakfast Club from 7.30 am and After-School care until 6 pm. For bookings, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "Book Wraparound Care"
-    ),
-    "exclusions": (
-        "Details of our exclusions and disciplinary procedures are in the School Policies section. For more information, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View School Policies"
-    ),
-    "suspension": (
-        "Details of our exclusions and disciplinary procedures are in the School Policies section. For more information, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View School Policies"
-    ),
-    "sanctions": (
-        "Details of our exclusions and disciplinary procedures are in the School Policies section. For more information, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View School Policies"
-    ),
-    "ehcp": (
-        "We support EHCP pupils through our Learning Support team. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "More about Learning Support"
-    ),
-    "education health and care plan": (
-        "We support EHCP pupils through our Learning Support team. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "More about Learning Support"
-    ),
-    "sen support": (
-        "We support EHCP pupils through our Learning Support team. For enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "More about Learning Support"
-    ),
-    "counsellor": (
-        "We have an on-site counsellor and weekly wellbeing workshops. For referrals or enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "More about Wellbeing"
-    ),
-    "mental health support": (
-        "We have an on-site counsellor and weekly wellbeing workshops. For referrals or enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "More about Wellbeing"
-    ),
-    "wellbeing": (
-        "We have an on-site counsellor and weekly wellbeing workshops. For referrals or enquiries, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "More about Wellbeing"
-    ),
-    "wi-fi": (
-        "Students connect to our secure campus Wi-Fi; please refer to the IT Acceptable Use Policy. For technical issues, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View IT Policies"
-    ),
-    "internet access": (
-        "Students connect to our secure campus Wi-Fi; please refer to the IT Acceptable Use Policy. For technical issues, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View IT Policies"
-    ),
-    "edtech": (
-        "Students connect to our secure campus Wi-Fi; please refer to the IT Acceptable Use Policy. For technical issues, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View IT Policies"
-    ),
-    "covid policy": (
-        "Our Health & Safety page covers illness protocols, immunisations and Covid measures. For further questions, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Health Policies"
-    ),
-    "health policy": (
-        "Our Health & Safety page covers illness protocols, immunisations and Covid measures. For further questions, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Health Policies"
-    ),
-    "illness": (
-        "Our Health & Safety page covers illness protocols, immunisations and Covid measures. For further questions, please contact the Director of Admissions at registrar@morehousemail.org.uk.",
-        None,
-        "View Health Policies"
-    ),
-    "policy": (
-        "You can find all of More House School’s official policies—including safeguarding, health & safety, SEND, exams and more—on our Policies page.",
-        "https://www.morehouse.org.uk/information/school-policies/",
-        "View School Policies"
-    ),
-    "policies": (
-        "You can find all of More House School’s official policies—including safeguarding, health & safety, SEND, exams and more—on our Policies page.",
-        "https://www.morehouse.org.uk/information/school-policies/",
-        "View School Policies"
-    ),
-    "music": (
-        "Our Music Department offers individual lessons, ensembles, choir and orchestra. See timetables and performance opportunities on our Co-curricular Programme page.",
-        PAGE_LINKS["co-curricular"],
-        "View Co-curricular Activities"
-    ),
-    "choir": (
-        "Our Music Department offers individual lessons, ensembles, choir and orchestra. See timetables and performance opportunities on our Co-curricular Programme page.",
-        PAGE_LINKS["co-curricular"],
-        "View Co-curricular Activities"
-    ),
-    "orchestra": (
-        "Our Music Department offers individual lessons, ensembles, choir and orchestra. See timetables and performance opportunities on our Co-curricular Programme page.",
-        PAGE_LINKS["co-curricular"],
-        "View Co-curricular Activities"
-    ),
-    "music lessons": (
-        "Our Music Department offers individual lessons, ensembles, choir and orchestra. See timetables and performance opportunities on our Co-curricular Programme page.",
-        PAGE_LINKS["co-curricular"],
-        "View Co-curricular Activities"
-    ),
-}
+def match_static_semantic(question_embedding):
+    if static_embeddings is None or not static_keys:
+        return None
+    scores = static_embeddings @ question_embedding
+    best = int(np.argmax(scores))
+    if scores[best] >= STATIC_SEMANTIC_THRESHOLD:
+        return static_keys[best]
+    return None
 
 # Sensitive keywords
-sensitive_keywords = ['bullying', 'abuse', 'harassment']
+# Matched from the start of a word, so "abused" is flagged but "disabuse" isn't
+sensitive_keywords = ['bullying', 'bullied', 'cyberbullying', 'abuse', 'harassment']
+MAX_PAGE_LINKS = 2
+
+# One automaton for sensitive terms and PAGE_LINKS topics, scanned once per message
+keyword_engine = KeywordEngine()
+for keyword in sensitive_keywords:
+    keyword_engine.add(keyword, 'sensitive', whole_word=False)
+for phrase, url in PAGE_LINKS.items():
+    keyword_engine.add(phrase, 'link', url)
+keyword_engine.build()
+
+def page_links_for(keyword_hits):
+    """Distinct (url, label) pairs for the topics mentioned, longest phrase wins."""
+    links = []
+    for hit in longest_non_overlapping([h for h in keyword_hits if h.tag == 'link']):
+        if hit.payload not in (url for url, _ in links):
+            links.append((hit.payload, URL_LABELS.get(hit.payload, 'More information')))
+    return links[:MAX_PAGE_LINKS]
+
+# RAG helper functions
+def choose_answer(snapshot, question_embedding, ids=None, scores=None, lexical=((), ())):
+    """Return (kind, payload): a curated static answer, relevant chunk ids, or a miss."""
+    # Curated answers win over raw chunks when semantically close
+    static_key = match_static_semantic(question_embedding)
+    if static_key is not None:
+        return 'static', format_static_answer(static_key)
 
-# RAG helper function
-def get_rag_response(question):
+    if ids is None:
+        ids, scores = snapshot.retriever.search(question_embedding, RAG_TOP_K)
+    # Fuse dense and BM25 rankings; a chunk must clear either relevance bar
+    _, relevant = fuse_hybrid((ids, scores), lexical, RAG_MIN_SIMILARITY, LEXICAL_MIN_SCORE)
+    if relevant:
+        return 'chunks', relevant
+    return 'miss', "Sorry, I couldn't find a relevant answer."
+
+def render_answer(snapshot, question, kind, payload, on_delta=None):
+    """Turn choose_answer's result into (kind, text) and whether it may be cached."""
+    if kind != 'chunks':
+        return (kind, payload), True
+    best = snapshot.metadata[payload[0]]
+    if ANSWER_SYNTHESIS:
+        # Best chunks that fit the prompt budget, deduplicated, in stable index order
+        ids, _ = select_chunks(snapshot.metadata, payload, max_chunks=SYNTHESIS_MAX_CHUNKS)
+        chunks = [snapshot.metadata[i] for i in ids]
+        try:
+            with admission_gate.slot(), metrics.timer('chat_stage_seconds', stage='synthesis'):
+                answer = synthesize_answer(question, chunks, on_delta)
+            return ('answer', html.escape(answer)), True
+        except Overloaded:
+            raise
+        except Exception as e:
+            app.logger.error(f"Answer synthesis error, falling back to chunk text: {e}")
+            return ('chunk', best.get('text', 'No relevant information found.')), False
+    return ('chunk', best.get('text', 'No relevant information found.')), True
+
+def answer_question(question, page_links=(), on_delta=None):
+    """Answer question from the knowledge base; return (kind, response).
+
+    kind is 'answer' or 'chunk' (retrieved), 'static' (curated answer),
+    'miss' or 'error'. When an answer is synthesized, on_delta(text) is
+    called for each streamed piece before the full answer is returned.
+    Raises Overloaded when an OpenAI call can't get an admission slot.
+    """
     try:
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        # Generate question embedding
-        response = client.embeddings.create(input=question, model='text-embedding-3-small')
-        question_embedding = np.array(response.data[0].embedding)
+        # One snapshot for the whole request, even if a reload lands meanwhile
+        snapshot = kb_holder.current
+
+        # Exact-term questions ("EHCP", "ISI") decided by BM25 skip the embedding call
+        lexical_index = snapshot.lexical_index
+        with metrics.timer('chat_stage_seconds', stage='lexical_search'):
+            lexical = lexical_index.search(question, RAG_TOP_K)
+            decisive = lexical_index.is_decisive(question, *lexical, LEXICAL_MIN_SCORE, LEXICAL_MARGIN,
+                                                 LEXICAL_FAST_MAX_TERMS)
+        if decisive:
+            top_ids = [int(i) for i in lexical[0]]
+            cached, _ = render_answer(snapshot, question, 'chunks', top_ids, on_delta)
+        else:
+            # Question embedding (cached by normalized question) and top-k by
+            # cosine similarity; index rows are already unit length
+            ids = scores = None
+            question_embedding = query_cache.get(question)
+            if question_embedding is None:
+                start = time.perf_counter()
+                with admission_gate.slot():
+                    question_embedding, ids, scores, searched = embed_dispatcher.submit(question)
+                elapsed = time.perf_counter() - start
+                metrics.observe('chat_stage_seconds', elapsed, stage='embed')
+                query_cache.put(question, question_embedding, elapsed)
+                if searched is not snapshot:
+                    ids = scores = None  # batch was searched against a newer index
 
-        # Cosine similarity
-        similarities = np.dot(embeddings, question_embedding) / (
-            np.linalg.norm(embeddings, axis=1) * np.linalg.norm(question_embedding)
-        )
-        best_idx = np.argmax(similarities)
-        if similarities[best_idx] > 0.6:  # Lowered from 0.7
-            return metadata[best_idx].get('text', 'No relevant information found.')
-        return "Sorry, I couldn't find a relevant answer."
+            # Near-identical questions reuse the answer chosen last time
+            cached = answer_cache.get(question_embedding, snapshot.generation)
+            if cached is None:
+                with metrics.timer('chat_stage_seconds', stage='choose_answer'):
+                    kind, payload = choose_answer(snapshot, question_embedding, ids, scores, lexical)
+                cached, cacheable = render_answer(snapshot, question, kind, payload, on_delta)
+                if cacheable:
+                    answer_cache.put(question_embedding, cached, snapshot.generation)
+
+        kind, response = cached
+        if kind in ('chunk', 'answer'):
+            for link, label in page_links:
+                response += f' <a href="{link}" target="_blank">{label}</a>'
+        return kind, response
+    except Overloaded:
+        raise
     except Exception as e:
         app.logger.error(f"RAG error: {e}")
-        return "Error processing question."
+        return 'error', "Error processing question."
+
+def get_rag_response(question, page_links=(), on_delta=None):
+    """Answer question from the knowledge base (see answer_question)."""
+    return answer_question(question, page_links, on_delta)[1]
 
 # Routes
 @app.route('/review', methods=['GET', 'POST'])
 def review():
     try:
-        conn = sqlite3.connect('/data/flag.db')  # ✅ Local DB file
         if request.method == 'POST':
+            flag_id = request.form.get('flag_id')
             session_id = request.form.get('session_id')
             human_response = request.form.get('human_response')
-            if not session_id or not human_response:
-                conn.close()
+            status = request.form.get('status', 'answered')
+            if not (flag_id or session_id) or (status == 'answered' and not human_response):
                 return jsonify({'error': 'Missing data'}), 400
-            # ✅ Optional: Log the human response elsewhere if needed
-            conn.execute("DELETE FROM flagged_questions WHERE session_id = ?", (session_id,))
-            conn.commit()
-            conn.close()
+            if status not in FLAG_STATUSES:
+                return jsonify({'error': 'Invalid status'}), 400
+            # ✅ Flags are kept with their outcome instead of being deleted
+            if flag_id and flag_id.isdigit():
+                flag_store.set_status(int(flag_id), status, human_response)
+            else:
+                flag_store.set_session_status(session_id, status, human_response)
             return jsonify({'status': 'Response submitted'})
-        cursor = conn.execute("SELECT session_id, question FROM flagged_questions")
-        sessions = cursor.fetchall()
-        conn.close()
-        return render_template('review.html', sessions=sessions)
+
+        status = request.args.get('status', 'open')
+        if status not in FLAG_STATUSES:
+            status = None  # "all"
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        filters = {
+            'status': status,
+            'since': request.args.get('since') or None,
+            'until': request.args.get('until') or None,
+        }
+        flags, next_cursor = flag_store.list_flags(cursor=request.args.get('cursor'), limit=limit, **filters)
+        return render_template('review.html', flags=flags, next_cursor=next_cursor,
+                               statuses=FLAG_STATUSES, filters=filters, limit=limit)
     except Exception as e:
         app.logger.error(f"Review error: {e}")
         return jsonify({'error': 'Server error'}), 500
 
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        **query_cache.stats(),
+        'embedding_batches': embed_dispatcher.stats(),
+        'answer_cache': answer_cache.stats(),
+    })
+
+@app.route('/admin/reload-kb', methods=['POST'])
+def reload_kb():
+    """Reload the index in this worker now (others pick it up via the watcher)."""
+    token = request.headers.get('X-Admin-Token', '')
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        reloaded = kb_holder.reload()
+    except Exception as e:
+        app.logger.error(f"Knowledge base reload error: {e}")
+        return jsonify({'error': str(e), **kb_holder.stats()}), 409
+    return jsonify({'reloaded': reloaded, **kb_holder.stats()})
+
+# Outcome label for chat_request_seconds, by answer_question kind
+RAG_OUTCOMES = {'answer': 'rag_hit', 'chunk': 'rag_hit', 'static': 'static_hit', 'miss': 'rag_miss', 'error': 'error'}
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # SocketIO handler
 @socketio.on('message')
 def handle_message(data):
+    started = time.perf_counter()
+    outcome = 'error'
     try:
         question = data.get('message', '').strip()
         session_id = data.get('session_id', '')
         if not question or not session_id:
+            outcome = 'invalid'
             emit('response', {'message': 'Invalid input'})
             return
 
@@ -1042,32 +356,60 @@ def handle_message(data):
         current_hour = current_time.hour
 
         # Handle sensitive questions
-        if any(keyword in question.lower() for keyword in sensitive_keywords):
+        with metrics.timer('chat_stage_seconds', stage='keyword_scan'):
+            keyword_hits = keyword_engine.scan(question)
+        if any(hit.tag == 'sensitive' for hit in keyword_hits):
             if True:  # Disable time check for now
-                conn = sqlite3.connect('/data/flag.db')
-                conn.execute("INSERT INTO flagged_questions (session_id, question, timestamp) VALUES (?, ?, ?)",
-                             (session_id, question, current_time.isoformat()))
-                conn.commit()
-                conn.close()
+                with metrics.timer('chat_stage_seconds', stage='flag_enqueue'):
+                    flag_store.add(session_id, question, current_time.isoformat())
+                outcome = 'flagged'
                 emit('response', {'message': 'Question flagged for human review.'})
                 return
 
         # Static QA
-        for q, (answer, link, label) in STATIC_QAS.items():
-            if fuzz.ratio(question.lower(), q.lower()) > 70:  # Lowered from 80
-                response = answer
-                if link:
-                    response += f' <a href="{link}" target="_blank">{label}</a>'
-                emit('response', {'message': response})
-                return
+        with metrics.timer('chat_stage_seconds', stage='static_match'):
+            static_key, _ = static_matcher.match(question)
+        if static_key is not None:
+            outcome = 'static_hit'
+            emit('response', {'message': format_static_answer(static_key)})
+            return
+
+        # One session can't flood the answer path. Safeguarding reports above
+        # are always stored, however fast they arrive
+        if not session_limiter.allow(session_id):
+            outcome = 'rate_limited'
+            metrics.inc('admission_rejected_total', reason='rate_limited')
+            emit('response', {'message': RATE_LIMITED_MESSAGE})
+            return
+
+        # RAG response, streamed as response_delta events when synthesized
+        message_id = data.get('message_id') or uuid.uuid4().hex
+        streamed = []
 
-        # RAG response
-        response = get_rag_response(question)
-        emit('response', {'message': response})
+        def on_delta(delta):
+            streamed.append(delta)
+            emit('response_delta', {'id': message_id, 'delta': delta})
+
+        # The embedding and synthesis calls inside take an upstream slot (cached
+        # and BM25-decided answers don't); shed fast when none is free
+        try:
+            kind, response = answer_question(question, page_links_for(keyword_hits), on_delta)
+        except Overloaded as e:
+            outcome = 'shed'
+            metrics.inc('admission_rejected_total', reason=e.reason)
+            emit('response', {'message': BUSY_MESSAGE})
+            return
+        outcome = RAG_OUTCOMES.get(kind, 'rag_hit')
+        if streamed:
+            emit('response_done', {'id': message_id, 'message': response})
+        else:
+            emit('response', {'message': response})
 
     except Exception as e:
         app.logger.error(f"SocketIO error: {e}")
         emit('response', {'message': 'Server error'})
+    finally:
+        metrics.observe('chat_request_seconds', time.perf_counter() - started, outcome=outcome)
 
 # Main entry point
 if __name__ == '__main__':
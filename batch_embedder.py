@@ -0,0 +1,141 @@
+# --- Batched, concurrent embedding for the build scripts ---
+#
+# Packs texts into multi-input embeddings requests up to a token budget and
+# input count, and keeps a bounded number of those requests in flight at
+# once. A rate-limit or transient error pauses every worker (honouring
+# Retry-After) instead of letting them all hammer the API, and each finished
+# batch is handed to on_batch straight away, so the caller can checkpoint it
+# to disk and an interrupted build picks up where it stopped.
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+from openai import APIConnectionError, APITimeoutError, RateLimitError, InternalServerError, BadRequestError
+
+logger = logging.getLogger(__name__)
+
+BATCH_TOKENS     = int(os.getenv("EMBED_BATCH_TOKENS", "100000"))
+BATCH_INPUTS     = int(os.getenv("EMBED_BATCH_INPUTS", "256"))
+CONCURRENCY      = int(os.getenv("EMBED_CONCURRENCY", "4"))
+MAX_RETRIES      = int(os.getenv("EMBED_MAX_RETRIES", "6"))
+MAX_INPUT_TOKENS = 8191
+BACKOFF_BASE     = 1.0
+BACKOFF_CAP      = 60.0
+
+RETRYABLE = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text):
+        return len(_encoding.encode(text))
+except ImportError:
+    def count_tokens(text):
+        # Conservative estimate (~3 characters per token) when tiktoken is absent
+        return len(text) // 3 + 1
+
+
+def pack_batches(token_counts, max_tokens=BATCH_TOKENS, max_inputs=BATCH_INPUTS):
+    """Group text positions greedily into batches within both limits."""
+    batches, current, current_tokens = [], [], 0
+    for pos, tokens in enumerate(token_counts):
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(pos)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class _Backoff:
+    """Shared pause: one worker's rate-limit error holds back all of them."""
+
+    def __init__(self):
+        self._until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        delay = self._until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, error, attempt):
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("retry-after", 0)))
+            except (TypeError, ValueError):
+                pass
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + min(delay, BACKOFF_CAP))
+        return delay
+
+
+def embed_texts(texts, model, token_counts=None, embed_fn=None, on_batch=None,
+                max_tokens=BATCH_TOKENS, max_inputs=BATCH_INPUTS, concurrency=CONCURRENCY):
+    """Return one vector per text (None for texts that could not be embedded).
+
+    embed_fn(input=[...], model=...) defaults to openai.embeddings.create;
+    on_batch(texts, vectors) is called as each batch completes. Texts over
+    the model's per-input limit are skipped. Retries that run out re-raise
+    once the in-flight batches have finished, so their results are kept.
+    """
+    embed_fn = embed_fn or openai.embeddings.create
+    if token_counts is None:
+        token_counts = [count_tokens(text) for text in texts]
+
+    vectors = [None] * len(texts)
+    positions = []
+    for pos, tokens in enumerate(token_counts):
+        if tokens > MAX_INPUT_TOKENS:
+            print(f"Skipping chunk (too many tokens: {tokens}): {texts[pos][:50]}...")
+        else:
+            positions.append(pos)
+
+    batches = [[positions[i] for i in batch]
+               for batch in pack_batches([token_counts[p] for p in positions], max_tokens, max_inputs)]
+    backoff = _Backoff()
+
+    def request(batch):
+        attempt = 0
+        while True:
+            backoff.wait()
+            try:
+                response = embed_fn(input=[texts[p] for p in batch], model=model)
+                return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+            except RETRYABLE as e:
+                if attempt >= MAX_RETRIES:
+                    raise
+                delay = backoff.pause(e, attempt)
+                logger.warning(f"Embedding batch {type(e).__name__}, retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+                attempt += 1
+
+    def run(batch):
+        try:
+            embedded = request(batch)
+        except BadRequestError as e:
+            if len(batch) == 1:
+                print(f"Error generating embedding for chunk: {texts[batch[0]][:50]}... - {e}")
+                return
+            # Isolate the offending input(s) instead of losing the whole batch
+            for pos in batch:
+                run([pos])
+            return
+        for pos, vec in zip(batch, embedded):
+            vectors[pos] = vec
+        if on_batch is not None:
+            on_batch([texts[p] for p in batch], embedded)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(run, batch) for batch in batches]
+    for future in futures:
+        future.result()
+    return vectors
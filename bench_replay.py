@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# --- Offline replay benchmark for the chat path ---
+#
+# Replays bench_questions.txt through handle_message (via the Socket.IO test
+# client, so emits and streaming are included) and through get_rag_response,
+# with OpenAI replaced by openai_standin's fixed-latency local fake. Reports
+# p50/p95/p99 latency and throughput per outcome and per pipeline stage (from
+# the same metrics.py timers /metrics uses) and saves everything as JSON so
+# two commits can be compared:
+#
+#   python bench_replay.py                          # -> bench_results/<commit>.json
+#   python bench_replay.py --compare bench_results/abc1234.json
+#   python bench_replay.py --record bench_vectors.npz   # real embeddings, needs OPENAI_API_KEY
+#   python bench_replay.py --vectors bench_vectors.npz  # replay with recorded vectors
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUESTIONS_FILE = os.path.join(BASE_DIR, "bench_questions.txt")
+RESULTS_DIR = os.path.join(BASE_DIR, "bench_results")
+
+
+def load_questions(path=QUESTIONS_FILE):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def summarize(samples, wall_seconds):
+    """Latency percentiles in milliseconds plus throughput over the phase."""
+    values = np.asarray(samples, dtype=np.float64) * 1000.0
+    if not len(values):
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(len(values)),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "per_sec": len(values) / wall_seconds if wall_seconds else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def record_vectors(questions, path, model="text-embedding-3-small"):
+    """Embed the corpus with the real API and save it for --vectors replays."""
+    from embed_cache import normalize_question
+    from openai_client import create_embeddings
+
+    response = create_embeddings(questions, model)
+    vectors = np.asarray([d.embedding for d in sorted(response.data, key=lambda d: d.index)], dtype=np.float32)
+    np.savez(path, questions=np.asarray([normalize_question(q) for q in questions]), vectors=vectors)
+    print(f"✅ Recorded {len(questions)} vectors to {path}")
+
+
+def run_phase(questions, concurrency, fn, samples):
+    """Run fn(question) for every question on a green pool; return wall seconds."""
+    import eventlet
+
+    samples.clear()
+    pool = eventlet.GreenPool(concurrency)
+    start = time.perf_counter()
+    for _ in pool.imap(fn, questions):
+        pass
+    return time.perf_counter() - start
+
+
+def phase_report(samples, wall_seconds, total_name):
+    """Per-stage and per-outcome summaries; "latency" covers every total_name sample."""
+    report = {"wall_seconds": wall_seconds, "stages": {}, "outcomes": {}}
+    for (name, labels), values in sorted(samples.items()):
+        labels = dict(labels)
+        if name == "chat_stage_seconds":
+            report["stages"][labels["stage"]] = summarize(values, wall_seconds)
+        elif name == "chat_request_seconds":
+            report["outcomes"][labels["outcome"]] = summarize(values, wall_seconds)
+    report["latency"] = summarize(
+        [v for (name, _), values in samples.items() if name == total_name for v in values], wall_seconds)
+    return report
+
+
+def run_benchmark(questions, repeat, concurrency):
+    # The app reads these at import time: local stand-in, throwaway caches,
+    # no background flushing or index watching
+    os.environ["OPENAI_STANDIN"] = "1"
+    os.environ.setdefault("OPENAI_API_KEY", "standin")
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench-")
+    os.environ["METRICS_FLUSH_INTERVAL"] = "0"
+    os.environ["KB_RELOAD_INTERVAL"] = "0"
+    os.environ["CHAT_RATE_PER_MIN"] = "0"  # every replayed message shares one session
+
+    import app
+    import metrics
+
+    samples = {}
+
+    def listener(name, seconds, labels):
+        samples.setdefault((name, tuple(sorted(labels.items()))), []).append(seconds)
+
+    metrics.registry.add_listener(listener)
+    corpus = questions * repeat
+
+    def chat(question):
+        client = app.socketio.test_client(app.app)
+        client.emit("message", {"message": question, "session_id": "bench"})
+        client.disconnect()
+
+    wall = run_phase(corpus, concurrency, chat, samples)
+    chat_report = phase_report(samples, wall, "chat_request_seconds")
+
+    def rag(question):
+        start = time.perf_counter()
+        app.get_rag_response(question)
+        listener("get_rag_response_seconds", time.perf_counter() - start, {})
+
+    wall = run_phase(corpus, concurrency, rag, samples)
+    rag_report = phase_report(samples, wall, "get_rag_response_seconds")
+
+    return {"handle_message": chat_report, "get_rag_response": rag_report}
+
+
+def print_report(results, baseline=None):
+    def row(label, stats, base):
+        if not stats.get("count"):
+            return
+        line = (f"  {label:<28} {stats['count']:>6} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                f"{stats['p99_ms']:>9.2f} {stats['per_sec']:>9.1f}")
+        if base and base.get("count"):
+            change = lambda key: (stats[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+            line += f"   p95 {change('p95_ms'):+6.1f}%  rate {change('per_sec'):+6.1f}%"
+        print(line)
+
+    for phase, report in results["phases"].items():
+        base = (baseline or {}).get("phases", {}).get(phase, {})
+        print(f"\n{phase} ({report['wall_seconds']:.2f}s wall)")
+        print(f"  {'series':<28} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'per sec':>9}")
+        row("total", report["latency"], base.get("latency"))
+        for outcome, stats in report["outcomes"].items():
+            row(f"outcome:{outcome}", stats, base.get("outcomes", {}).get(outcome))
+        for stage, stats in report["stages"].items():
+            row(f"stage:{stage}", stats, base.get("stages", {}).get(stage))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline replay benchmark for handle_message/get_rag_response")
+    parser.add_argument("--questions", default=QUESTIONS_FILE)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus (later passes hit caches)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="stand-in seconds per embeddings call")
+    parser.add_argument("--chat-latency", type=float, default=0.3, help="stand-in seconds to first token")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="stand-in seconds per streamed token")
+    parser.add_argument("--vectors", help="recorded question vectors (.npz) for the stand-in")
+    parser.add_argument("--record", metavar="NPZ", help="embed the corpus with the real API and exit")
+    parser.add_argument("--out", help="results file (default bench_results/<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare against")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    if args.record:
+        record_vectors(questions, args.record)
+        return
+
+    os.environ["STANDIN_EMBED_LATENCY"] = str(args.embed_latency)
+    os.environ["STANDIN_CHAT_LATENCY"] = str(args.chat_latency)
+    os.environ["STANDIN_TOKEN_LATENCY"] = str(args.token_latency)
+    if args.vectors:
+        os.environ["STANDIN_VECTORS"] = os.path.abspath(args.vectors)
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "questions": len(questions),
+            "repeat": args.repeat,
+            "concurrency": args.concurrency,
+            "embed_latency": args.embed_latency,
+            "chat_latency": args.chat_latency,
+            "token_latency": args.token_latency,
+            "vectors": bool(args.vectors),
+            "python": sys.version.split()[0],
+        },
+        "phases": run_benchmark(questions, args.repeat, args.concurrency),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Comparing against {baseline.get('commit')} ({args.compare})")
+    print_report(results, baseline)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,26 @@
 import os
-import openai
-import faiss
-import pickle
-import numpy as np
-from tqdm import tqdm
+import sys
 
-# ─── Configuration ───────────────────────────────────────────────────────────
-EMB_MODEL  = "text-embedding-3-small"
-INDEX_PATH = "kb_index.faiss"
-META_PATH  = "kb_meta.pkl"
-KB_FOLDER  = "kb_chunks"
-
-# ─── Load environment & OpenAI key ───────────────────────────────────────────
-from dotenv import load_dotenv
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+from kb_index import load_index, IndexFormatError
+from retrieval import write_faiss_index, BACKENDS
 
-# ─── Read all KB chunk files ──────────────────────────────────────────────────
-texts, keys = [], []
-for fname in sorted(os.listdir(KB_FOLDER)):
-    path = os.path.join(KB_FOLDER, fname)
-    if os.path.isfile(path):
-        with open(path, encoding="utf-8") as f:
-            texts.append(f.read())
-            keys.append(fname)
-
-if not texts:
-    raise ValueError(f"No files found in {KB_FOLDER}/")
+# ─── Configuration ───────────────────────────────────────────────────────────
+BASE_DIR   = os.path.dirname(os.path.abspath(__file__))
+INDEX_KIND = os.getenv("FAISS_INDEX_KIND", "faiss-hnsw")  # faiss-flat | faiss-ivf | faiss-hnsw
 
-# ─── Embed each chunk ─────────────────────────────────────────────────────────
-print(f"Embedding {len(texts)} documents with model {EMB_MODEL}…")
-embeddings = []
-for txt in tqdm(texts, desc="Embedding"):
-    resp = openai.Embedding.create(model=EMB_MODEL, input=txt)
-    embeddings.append(resp["data"][0]["embedding"])
+if INDEX_KIND not in BACKENDS or INDEX_KIND == "exact":
+    sys.exit(f"❌ FAISS_INDEX_KIND must be faiss-flat, faiss-ivf or faiss-hnsw, got {INDEX_KIND!r}")
 
-# ─── Build FAISS index ───────────────────────────────────────────────────────
-dim = len(embeddings[0])
-index = faiss.IndexFlatL2(dim)
-index.add(np.array(embeddings, dtype="float32"))
-faiss.write_index(index, INDEX_PATH)
-print(f"✅ FAISS index saved to {INDEX_PATH}")
+# ─── Load the app's index (written by generate_embeddings / build_index_local) ─
+# Only the FAISS file is written here; the chatbot's matrix, metadata and
+# manifest are left exactly as they are, so FAISS row ids match them.
+try:
+    kb = load_index(BASE_DIR)
+except (OSError, IndexFormatError) as e:
+    sys.exit(f"❌ Could not load the index in {BASE_DIR}: {e}")
+print(f"Indexing {len(kb)} rows × {kb.dim} dims ({kb.model})…")
 
-# ─── Save metadata ───────────────────────────────────────────────────────────
-with open(META_PATH, "wb") as f:
-    pickle.dump((keys, texts), f)
-print(f"✅ Metadata saved to {META_PATH}")
+# ─── Build FAISS index over the same normalized rows the app loads ───────────
+path = write_faiss_index(kb, INDEX_KIND, BASE_DIR)
+print(f"✅ FAISS {INDEX_KIND} index saved to {path}")
+print(f"   Used by workers with RETRIEVAL_BACKEND={INDEX_KIND} from their next index load")
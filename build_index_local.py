@@ -3,20 +3,19 @@ import os
 import sys
 import io
 import contextlib
-import pickle
 
-import numpy as np
 import openai
 import pdfplumber
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+from kb_index import write_index
+from embedding_store import EmbeddingStore, format_report
+from batch_embedder import embed_texts, count_tokens
+
 # Load OpenAI key
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
-if not openai.api_key:
-    print("ERROR: OPENAI_API_KEY not set in .env")
-    sys.exit(1)
 
 # Settings
 BASE_DIR    = os.path.dirname(os.path.abspath(__file__))
@@ -24,8 +23,6 @@ KB_FOLDER   = os.path.join(BASE_DIR, "kb_chunks")
 EMB_MODEL   = "text-embedding-3-small"
 VALID_EXT   = {".txt", ".md", ".pdf"}
 CHUNK_CHARS = 4000
-OUT_EMB     = os.path.join(BASE_DIR, "embeddings.pkl")
-OUT_META    = os.path.join(BASE_DIR, "metadata.pkl")
 
 def extract_pdf_pages(path):
     """Extract text from each PDF page, suppressing warnings."""
@@ -42,43 +39,66 @@ def chunk_text(text, max_chars=CHUNK_CHARS):
     for i in range(0, len(text), max_chars):
         yield text[i:i+max_chars]
 
-# Prepare storage
-embeddings = []  # list of numpy arrays
-metadata   = []  # list of dicts
-
-# Loop through files
-for fname in tqdm(sorted(os.listdir(KB_FOLDER)), desc="Indexing"):
-    ext = os.path.splitext(fname)[1].lower()
-    if ext not in VALID_EXT:
-        continue
-    path = os.path.join(KB_FOLDER, fname)
-
-    # Extract raw text blobs
-    if ext == ".pdf":
-        blobs = extract_pdf_pages(path)
-    else:
-        with open(path, encoding="utf-8") as f:
-            blobs = [f.read()]
-
-    # Chunk & embed each blob
-    for page_idx, blob in enumerate(blobs):
-        if not blob.strip():
+def load_chunks(folder=KB_FOLDER):
+    """Return a metadata dict for every chunk of every supported file in folder."""
+    metadata = []  # list of dicts
+
+    # Loop through files
+    for fname in tqdm(sorted(os.listdir(folder)), desc="Chunking"):
+        ext = os.path.splitext(fname)[1].lower()
+        if ext not in VALID_EXT:
             continue
-        for chunk_idx, chunk in enumerate(chunk_text(blob)):
-            resp = openai.embeddings.create(model=EMB_MODEL, input=chunk)
-            vec  = np.array(resp.data[0].embedding, dtype="float32")
-            embeddings.append(vec)
-            metadata.append({
-                "source": fname,
-                "page": page_idx,
-                "chunk": chunk_idx,
-                "text": chunk
-            })
-
-# Save embeddings and metadata
-with open(OUT_EMB, "wb") as f:
-    pickle.dump(embeddings, f)
-with open(OUT_META, "wb") as f:
-    pickle.dump(metadata, f)
-
-print("✅ Embeddings and metadata saved!")
+        path = os.path.join(folder, fname)
+
+        # Extract raw text blobs
+        if ext == ".pdf":
+            blobs = extract_pdf_pages(path)
+        else:
+            with open(path, encoding="utf-8") as f:
+                blobs = [f.read()]
+
+        # Chunk each blob
+        for page_idx, blob in enumerate(blobs):
+            if not blob.strip():
+                continue
+            for chunk_idx, chunk in enumerate(chunk_text(blob)):
+                metadata.append({
+                    "source": fname,
+                    "page": page_idx,
+                    "chunk": chunk_idx,
+                    "text": chunk,
+                    "tokens": count_tokens(chunk)
+                })
+    return metadata
+
+def main():
+    if not openai.api_key:
+        print("ERROR: OPENAI_API_KEY not set in .env")
+        sys.exit(1)
+
+    metadata = load_chunks()
+
+    # Embed only chunks the embedding store hasn't seen, in checkpointed batches
+    store = EmbeddingStore()
+    items = [(f"{m['source']}::p{m['page']}::c{m['chunk']}", m["text"]) for m in metadata]
+    token_counts = {m["text"]: m["tokens"] for m in metadata}
+    embeddings, report = store.sync(
+        "build_index_local", items, EMB_MODEL,
+        lambda texts: embed_texts(texts, EMB_MODEL, token_counts=[token_counts[t] for t in texts],
+                                  on_batch=store.checkpoint(EMB_MODEL)),
+    )
+    store.close()
+    print(format_report(report))
+
+    # Drop chunks that could not be embedded (e.g. over the per-input token limit)
+    kept = [(emb, meta) for emb, meta in zip(embeddings, metadata) if emb is not None]
+    embeddings = [emb for emb, _ in kept]
+    metadata = [meta for _, meta in kept]
+
+    # Save normalized embedding matrix, metadata and manifest
+    manifest = write_index(embeddings, metadata, EMB_MODEL, out_dir=BASE_DIR)
+
+    print(f"✅ Index saved ({manifest['rows']} chunks, dim {manifest['dim']})!")
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ import pdfplumber
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+from embedding_store import EmbeddingStore, format_report
+from batch_embedder import embed_texts
+
 # ─── Load env & sanity-check keys & env ───────────────────────────────────────
 load_dotenv()
 
@@ -86,8 +89,9 @@ def chunk_text(text, max_chars=CHUNK_CHARS):
     for i in range(0, len(text), max_chars):
         yield text[i:i + max_chars]
 
-# ─── Upsert each chunk into Pinecone ─────────────────────────────────────────
-for fname in tqdm(sorted(os.listdir(KB_FOLDER)), desc="Indexing"):
+# ─── Chunk every file ────────────────────────────────────────────────────────
+items, chunk_meta = [], {}
+for fname in tqdm(sorted(os.listdir(KB_FOLDER)), desc="Chunking"):
     ext = os.path.splitext(fname)[1].lower()
     if ext not in VALID_EXT:
         print(f"  – Skipping unsupported file: {fname}")
@@ -102,20 +106,38 @@ for fname in tqdm(sorted(os.listdir(KB_FOLDER)), desc="Indexing"):
             with open(path, "r", encoding="utf-8") as f:
                 blobs = [f.read()]
 
-        # Chunk & embed each blob
         for page_idx, blob in enumerate(blobs):
             if not blob.strip():
                 continue
             for chunk_idx, chunk in enumerate(chunk_text(blob)):
-                resp = openai.embeddings.create(model=EMB_MODEL, input=chunk)
-                vector = resp.data[0].embedding
-
                 upsert_id = f"{fname}::p{page_idx}::c{chunk_idx}"
-                metadata = {"source": fname, "page": page_idx, "chunk": chunk_idx}
-
-                index.upsert([(upsert_id, vector, metadata)])
+                items.append((upsert_id, chunk))
+                chunk_meta[upsert_id] = {"source": fname, "page": page_idx, "chunk": chunk_idx}
 
     except Exception as e:
         print(f"  – Skipping {fname} due to error: {e}")
 
-print("✅ Pinecone index populated!")
+# ─── Embed only new or changed chunks, in checkpointed batches ───────────────
+# Membership is committed only after Pinecone has the changes, so a failed
+# upsert leaves these ids "changed" and the next run pushes them again
+store = EmbeddingStore()
+vectors, report = store.sync(
+    "pinecone", items, EMB_MODEL,
+    lambda texts: embed_texts(texts, EMB_MODEL, on_batch=store.checkpoint(EMB_MODEL)),
+    commit=False,
+)
+
+# ─── Upsert changed chunks & delete vanished ones ────────────────────────────
+by_id = {upsert_id: vec for (upsert_id, _), vec in zip(items, vectors) if vec is not None}
+changed = report["changed_ids"]
+for start in range(0, len(changed), 100):
+    batch = changed[start:start + 100]
+    index.upsert([(upsert_id, by_id[upsert_id].tolist(), chunk_meta[upsert_id]) for upsert_id in batch])
+for start in range(0, len(report["vanished_ids"]), 1000):
+    index.delete(ids=report["vanished_ids"][start:start + 1000])
+
+store.commit_members("pinecone", report)
+store.close()
+print(format_report(report))
+
+print(f"✅ Pinecone index updated ({len(changed)} upserted, {len(report['vanished_ids'])} deleted)!")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+import os
+import sys
+import openai
+from dotenv import load_dotenv
+
+from kb_index import write_index
+from static_qas import STATIC_QAS, STATIC_QA_PARAPHRASES
+
+# Load OpenAI key
+load_dotenv()
+openai.api_key = os.getenv("OPENAI_API_KEY")
+if not openai.api_key:
+    print("ERROR: OPENAI_API_KEY not set in .env")
+    sys.exit(1)
+
+# Settings (model must match app.py)
+BASE_DIR  = os.path.dirname(os.path.abspath(__file__))
+OUT_DIR   = os.path.join(BASE_DIR, "static_index")
+EMB_MODEL = "text-embedding-3-small"
+BATCH     = 256
+
+# One row per STATIC_QAS key plus one per extra paraphrase
+phrases = [(key, key) for key in STATIC_QAS]
+for key, extras in STATIC_QA_PARAPHRASES.items():
+    if key not in STATIC_QAS:
+        print(f"  – Skipping paraphrases for unknown key: {key}")
+        continue
+    phrases.extend((key, text) for text in extras)
+
+print(f"Embedding {len(phrases)} static phrases with model {EMB_MODEL}…")
+embeddings = []
+for start in range(0, len(phrases), BATCH):
+    batch = [text for _, text in phrases[start:start + BATCH]]
+    resp = openai.embeddings.create(model=EMB_MODEL, input=batch)
+    embeddings.extend(d.embedding for d in sorted(resp.data, key=lambda d: d.index))
+
+os.makedirs(OUT_DIR, exist_ok=True)
+metadata = [{"key": key, "text": text} for key, text in phrases]
+manifest = write_index(embeddings, metadata, EMB_MODEL, out_dir=OUT_DIR)
+print(f"✅ Static answer index saved to {OUT_DIR} ({manifest['rows']} rows)")
@@ -0,0 +1,63 @@
+# --- Token-budgeted prompt context ---
+#
+# Picks which retrieved chunks go into the prompt. Candidates arrive best
+# first; each is added if it fits the remaining token budget (token counts are
+# stored in the metadata at index-build time, counted here only for older
+# indexes) and is not mostly a repeat of text already chosen, e.g. an
+# overlapping window or the same paragraph scraped from two pages. The chosen
+# chunks are then emitted in index order rather than score order, so the same
+# set of chunks always produces the same prompt prefix and the provider's
+# prompt cache can reuse it.
+import os
+import re
+
+from batch_embedder import count_tokens
+
+TOKEN_BUDGET  = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+DEDUP_OVERLAP = float(os.getenv("CONTEXT_DEDUP_OVERLAP", "0.8"))
+SHINGLE_WORDS = 5
+SEPARATOR     = "\n\n---\n\n"
+SEPARATOR_TOKENS = 3
+
+_WORD = re.compile(r"\w+")
+
+
+def chunk_tokens(chunk):
+    tokens = chunk.get("tokens")
+    return tokens if tokens is not None else count_tokens(chunk.get("text", ""))
+
+
+def shingles(text, n=SHINGLE_WORDS):
+    """Overlapping n-word sequences of text, lowercased."""
+    words = _WORD.findall(text.lower())
+    if len(words) < n:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def select_chunks(metadata, ids, budget=TOKEN_BUDGET, max_chunks=None, overlap=DEDUP_OVERLAP):
+    """Return (row ids in index order, tokens used) for the chunks to send.
+
+    ids are candidates, best first. The best chunk is always kept, even when
+    it alone is over budget, so a large chunk still gets answered from.
+    """
+    chosen, seen, used = [], set(), 0
+    for i in ids:
+        i = int(i)
+        chunk = metadata[i]
+        grams = shingles(chunk.get("text", ""))
+        if not grams or len(grams & seen) >= overlap * len(grams):
+            continue
+        cost = chunk_tokens(chunk) + SEPARATOR_TOKENS
+        if chosen and used + cost > budget:
+            continue
+        chosen.append(i)
+        seen |= grams
+        used += cost
+        if max_chunks and len(chosen) >= max_chunks:
+            break
+    return sorted(chosen), used
+
+
+def build_context(chunks):
+    return SEPARATOR.join(chunk.get("text", "") for chunk in chunks)
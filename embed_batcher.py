@@ -0,0 +1,103 @@
+# --- Micro-batching embedding dispatcher ---
+#
+# Questions that arrive within a short window (or until max_batch is reached)
+# are sent as one multi-input embeddings request, and each waiting caller gets
+# its own row back. An optional postprocess hook sees the whole batch matrix,
+# so the similarity step can run as one matrix-matrix product too. Under
+# eventlet the dispatcher and senders are greenlets; elsewhere they are threads.
+import os
+import time
+import logging
+import threading
+
+from kb_index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    __slots__ = ("text", "done", "result", "error")
+
+    def __init__(self, text):
+        self.text = text
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class EmbeddingDispatcher:
+    def __init__(self, embed_fn, model, window_ms=5, max_batch=64, postprocess=None):
+        self.embed_fn = embed_fn
+        self.model = model
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.postprocess = postprocess
+
+        self._pending = []
+        self._cond = threading.Condition()
+        self._worker_pid = None
+
+        self.batches = 0
+        self.batched_questions = 0
+
+    # Threads don't survive fork, so start the collector lazily in each worker
+    def _ensure_worker(self):
+        if self._worker_pid != os.getpid():
+            self._worker_pid = os.getpid()
+            threading.Thread(target=self._collect, name="embed-dispatcher", daemon=True).start()
+
+    def submit(self, text):
+        """Block until text has been embedded; return its row (or postprocess result)."""
+        item = _Pending(text)
+        with self._cond:
+            self._ensure_worker()
+            self._pending.append(item)
+            self._cond.notify()
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _collect(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            # Send in its own thread so the next window can fill meanwhile
+            threading.Thread(target=self._send, args=(batch,), daemon=True).start()
+
+    def _send(self, batch):
+        try:
+            # Identical questions in one window share a single input slot
+            texts = list(dict.fromkeys(item.text for item in batch))
+            response = self.embed_fn(input=texts, model=self.model)
+            rows = sorted(response.data, key=lambda d: d.index)
+            matrix = normalize_rows([d.embedding for d in rows])
+            results = self.postprocess(matrix) if self.postprocess else list(matrix)
+            by_text = dict(zip(texts, results))
+            for item in batch:
+                item.result = by_text[item.text]
+            self.batches += 1
+            self.batched_questions += len(batch)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+            for item in batch:
+                item.error = e
+        finally:
+            for item in batch:
+                item.done.set()
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "batched_questions": self.batched_questions,
+            "avg_batch_size": self.batched_questions / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,158 @@
+# --- Query embedding cache ---
+#
+# Two tiers in front of the OpenAI embeddings call: an in-process LRU and a
+# SQLite table shared by every worker on the box. Keys are (model, normalized
+# question), so "What are the fees?" and "what are the fees" share one vector.
+import os
+import re
+import time
+import logging
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text):
+    """Case-fold, collapse whitespace and drop surrounding punctuation."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _WHITESPACE.sub(" ", text)
+    return text.strip(" ?!.,;:'\"")
+
+
+class EmbeddingCache:
+    def __init__(self, db_path, model, memory_size=1024, max_rows=50000,
+                 ttl_seconds=30 * 24 * 3600, prune_every=500):
+        self.db_path = db_path
+        self.model = model
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self.prune_every = prune_every
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._disk_ok = True
+        self._puts = 0
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self._miss_seconds = 0.0
+
+    # SQLite connections must not cross a fork, so open one per process
+    def _db(self):
+        if not self._disk_ok:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS query_embeddings (
+                        model TEXT NOT NULL,
+                        question TEXT NOT NULL,
+                        vector BLOB NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (model, question)
+                    )
+                ''')
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_query_embeddings_created ON query_embeddings (created_at)")
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache disk tier disabled ({self.db_path}): {e}")
+                self._disk_ok = False
+                return None
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, question):
+        """Return the cached unit vector for question, or None."""
+        key = normalize_question(question)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return vector
+
+            row = None
+            db = self._db()
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT vector, created_at FROM query_embeddings WHERE model = ? AND question = ?",
+                        (self.model, key),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding cache read failed: {e}")
+            if row is not None and time.time() - row[1] <= self.ttl_seconds:
+                vector = np.frombuffer(row[0], dtype=np.float32)
+                self._remember(key, vector)
+                self.hits_disk += 1
+                return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, question, vector, fetch_seconds=0.0):
+        """Store a unit vector; fetch_seconds is how long the upstream call took."""
+        key = normalize_question(question)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._miss_seconds += fetch_seconds
+            self._remember(key, vector)
+            db = self._db()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (model, question, vector, created_at) VALUES (?, ?, ?, ?)",
+                    (self.model, key, vector.tobytes(), time.time()),
+                )
+                self._puts += 1
+                if self._puts % self.prune_every == 0:
+                    self._prune(db)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+    def _prune(self, db):
+        """Drop expired rows, then the oldest rows beyond max_rows."""
+        db.execute("DELETE FROM query_embeddings WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        db.execute('''
+            DELETE FROM query_embeddings WHERE rowid IN (
+                SELECT rowid FROM query_embeddings ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+        ''', (self.max_rows,))
+
+    def stats(self):
+        hits = self.hits_memory + self.hits_disk
+        lookups = hits + self.misses
+        avg_miss = self._miss_seconds / self.misses if self.misses else 0.0
+        return {
+            "model": self.model,
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "avg_miss_seconds": avg_miss,
+            "estimated_seconds_saved": hits * avg_miss,
+            "embedding_calls_saved": hits,
+        }
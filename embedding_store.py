@@ -0,0 +1,173 @@
+# --- Persistent, content-addressed embedding store for the build scripts ---
+#
+# Each chunk is keyed by sha256(model + text), so a rebuild only embeds chunks
+# that are new or changed and reuses every other vector from disk. Each build
+# script syncs its own namespace (its current list of item ids and texts);
+# items that are new, changed or vanished in a namespace are reported back
+# (e.g. to upsert into or delete from Pinecone). Vectors a namespace dropped
+# that no namespace references any more are deleted. Batches can be
+# checkpointed as they are embedded, so a build interrupted half way resumes
+# instead of starting over; such unattached checkpoints are only collected
+# once they are older than ORPHAN_MAX_DAYS.
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+
+BASE_DIR     = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(BASE_DIR, "embedding_store.db")
+ORPHAN_MAX_DAYS = float(os.getenv("EMBED_STORE_ORPHAN_DAYS", "30"))
+
+
+def content_key(text, model):
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        # Batches may be checkpointed from the embedder's worker threads
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS vectors (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS members (
+                    namespace TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (namespace, item_id)
+                )
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_members_key ON members (key)")
+
+    def get_many(self, keys):
+        """Return {key: float32 vector} for the keys already stored."""
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items, model):
+        """Store (key, vector) pairs; commits immediately so progress survives a crash."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, model, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(key, model, len(vec), np.asarray(vec, dtype=np.float32).tobytes(), now) for key, vec in items],
+            )
+
+    def checkpoint(self, model):
+        """Return an on_batch(texts, vectors) callback that stores each batch as it lands."""
+        def on_batch(texts, vectors):
+            with self._lock:
+                self.put_many([(content_key(text, model), vec) for text, vec in zip(texts, vectors)], model)
+        return on_batch
+
+    def sync(self, namespace, items, model, embed_fn, commit=True):
+        """Return (vectors, report) for items, a list of (item_id, text).
+
+        embed_fn(texts) -> list of vectors (None for failures) is only called
+        for texts not already stored. Failed items get a None vector; a new
+        one is left out of the namespace, while one already in it keeps its
+        previous key (so it is neither changed nor vanished). With
+        commit=False the namespace membership is left as it was until
+        commit_members(namespace, report) is called, e.g. once the changed
+        ids have been pushed somewhere that can fail.
+        """
+        keys = [content_key(text, model) for _, text in items]
+        stored = self.get_many(set(keys))
+
+        missing = {}
+        for key, (_, text) in zip(keys, items):
+            if key not in stored:
+                missing.setdefault(key, text)
+        failed = 0
+        if missing:
+            embedded = embed_fn(list(missing.values()))
+            fresh = [(key, vec) for key, vec in zip(missing, embedded) if vec is not None]
+            failed = len(missing) - len(fresh)
+            self.put_many(fresh, model)
+            stored.update((key, np.asarray(vec, dtype=np.float32)) for key, vec in fresh)
+
+        vectors = [stored.get(key) for key in keys]
+        previous = dict(self.conn.execute(
+            "SELECT item_id, key FROM members WHERE namespace = ?", (namespace,)).fetchall())
+        current = {}
+        for (item_id, _), key, vec in zip(items, keys, vectors):
+            if vec is not None:
+                current[item_id] = key
+            elif item_id in previous:
+                # Changed but failed to embed: keep the old vector until it does
+                current[item_id] = previous[item_id]
+
+        report = {
+            "items": len(items),
+            "reused": sum(1 for key in keys if key not in missing),
+            "embedded": len(missing) - failed,
+            "failed": failed,
+            "deleted_vectors": 0,
+            "changed_ids": [item_id for item_id, key in current.items() if previous.get(item_id) != key],
+            "vanished_ids": sorted(set(previous) - set(current)),
+            "members": current,
+        }
+        if commit:
+            self.commit_members(namespace, report)
+        return vectors, report
+
+    def commit_members(self, namespace, report):
+        """Record report's items as the namespace's members and collect dropped vectors.
+
+        Only keys this namespace referenced before and no namespace references
+        now are deleted; checkpoints no build has claimed yet (an interrupted
+        run in any namespace) are kept until they are ORPHAN_MAX_DAYS old.
+        """
+        members = report["members"]
+        cutoff = time.time() - ORPHAN_MAX_DAYS * 86400
+        with self._lock, self.conn:
+            dropped = {key for (key,) in self.conn.execute(
+                "SELECT key FROM members WHERE namespace = ?", (namespace,))} - set(members.values())
+            self.conn.execute("DELETE FROM members WHERE namespace = ?", (namespace,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO members (namespace, item_id, key) VALUES (?, ?, ?)",
+                [(namespace, item_id, key) for item_id, key in members.items()],
+            )
+            deleted = 0
+            dropped = list(dropped)
+            for start in range(0, len(dropped), 500):
+                batch = dropped[start:start + 500]
+                deleted += self.conn.execute(
+                    f"DELETE FROM vectors WHERE key IN ({','.join('?' * len(batch))}) "
+                    "AND key NOT IN (SELECT key FROM members)", batch,
+                ).rowcount
+            deleted += self.conn.execute(
+                "DELETE FROM vectors WHERE created_at < ? AND key NOT IN (SELECT key FROM members)", (cutoff,)
+            ).rowcount
+        report["deleted_vectors"] = deleted
+        return deleted
+
+    def close(self):
+        self.conn.close()
+
+
+def format_report(report):
+    return (f"♻️  Reused {report['reused']}, embedded {report['embedded']}, failed {report['failed']}, "
+            f"vanished {len(report['vanished_ids'])}, deleted {report['deleted_vectors']} stale vectors")
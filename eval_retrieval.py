@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# --- Retrieval quality vs latency across index configurations ---
+#
+# Builds one index per chunking strategy the build scripts use, over the same
+# kb_chunks/ files, and runs every question in eval_questions.json through the
+# app's retrieval (BM25 + dense search fused by fuse_hybrid, exactly as
+# choose_answer does) for each retrieval backend. One table compares:
+#
+#   recall@k   some chunk from an expected source is in the fused top k
+#   MRR        1 / rank of the first chunk from an expected source
+#   miss@t     nothing clears the relevance bar at similarity threshold t
+#              (the app would answer "Sorry, I couldn't find...")
+#   top1@t     the chunk the app would answer from is from an expected source
+#   size       rows and bytes of the written index
+#   latency    retrieval time per query, query embedding excluded
+#
+#   python eval_retrieval.py                         # real embeddings (cached in the embedding store)
+#   python eval_retrieval.py --backends exact,faiss-hnsw --thresholds 0.5,0.6,0.7
+#   python eval_retrieval.py --standin               # offline smoke run, synthetic vectors
+import os
+import json
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+from kb_index import write_index, load_index, BASE_DIR, VECTORS_FILE, METADATA_FILE
+from kb_reload import KBSnapshot
+from retrieval import make_backend
+from lexical_index import BM25Index, fuse_hybrid
+from embedding_store import EmbeddingStore, format_report
+
+EMB_MODEL         = "text-embedding-3-small"
+KB_FOLDER         = os.path.join(BASE_DIR, "kb_chunks")
+QUESTIONS_FILE    = os.path.join(BASE_DIR, "eval_questions.json")
+EVAL_DIR          = os.path.join(BASE_DIR, "eval_indexes")
+RAG_TOP_K         = int(os.getenv("RAG_TOP_K", "5"))
+LEXICAL_MIN_SCORE = float(os.getenv("LEXICAL_MIN_SCORE", "4.0"))
+
+
+# ─── Chunking variants (each reuses the build script's own chunker) ─────────
+def read_kb_files(folder):
+    for fname in sorted(os.listdir(folder)):
+        if fname.startswith(".") or not fname.endswith((".txt", ".pdf")):
+            continue
+        path = os.path.join(folder, fname)
+        try:
+            with open(path, encoding="utf-8") as f:
+                yield fname, f.read()
+        except UnicodeDecodeError:
+            with open(path, encoding="latin-1") as f:
+                yield fname, f.read()
+
+
+def paragraphs_600_words(folder):
+    """generate_embeddings.py: paragraphs packed up to 600 words."""
+    from generate_embeddings import load_and_chunk_text
+    return [{"source": c["source"], "text": c["text"]} for c in load_and_chunk_text(folder)]
+
+
+def tokens_500_overlap_50(folder):
+    """site_scraper.py: 500-token windows with 50 tokens of overlap."""
+    from site_scraper import text_to_chunks
+    return [{"source": fname, "text": chunk}
+            for fname, text in read_kb_files(folder) for chunk in text_to_chunks(text)]
+
+
+def chars_4000(folder):
+    """build_index_local.py: 4000-character slices."""
+    from build_index_local import chunk_text
+    return [{"source": fname, "text": chunk}
+            for fname, text in read_kb_files(folder) if text.strip() for chunk in chunk_text(text)]
+
+
+def whole_files(folder):
+    """One chunk per file (what the original build_index.py embedded)."""
+    return [{"source": fname, "text": text} for fname, text in read_kb_files(folder)]
+
+
+VARIANTS = {
+    "paragraphs-600w": paragraphs_600_words,
+    "tokens-500-50": tokens_500_overlap_50,
+    "chars-4000": chars_4000,
+    "whole-file": whole_files,
+}
+
+
+# ─── Embedding (real API through the store, or the offline stand-in) ───────
+def make_embedder(standin):
+    """Return (embed(namespace, texts) -> vectors, model label, close)."""
+    if standin:
+        from openai_standin import StandinClient
+        client = StandinClient(kb_dir=BASE_DIR, embed_latency=0)
+        # Synthetic vectors must never land in the real store
+        store = EmbeddingStore(os.path.join(tempfile.mkdtemp(prefix="eval-"), "store.db"))
+        model = "standin"
+        batch = lambda texts: [client.vector(t) for t in texts]
+    else:
+        from batch_embedder import embed_texts
+        store = EmbeddingStore()
+        model = EMB_MODEL
+        batch = lambda texts: embed_texts(texts, EMB_MODEL, on_batch=store.checkpoint(EMB_MODEL))
+
+    def embed(namespace, texts):
+        items = [(str(i), text) for i, text in enumerate(texts)]
+        vectors, report = store.sync(namespace, items, model, batch)
+        print(f"  {namespace}: {format_report(report)}")
+        return vectors
+
+    return embed, model, store.close
+
+
+# ─── Evaluation ─────────────────────────────────────────────────────────────
+def build_variant(name, chunks, embed, model):
+    vectors = embed(f"eval:{name}", [c["text"] for c in chunks])
+    kept = [(v, c) for v, c in zip(vectors, chunks) if v is not None]
+    out_dir = os.path.join(EVAL_DIR, name)
+    os.makedirs(out_dir, exist_ok=True)
+    write_index([v for v, _ in kept], [c for _, c in kept], model, out_dir=out_dir)
+    size = sum(os.path.getsize(os.path.join(out_dir, f)) for f in (VECTORS_FILE, METADATA_FILE))
+    return out_dir, size
+
+
+def evaluate(snapshot, questions, query_vectors, k, thresholds):
+    sources = [m["source"] for m in snapshot.metadata]
+    recall = reciprocal = 0.0
+    misses = {t: 0 for t in thresholds}
+    top1 = {t: 0 for t in thresholds}
+    timings = []
+
+    for item, vector in zip(questions, query_vectors):
+        expected = set(item["sources"])
+        start = time.perf_counter()
+        lexical = snapshot.lexical_index.search(item["question"], k)
+        dense = snapshot.retriever.search(vector, k)
+        results = {t: fuse_hybrid(dense, lexical, t, LEXICAL_MIN_SCORE) for t in thresholds}
+        timings.append(time.perf_counter() - start)
+
+        fused = results[thresholds[0]][0]
+        ranks = [rank for rank, i in enumerate(fused, 1) if sources[i] in expected]
+        recall += bool(ranks and ranks[0] <= k)
+        reciprocal += 1.0 / ranks[0] if ranks else 0.0
+        for t, (_, relevant) in results.items():
+            if not relevant:
+                misses[t] += 1
+            elif sources[relevant[0]] in expected:
+                top1[t] += 1
+
+    n = len(questions)
+    timings = np.asarray(timings) * 1000.0
+    return {
+        "recall_at_k": recall / n,
+        "mrr": reciprocal / n,
+        "miss_rate": {str(t): misses[t] / n for t in thresholds},
+        "top1_accuracy": {str(t): top1[t] / n for t in thresholds},
+        "latency_p50_ms": float(np.percentile(timings, 50)),
+        "latency_p95_ms": float(np.percentile(timings, 95)),
+    }
+
+
+def print_table(rows, k, thresholds):
+    header = f"{'variant':<16} {'backend':<11} {'chunks':>6} {'MB':>6} {f'R@{k}':>6} {'MRR':>6}"
+    for t in thresholds:
+        header += f" {f'miss@{t}':>9} {f'top1@{t}':>9}"
+    header += f" {'p50 ms':>7} {'p95 ms':>7}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        r = row["results"]
+        line = (f"{row['variant']:<16} {row['backend']:<11} {row['chunks']:>6} {row['bytes'] / 1e6:>6.2f} "
+                f"{r['recall_at_k']:>6.2f} {r['mrr']:>6.2f}")
+        for t in thresholds:
+            line += f" {r['miss_rate'][str(t)]:>9.2f} {r['top1_accuracy'][str(t)]:>9.2f}"
+        line += f" {r['latency_p50_ms']:>7.3f} {r['latency_p95_ms']:>7.3f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare retrieval quality and latency across index configurations")
+    parser.add_argument("--questions", default=QUESTIONS_FILE)
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="comma-separated chunking variants")
+    parser.add_argument("--backends", default="exact", help="comma-separated retrieval backends")
+    parser.add_argument("--thresholds", default="0.5,0.6,0.7", help="dense similarity thresholds to report")
+    parser.add_argument("--k", type=int, default=RAG_TOP_K)
+    parser.add_argument("--standin", action="store_true", help="use synthetic stand-in vectors (no API calls)")
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args()
+
+    with open(args.questions, encoding="utf-8") as f:
+        questions = json.load(f)
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+    embed, model, close = make_embedder(args.standin)
+
+    print(f"Embedding {len(questions)} evaluation questions…")
+    query_vectors = embed("eval:questions", [q["question"] for q in questions])
+    pairs = [(q, v) for q, v in zip(questions, query_vectors) if v is not None]
+    questions = [q for q, _ in pairs]
+    query_vectors = [np.asarray(v, dtype=np.float32) / np.linalg.norm(v) for _, v in pairs]
+
+    rows = []
+    for name in args.variants.split(","):
+        try:
+            chunks = VARIANTS[name](KB_FOLDER)
+        except ImportError as e:
+            print(f"⚠️  Skipping {name}: {e}")
+            continue
+        print(f"Building {name} ({len(chunks)} chunks)…")
+        out_dir, size = build_variant(name, chunks, embed, model)
+        kb = load_index(out_dir)
+        lexical_index = BM25Index([m["text"] for m in kb.metadata])
+        for backend in args.backends.split(","):
+            snapshot = KBSnapshot(kb, make_backend(kb, name=backend), lexical_index)
+            rows.append({
+                "variant": name,
+                "backend": backend,
+                "chunks": len(kb),
+                "bytes": size,
+                "results": evaluate(snapshot, questions, query_vectors, args.k, thresholds),
+            })
+    close()
+
+    print()
+    print_table(rows, args.k, thresholds)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"k": args.k, "thresholds": thresholds, "questions": len(questions), "rows": rows}, f, indent=2)
+        print(f"\n✅ Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
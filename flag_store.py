@@ -0,0 +1,234 @@
+# --- Flagged-question store ---
+#
+# Owns the one SQLite file for human-review flags. Connections are long-lived
+# and in WAL mode, so /review reads never wait on writers. Inserts go onto a
+# queue drained by a background writer that commits them in batches; the
+# commit (and its fsync) runs in eventlet's OS thread pool, so a burst of
+# flagged messages never blocks the event loop.
+import os
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import metrics
+
+try:
+    from eventlet import patcher, tpool
+
+    def _offload(fn, *args):
+        # Only green threads need the pool; from a real OS thread (no
+        # monkey-patching, e.g. scripts and tests) tpool can deadlock
+        if patcher.is_monkey_patched("thread"):
+            return tpool.execute(fn, *args)
+        return fn(*args)
+except ImportError:
+    def _offload(fn, *args):
+        return fn(*args)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+STATUSES = ("open", "answered", "dismissed")
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS flagged_questions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        question TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'open',
+        human_response TEXT,
+        updated_at TEXT
+    )
+'''
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_flagged_questions_timestamp ON flagged_questions (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_flagged_questions_session ON flagged_questions (session_id)",
+    "CREATE INDEX IF NOT EXISTS idx_flagged_questions_status ON flagged_questions (status, timestamp)",
+)
+
+
+def encode_cursor(timestamp, flag_id):
+    return f"{flag_id}:{timestamp}"
+
+
+def decode_cursor(cursor):
+    """Return (timestamp, id) from a cursor string, or None if malformed."""
+    flag_id, _, timestamp = (cursor or "").partition(":")
+    if not flag_id.isdigit() or not timestamp:
+        return None
+    return timestamp, int(flag_id)
+
+
+class _Write:
+    __slots__ = ("sql", "params", "done", "error")
+
+    def __init__(self, sql, params, wait=False):
+        self.sql = sql
+        self.params = params
+        self.done = threading.Event() if wait else None
+        self.error = None
+
+
+class FlagStore:
+    def __init__(self, path, batch_size=100, flush_interval=0.25):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._pid = None
+        self._reader = None
+        self._writer = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def init_schema(self):
+        """Create or migrate the table to SCHEMA_VERSION and build its indexes."""
+        conn = self._connect()
+        try:
+            with conn:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'flagged_questions'"
+                ).fetchone()
+                if exists and version < 1:
+                    # v0 had no primary key, status or indexes; copy rows oldest first
+                    conn.execute("ALTER TABLE flagged_questions RENAME TO flagged_questions_v0")
+                    conn.execute(SCHEMA)
+                    conn.execute('''
+                        INSERT INTO flagged_questions (session_id, question, timestamp)
+                        SELECT COALESCE(session_id, ''), COALESCE(question, ''), COALESCE(timestamp, '')
+                        FROM flagged_questions_v0 ORDER BY timestamp
+                    ''')
+                    conn.execute("DROP TABLE flagged_questions_v0")
+                    logger.info("Migrated flagged_questions to schema v1")
+                conn.execute(SCHEMA)
+                for sql in INDEXES:
+                    conn.execute(sql)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        finally:
+            conn.close()
+
+    # Connections and the writer thread don't survive fork; (re)open per process
+    def _ensure_started(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._reader = self._connect()
+            self._writer = self._connect()
+            threading.Thread(target=self._drain, name="flag-writer", daemon=True).start()
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                with metrics.timer("chat_stage_seconds", stage="flag_commit"):
+                    _offload(self._commit, batch)
+            except Exception as e:
+                logger.error(f"Flag store batch of {len(batch)} failed: {e}")
+                for write in batch:
+                    write.error = e
+            for write in batch:
+                if write.done is not None:
+                    write.done.set()
+
+    def _commit(self, batch):
+        with self._writer:
+            for write in batch:
+                self._writer.execute(write.sql, write.params)
+
+    def _submit(self, sql, params, wait=False):
+        self._ensure_started()
+        write = _Write(sql, params, wait)
+        self._queue.put(write)
+        if wait:
+            write.done.wait()
+            if write.error is not None:
+                raise write.error
+        return write
+
+    def add(self, session_id, question, timestamp):
+        """Queue a flag for the background writer; returns immediately."""
+        self._submit(
+            "INSERT INTO flagged_questions (session_id, question, timestamp) VALUES (?, ?, ?)",
+            (session_id, question, timestamp),
+        )
+
+    def set_status(self, flag_id, status, human_response=None):
+        """Mark one flag answered/dismissed (or re-open it); waits for the commit."""
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+        self._submit(
+            "UPDATE flagged_questions SET status = ?, human_response = COALESCE(?, human_response), "
+            "updated_at = ? WHERE id = ?",
+            (status, human_response, datetime.now(timezone.utc).isoformat(), flag_id),
+            wait=True,
+        )
+
+    def set_session_status(self, session_id, status, human_response=None):
+        """Update every open flag for a session (the pre-v1 review workflow)."""
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+        self._submit(
+            "UPDATE flagged_questions SET status = ?, human_response = COALESCE(?, human_response), "
+            "updated_at = ? WHERE session_id = ? AND status = 'open'",
+            (status, human_response, datetime.now(timezone.utc).isoformat(), session_id),
+            wait=True,
+        )
+
+    def list_flags(self, status=None, since=None, until=None, cursor=None, limit=50):
+        """Return (rows, next_cursor), newest first, using keyset pagination.
+
+        since/until are ISO dates (inclusive); cursor is the next_cursor of the
+        previous page.
+        """
+        self._ensure_started()
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if since:
+            where.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            # Inclusive of the whole "until" day
+            where.append("timestamp < ?")
+            params.append(until + "\uffff")
+        position = decode_cursor(cursor)
+        if position:
+            where.append("(timestamp, id) < (?, ?)")
+            params.extend(position)
+
+        sql = "SELECT id, session_id, question, timestamp, status, human_response FROM flagged_questions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = [dict(zip(("id", "session_id", "question", "timestamp", "status", "human_response"), r))
+                for r in self._reader.execute(sql, params).fetchall()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+        return rows, next_cursor
+
+    def pending(self):
+        return self._queue.qsize()
@@ -1,16 +1,16 @@
 #!/usr/bin/env python3
 import os
-import pickle
-import numpy as np
 import openai
 import tiktoken
 from dotenv import load_dotenv
 
+from kb_index import write_index, MANIFEST_FILE
+from embedding_store import EmbeddingStore, format_report
+from batch_embedder import embed_texts
+
 # Load OpenAI API key
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
-if not openai.api_key:
-    raise RuntimeError("OPENAI_API_KEY not set in .env")
 
 # Embedding model (must match app.py)
 EMB_MODEL = "text-embedding-3-small"
@@ -18,9 +18,6 @@ EMB_MODEL = "text-embedding-3-small"
 # Directory containing scraped text files
 KB_FOLDER = "kb_chunks"
 
-# Maximum token limit for the embedding model
-MAX_TOKENS = 8192
-
 # Initialize tokenizer
 tokenizer = tiktoken.encoding_for_model("text-embedding-3-small")
 
@@ -28,23 +25,18 @@ tokenizer = tiktoken.encoding_for_model("text-embedding-3-small")
 def count_tokens(text):
     return len(tokenizer.encode(text))
 
-# Function to generate embeddings
-def generate_embeddings(text_chunks):
-    embeddings = []
-    for chunk in text_chunks:
-        # Check token count
-        token_count = count_tokens(chunk["text"])
-        if token_count > MAX_TOKENS:
-            print(f"Skipping chunk (too many tokens: {token_count}): {chunk['text'][:50]}...")
-            embeddings.append(None)
-            continue
-        try:
-            response = openai.embeddings.create(model=EMB_MODEL, input=chunk["text"])
-            embedding = response.data[0].embedding
-            embeddings.append(embedding)
-        except Exception as e:
-            print(f"Error generating embedding for chunk: {chunk['text'][:50]}... - {e}")
-            embeddings.append(None)
+# Function to generate embeddings, reusing unchanged chunks from the store.
+# New chunks are sent in token-budgeted batches and checkpointed as they land.
+def generate_embeddings(text_chunks, store):
+    token_counts = {chunk["text"]: chunk["tokens"] for chunk in text_chunks}
+
+    def embed(texts):
+        return embed_texts(texts, EMB_MODEL, token_counts=[token_counts[t] for t in texts],
+                           on_batch=store.checkpoint(EMB_MODEL))
+
+    items = [(f"{chunk['source']}::c{chunk['chunk']}", chunk["text"]) for chunk in text_chunks]
+    embeddings, report = store.sync("generate_embeddings", items, EMB_MODEL, embed)
+    print(format_report(report))
     return embeddings
 
 # Mapping of filenames to source URLs (simplified for key files)
@@ -56,7 +48,7 @@ FILENAME_TO_URL = {
 # Load and chunk the text from all files in kb_chunks
 def load_and_chunk_text(directory=KB_FOLDER):
     text_chunks = []
-    for filename in os.listdir(directory):
+    for filename in sorted(os.listdir(directory)):
         # Skip non-text files
         if filename.startswith(".") or not filename.endswith((".txt", ".pdf")):
             print(f"Skipping non-text file: {filename}")
@@ -77,6 +69,7 @@ def load_and_chunk_text(directory=KB_FOLDER):
         # Split into chunks (max 600 words per chunk, but try to keep related content together)
         paragraphs = text.split("\n\n")
         current_chunk = ""
+        chunk_idx = 0
         for paragraph in paragraphs:
             paragraph = paragraph.strip()
             if not paragraph:
@@ -89,39 +82,47 @@ def load_and_chunk_text(directory=KB_FOLDER):
                     # Include the source URL in the chunk metadata
                     chunk_data = {
                         "text": current_chunk,
-                        "source_url": FILENAME_TO_URL.get(filename, "https://www.morehouse.org.uk")
+                        "source_url": FILENAME_TO_URL.get(filename, "https://www.morehouse.org.uk"),
+                        "source": filename,
+                        "chunk": chunk_idx,
+                        "tokens": count_tokens(current_chunk),
                     }
                     text_chunks.append(chunk_data)
+                    chunk_idx += 1
                 current_chunk = paragraph
         if current_chunk:
             chunk_data = {
                 "text": current_chunk,
-                "source_url": FILENAME_TO_URL.get(filename, "https://www.morehouse.org.uk")
+                "source_url": FILENAME_TO_URL.get(filename, "https://www.morehouse.org.uk"),
+                "source": filename,
+                "chunk": chunk_idx,
+                "tokens": count_tokens(current_chunk),
             }
             text_chunks.append(chunk_data)
     return text_chunks
 
 # Main process
 if __name__ == "__main__":
+    if not openai.api_key:
+        raise RuntimeError("OPENAI_API_KEY not set in .env")
+
     # Step 1: Load and chunk the text
     print("Loading and chunking text from kb_chunks...")
     text_chunks = load_and_chunk_text()
 
     # Step 2: Generate embeddings
     print("Generating embeddings...")
-    embeddings = generate_embeddings(text_chunks)
-    embeddings = [emb for emb, chunk in zip(embeddings, text_chunks) if emb is not None]
-    text_chunks = [chunk for emb, chunk in zip(embeddings, text_chunks) if emb is not None]
+    store = EmbeddingStore()
+    embeddings = generate_embeddings(text_chunks, store)
+    store.close()
+    kept = [(emb, chunk) for emb, chunk in zip(embeddings, text_chunks) if emb is not None]
+    embeddings = [emb for emb, _ in kept]
+    text_chunks = [chunk for _, chunk in kept]
 
-    # Step 3: Save embeddings and metadata
+    # Step 3: Save normalized index and metadata with source URLs
     print("Saving embeddings and metadata...")
-    embeddings_array = np.array(embeddings, dtype="float32")
-    with open("embeddings.pkl", "wb") as f:
-        pickle.dump(embeddings_array, f)
-
-    # Save metadata with source URLs
-    metadata = [{"text": chunk["text"], "source_url": chunk["source_url"]} for chunk in text_chunks]
-    with open("metadata.pkl", "wb") as f:
-        pickle.dump(metadata, f)
+    metadata = [{"text": chunk["text"], "source_url": chunk["source_url"], "source": chunk["source"],
+                 "tokens": chunk["tokens"]} for chunk in text_chunks]
+    manifest = write_index(embeddings, metadata, EMB_MODEL)
 
-    print(f"Generated {len(embeddings)} embeddings and saved to embeddings.pkl and metadata.pkl")
+    print(f"Generated {manifest['rows']} embeddings and saved index ({MANIFEST_FILE})")
@@ -1,3 +1,66 @@
-workers = 2
+import gc
+import os
+
+from memstats import memory_usage, format_usage
+
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
 worker_class = "eventlet"
+# Concurrent connections (Socket.IO sessions) each eventlet worker accepts
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
 bind = "0.0.0.0:10000"
+
+# Same default as metrics.METRICS_DIR
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(os.getenv("DATA_DIR", "/data"), "metrics"))
+
+# Preload mode: the master imports app.py once (index, metadata, BM25 and
+# static matchers) and forks workers that share those pages copy-on-write.
+# Everything with threads, sockets or SQLite handles is opened lazily per pid,
+# so nothing the master creates is used across the fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+
+if preload_app:
+    # No collections while the app loads, so freed objects don't leave holes
+    # in pages the workers will share; re-enabled in the master once it is
+    # ready and in each worker after fork
+    gc.disable()
+
+
+def on_starting(server):
+    # /metrics merges every worker's snapshot file; drop the previous run's.
+    # Done with plain os calls: importing metrics here would create its lock
+    # before the workers monkey-patch threading
+    try:
+        names = os.listdir(METRICS_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith("metrics-"):
+            try:
+                os.remove(os.path.join(METRICS_DIR, name))
+            except OSError:
+                pass
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Move everything loaded so far to the permanent generation, so GC
+        # passes in the workers never write to (and un-share) those pages
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+
+
+def when_ready(server):
+    if preload_app:
+        # The app is loaded and no worker is forked yet: freeze what is
+        # there and let the long-lived master collect its own garbage again
+        gc.freeze()
+        gc.enable()
+    server.log.info(f"Master {os.getpid()} ready (preload={preload_app}): {format_usage(memory_usage())}")
+
+
+def post_worker_init(worker):
+    worker.log.info(f"Worker {worker.pid} started: {format_usage(memory_usage())}")
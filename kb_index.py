@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# --- On-disk knowledge-base index format ---
+#
+# An index is three files side by side:
+#   embeddings.npy       contiguous float32 matrix, one L2-normalized row per chunk
+#   metadata.pkl         list of chunk dicts, same order as the matrix rows
+#   index_manifest.json  format version, model, dimension, row count, checksums
+#
+# The app opens the matrix with np.memmap, so loading is near-instant and every
+# gunicorn worker shares the same page-cache pages. Because the rows are already
+# normalized, cosine similarity for a query is a single dot product.
+import os
+import json
+import pickle
+import hashlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+BASE_DIR      = os.path.dirname(os.path.abspath(__file__))
+VECTORS_FILE  = "embeddings.npy"
+METADATA_FILE = "metadata.pkl"
+MANIFEST_FILE = "index_manifest.json"
+
+# Pre-manifest layout: a pickled list of per-chunk arrays
+LEGACY_EMBEDDINGS_FILE = "embeddings.pkl"
+
+
+class IndexFormatError(Exception):
+    pass
+
+
+def normalize_rows(vectors):
+    """Return a float32 copy of vectors with every row scaled to unit length."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    """Write via a temp file and rename, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_index(vectors, metadata, model, out_dir=BASE_DIR, extra=None):
+    """Normalize vectors and write matrix, metadata and manifest to out_dir.
+
+    The manifest is written last, so anything watching it only ever sees a
+    complete index. Keys in extra are merged into the manifest.
+    """
+    matrix = normalize_rows(vectors)
+    if matrix.shape[0] != len(metadata):
+        raise IndexFormatError(
+            f"{matrix.shape[0]} vectors but {len(metadata)} metadata entries"
+        )
+
+    vectors_path  = os.path.join(out_dir, VECTORS_FILE)
+    metadata_path = os.path.join(out_dir, METADATA_FILE)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+
+    _atomic_write(vectors_path, lambda f: np.save(f, matrix, allow_pickle=False))
+    _atomic_write(metadata_path, lambda f: pickle.dump(list(metadata), f))
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model": model,
+        "dim": int(matrix.shape[1]),
+        "rows": int(matrix.shape[0]),
+        "dtype": "float32",
+        "normalized": True,
+        "vectors_file": VECTORS_FILE,
+        "vectors_sha256": file_sha256(vectors_path),
+        "metadata_file": METADATA_FILE,
+        "metadata_sha256": file_sha256(metadata_path),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    manifest.update(extra or {})
+    _atomic_write(
+        manifest_path,
+        lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")),
+    )
+    return manifest
+
+
+def read_manifest(base_dir=BASE_DIR):
+    with open(os.path.join(base_dir, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise IndexFormatError(
+            f"Unsupported index format version {manifest.get('format_version')!r}"
+        )
+    return manifest
+
+
+class KBIndex:
+    """Read-only view of a loaded index: normalized matrix, metadata, manifest."""
+
+    def __init__(self, embeddings, metadata, manifest):
+        self.embeddings = embeddings
+        self.metadata = metadata
+        self.manifest = manifest
+
+    @property
+    def version(self):
+        """Changes whenever the matrix or the metadata is rebuilt."""
+        return f"{self.manifest.get('vectors_sha256', '')}:{self.manifest.get('metadata_sha256', '')}"
+
+    @property
+    def model(self):
+        return self.manifest.get("model")
+
+    @property
+    def dim(self):
+        return int(self.embeddings.shape[1])
+
+    def __len__(self):
+        return int(self.embeddings.shape[0])
+
+
+def load_index(base_dir=BASE_DIR, verify_checksum=False):
+    """Open the index in base_dir, memory-mapping the embedding matrix.
+
+    Falls back to the legacy embeddings.pkl layout (normalized in memory) when
+    no manifest exists yet.
+    """
+    if not os.path.exists(os.path.join(base_dir, MANIFEST_FILE)):
+        return _load_legacy(base_dir)
+
+    manifest = read_manifest(base_dir)
+    vectors_path  = os.path.join(base_dir, manifest["vectors_file"])
+    metadata_path = os.path.join(base_dir, manifest["metadata_file"])
+
+    if verify_checksum:
+        for path, key in ((vectors_path, "vectors_sha256"), (metadata_path, "metadata_sha256")):
+            if file_sha256(path) != manifest[key]:
+                raise IndexFormatError(f"Checksum mismatch for {os.path.basename(path)}")
+
+    embeddings = np.load(vectors_path, mmap_mode="r", allow_pickle=False)
+    with open(metadata_path, "rb") as f:
+        metadata = pickle.load(f)
+
+    if embeddings.dtype != np.float32 or embeddings.ndim != 2:
+        raise IndexFormatError(f"Expected a 2-D float32 matrix, got {embeddings.dtype} {embeddings.shape}")
+    if embeddings.shape != (manifest["rows"], manifest["dim"]):
+        raise IndexFormatError(
+            f"Matrix shape {embeddings.shape} does not match manifest "
+            f"({manifest['rows']}, {manifest['dim']})"
+        )
+    if len(metadata) != manifest["rows"]:
+        raise IndexFormatError(
+            f"{len(metadata)} metadata entries but manifest says {manifest['rows']} rows"
+        )
+    return KBIndex(embeddings, metadata, manifest)
+
+
+def _load_legacy(base_dir):
+    with open(os.path.join(base_dir, LEGACY_EMBEDDINGS_FILE), "rb") as f:
+        embeddings = normalize_rows(np.stack(pickle.load(f), axis=0))
+    with open(os.path.join(base_dir, METADATA_FILE), "rb") as f:
+        metadata = pickle.load(f)
+    manifest = {
+        "format_version": 0,
+        "model": None,
+        "dim": int(embeddings.shape[1]),
+        "rows": int(embeddings.shape[0]),
+        "vectors_sha256": hashlib.sha256(embeddings.tobytes()).hexdigest(),
+    }
+    return KBIndex(embeddings, metadata, manifest)
+
+
+# Convert an existing embeddings.pkl/metadata.pkl pair to the current format
+if __name__ == "__main__":
+    import sys
+
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else BASE_DIR
+    model = sys.argv[2] if len(sys.argv) > 2 else "text-embedding-3-small"
+    legacy = _load_legacy(base_dir)
+    manifest = write_index(legacy.embeddings, legacy.metadata, model, out_dir=base_dir)
+    print(f"✅ Wrote {manifest['rows']}×{manifest['dim']} index to {os.path.join(base_dir, MANIFEST_FILE)}")
@@ -0,0 +1,162 @@
+# --- Hot-swappable knowledge-base snapshot ---
+#
+# Everything derived from one on-disk index (matrix, metadata, retrieval
+# backend, BM25 index) lives in a single immutable KBSnapshot. Request code
+# reads holder.current once and uses that object throughout, so a reload is
+# one reference assignment: requests already running finish against the old
+# snapshot (its memory map stays valid after the files are replaced) and new
+# ones see the new one. A watcher polls the manifest, which write_index
+# writes last; a new version is loaded and validated off the event loop and
+# only swapped in if it checks out.
+import os
+import time
+import logging
+import threading
+
+from kb_index import load_index, IndexFormatError, MANIFEST_FILE
+from retrieval import make_backend
+from lexical_index import BM25Index
+
+try:
+    from eventlet import patcher, tpool
+
+    def _offload(fn, *args):
+        # Only green threads need the pool; from a real OS thread (no
+        # monkey-patching, e.g. scripts and tests) tpool can deadlock
+        if patcher.is_monkey_patched("thread"):
+            return tpool.execute(fn, *args)
+        return fn(*args)
+except ImportError:
+    def _offload(fn, *args):
+        return fn(*args)
+
+logger = logging.getLogger(__name__)
+
+
+class KBSnapshot:
+    """One loaded index version and the search structures built over it."""
+
+    __slots__ = ("kb", "retriever", "lexical_index", "loaded_at", "generation")
+
+    def __init__(self, kb, retriever, lexical_index, generation=0):
+        self.kb = kb
+        self.retriever = retriever
+        self.lexical_index = lexical_index
+        self.loaded_at = time.time()
+        # Counts reloads in this holder, so callers can tell older from newer
+        self.generation = generation
+
+    @property
+    def embeddings(self):
+        return self.kb.embeddings
+
+    @property
+    def metadata(self):
+        return self.kb.metadata
+
+    @property
+    def version(self):
+        return self.kb.version
+
+    @property
+    def dim(self):
+        return self.kb.dim
+
+
+def load_snapshot(base_dir, model=None, dim=None, verify_checksum=False):
+    """Load the index in base_dir and build its backends.
+
+    Raises IndexFormatError if it was built with a different model or
+    dimension than the running app expects.
+    """
+    kb = load_index(base_dir, verify_checksum=verify_checksum)
+    if model is not None and kb.model not in (None, model):
+        raise IndexFormatError(f"Index built with {kb.model}, expected {model}")
+    if dim is not None and kb.dim != dim:
+        raise IndexFormatError(f"Index has {kb.dim} dims, expected {dim}")
+    retriever = make_backend(kb, base_dir=base_dir)
+    lexical_index = BM25Index([m.get("text", "") for m in kb.metadata])
+    return KBSnapshot(kb, retriever, lexical_index)
+
+
+class KBHolder:
+    def __init__(self, base_dir, model, poll_interval=30.0):
+        self.base_dir = base_dir
+        self.model = model
+        self.poll_interval = poll_interval
+        self._stamp = self._manifest_stamp()
+        self._snapshot = load_snapshot(base_dir, model)
+        self._reload_lock = threading.Lock()
+        self._watcher_pid = None
+
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_error = None
+
+    @property
+    def current(self):
+        """The live snapshot; read it once per request and keep using it."""
+        self._ensure_watching()
+        return self._snapshot
+
+    def _manifest_stamp(self):
+        try:
+            st = os.stat(os.path.join(self.base_dir, MANIFEST_FILE))
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def reload(self):
+        """Load the index on disk and swap it in if its version changed.
+
+        Returns True if a new snapshot was installed. Raises if the new index
+        is missing, inconsistent or incompatible; the old one stays live.
+        """
+        with self._reload_lock:
+            stamp = self._manifest_stamp()
+            old = self._snapshot
+            try:
+                new = _offload(load_snapshot, self.base_dir, self.model, old.dim, True)
+            except Exception as e:
+                self.failed_reloads += 1
+                self.last_error = str(e)
+                raise
+            finally:
+                self._stamp = stamp
+            if new.version == old.version:
+                return False
+            new.generation = old.generation + 1
+            self._snapshot = new
+            self.reloads += 1
+            self.last_error = None
+            logger.info(f"Knowledge base reloaded: {len(old.kb)} -> {len(new.kb)} chunks ({new.retriever.name} search)")
+            return True
+
+    # Threads don't survive fork; start the watcher lazily in each worker
+    def _ensure_watching(self):
+        if self.poll_interval > 0 and self._watcher_pid != os.getpid():
+            self._watcher_pid = os.getpid()
+            threading.Thread(target=self._watch, name="kb-watcher", daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            if self._manifest_stamp() in (None, self._stamp):
+                continue
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Knowledge base reload failed, keeping current version: {e}")
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "chunks": len(snapshot.kb),
+            "dim": snapshot.dim,
+            "backend": snapshot.retriever.name,
+            "loaded_at": snapshot.loaded_at,
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,103 @@
+# --- Multi-tenant knowledge-base service ---
+#
+# One Flask process answering /ask for every business in businesses.json.
+# Each business's chunks and embeddings are loaded once into its own index by
+# tenant_registry (cached with LRU eviction, reloaded only when its directory
+# changes), and only the top retrieved chunks that fit CONTEXT_TOKEN_BUDGET go
+# into the prompt instead of the whole knowledge base.
+import os
+import json
+
+import numpy as np
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+from dotenv import load_dotenv
+
+from kb_index import BASE_DIR
+from lexical_index import fuse_hybrid
+from context_builder import select_chunks, build_context
+from openai_client import get_client, call_with_retry, create_embeddings
+from tenant_registry import TenantRegistry, EMB_MODEL
+
+app = Flask(__name__)
+CORS(app)
+
+# Load environment variables
+load_dotenv()
+
+CHAT_MODEL = os.getenv("KB_SERVICE_CHAT_MODEL", "gpt-4o")
+TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+MAX_CHUNKS = int(os.getenv("SYNTHESIS_MAX_CHUNKS", "3"))
+MIN_SIMILARITY = float(os.getenv("RAG_MIN_SIMILARITY", "0.6"))
+LEXICAL_MIN_SCORE = float(os.getenv("LEXICAL_MIN_SCORE", "4.0"))
+DEFAULT_BUSINESS = "morehouse"
+
+# Load business configurations
+with open(os.path.join(BASE_DIR, "businesses.json"), "r", encoding="utf-8") as f:
+    BUSINESSES = json.load(f)
+
+registry = TenantRegistry(BUSINESSES)
+
+
+def retrieve(snapshot, question):
+    """Chunks for question from one tenant's index (dense + BM25, fused), packed to the token budget."""
+    response = create_embeddings([question], EMB_MODEL)
+    query = np.asarray(response.data[0].embedding, dtype=np.float32)
+    query /= np.linalg.norm(query)
+    dense = snapshot.retriever.search(query, TOP_K)
+    lexical = snapshot.lexical_index.search(question, TOP_K)
+    fused, relevant = fuse_hybrid(dense, lexical, MIN_SIMILARITY, LEXICAL_MIN_SCORE)
+    ids, _ = select_chunks(snapshot.metadata, relevant or fused, max_chunks=MAX_CHUNKS)
+    return [snapshot.metadata[i] for i in ids]
+
+
+@app.route('/ask', methods=['POST'])
+def ask():
+    data = request.get_json(silent=True) or {}
+    question = data.get('question')
+    business_id = data.get('business_id', DEFAULT_BUSINESS)
+    business = BUSINESSES.get(business_id)
+    if business is None or not question:
+        return jsonify({'answer': "Sorry, I couldn't process your request. Please try again."}), 400
+
+    if question == '__welcome__':
+        answer = business['welcome_message'].format(name=business['name'], contact_url=business['contact_url'])
+        return jsonify({'answer': answer}), 200
+
+    try:
+        snapshot = registry.get(business_id)
+        context = build_context(retrieve(snapshot, question))
+        # The question goes only in the user message, so the system prompt is a
+        # stable prefix the provider can cache across questions
+        prompt = (
+            f"You are a helpful chatbot for {business['name']}. "
+            f"Answer in a friendly, professional tone. "
+            f"Use this info to answer accurately:\n\n{context}"
+        )
+        response = call_with_retry(
+            get_client().chat.completions.create,
+            model=CHAT_MODEL,
+            messages=[{"role": "system", "content": prompt}, {"role": "user", "content": question}],
+            max_tokens=200,
+            temperature=0.7,
+        )
+        answer = response.choices[0].message.content.strip()
+        return jsonify({'answer': answer}), 200
+    except Exception as e:
+        app.logger.error(f"/ask failed for {business_id}: {e}")
+        return jsonify({'answer': "Sorry, I couldn't process your request. Please try again."}), 500
+
+
+@app.route('/config', methods=['GET'])
+def get_config():
+    business_id = request.args.get('business_id', DEFAULT_BUSINESS)
+    return jsonify(BUSINESSES.get(business_id, BUSINESSES[DEFAULT_BUSINESS])), 200
+
+
+@app.route('/tenants', methods=['GET'])
+def tenants():
+    return jsonify(registry.stats()), 200
+
+
+if __name__ == '__main__':
+    app.run(debug=True)
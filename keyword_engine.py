@@ -0,0 +1,95 @@
+# --- Single-pass multi-pattern keyword matcher (Aho-Corasick) ---
+#
+# All patterns (sensitive terms, PAGE_LINKS topics, ...) are compiled into one
+# automaton at startup, so a message is scanned once, in time linear in its
+# length, however many patterns there are. Matches must start on a word
+# boundary; whole_word patterns must also end on one, while stem patterns
+# ("abuse") may run on into suffixes ("abused", "abuses").
+import re
+from collections import deque, namedtuple
+
+Match = namedtuple("Match", "tag pattern payload start end")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    return _WHITESPACE.sub(" ", text.casefold())
+
+
+class KeywordEngine:
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._own = [[]]  # patterns ending at each node
+        self._out = [[]]  # own plus every suffix's patterns, rebuilt by build()
+        self._built = False
+
+    def add(self, pattern, tag, payload=None, whole_word=True):
+        pattern = normalize_text(pattern).strip()
+        if not pattern:
+            return
+        state = 0
+        for c in pattern:
+            nxt = self._goto[state].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+            state = nxt
+        self._own[state].append((pattern, tag, payload, whole_word))
+        self._built = False
+
+    def build(self):
+        """Compute failure links breadth-first and merge suffix outputs.
+
+        Outputs are recomputed from each node's own patterns, so building
+        again (or after more add() calls) never duplicates matches.
+        """
+        self._out = [list(own) for own in self._own]
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for c, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(c, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def scan(self, text):
+        """Return every boundary-respecting Match in text, in order of end position."""
+        if not self._built:
+            self.build()
+        text = normalize_text(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        state = 0
+        for i, c in enumerate(text):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for pattern, tag, payload, whole_word in out[state]:
+                start = i - len(pattern) + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if whole_word and i + 1 < len(text) and text[i + 1].isalnum():
+                    continue
+                matches.append(Match(tag, pattern, payload, start, i + 1))
+        return matches
+
+
+def longest_non_overlapping(matches):
+    """Keep the longest matches first, dropping any that overlap a kept one."""
+    kept = []
+    for m in sorted(matches, key=lambda m: (m.start - m.end, m.start)):
+        if all(m.end <= k.start or m.start >= k.end for k in kept):
+            kept.append(m)
+    return sorted(kept, key=lambda m: m.start)
@@ -0,0 +1,119 @@
+# --- In-memory BM25 index over knowledge-base chunks ---
+#
+# Dense vectors blur exact terms like "EHCP", "11+" or "ISI", and need an
+# embeddings round trip. This index is built from metadata text at load time
+# and stored as compact CSR arrays: per-term offsets into flat doc-id and
+# weight arrays, where each weight is the term's full BM25 contribution to
+# that document, precomputed. Scoring a query is one np.add.at per query term.
+import re
+
+import numpy as np
+
+from retrieval import top_k
+
+_TOKEN = re.compile(r"[a-z0-9]+\+?")
+
+STOPWORDS = frozenset("""
+    a about an and any are as at be by can could do does for from get got has have
+    how i if in is it its know like me much my need of on or our please should tell
+    that the their there this to us want we what when where which who why will with
+    would you your
+""".split())
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.casefold()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, texts, k1=1.2, b=0.75):
+        self.vocab = {}
+        postings = []  # term id -> {doc id: term frequency}
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            for token in tokens:
+                term_id = self.vocab.get(token)
+                if term_id is None:
+                    term_id = self.vocab[token] = len(postings)
+                    postings.append({})
+                postings[term_id][doc_id] = postings[term_id].get(doc_id, 0) + 1
+
+        n_docs = max(len(texts), 1)
+        avg_length = float(doc_lengths.mean()) if len(texts) else 1.0
+        self.n_docs = len(texts)
+        self.offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        self.doc_ids = np.empty(sum(len(p) for p in postings), dtype=np.int32)
+        self.weights = np.empty(len(self.doc_ids), dtype=np.float32)
+
+        pos = 0
+        for term_id, docs in enumerate(postings):
+            ids = np.fromiter(docs.keys(), dtype=np.int32, count=len(docs))
+            tf = np.fromiter(docs.values(), dtype=np.float32, count=len(docs))
+            idf = np.log1p((n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = k1 * (1 - b + b * doc_lengths[ids] / max(avg_length, 1.0))
+            self.doc_ids[pos:pos + len(docs)] = ids
+            self.weights[pos:pos + len(docs)] = idf * tf * (k1 + 1) / (tf + norm)
+            pos += len(docs)
+            self.offsets[term_id + 1] = pos
+
+    def scores(self, query):
+        """Return (BM25 scores for every document, number of known query terms)."""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        terms = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        for term_id in terms:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            np.add.at(scores, self.doc_ids[start:end], self.weights[start:end])
+        return scores, len(terms)
+
+    def search(self, query, k):
+        """Return (ids, scores) of the k best-scoring documents with score > 0."""
+        scores, _ = self.scores(query)
+        ids, best = top_k(scores, k)
+        keep = best > 0
+        return ids[keep], best[keep]
+
+    def _contains(self, term_id, doc_id):
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        pos = start + np.searchsorted(self.doc_ids[start:end], doc_id)
+        return pos < end and self.doc_ids[pos] == doc_id
+
+    def is_decisive(self, query, ids, scores, min_score, margin, max_terms):
+        """True when a short query's top hit contains every query term and
+        clearly beats the runner-up, so dense retrieval can be skipped."""
+        tokens = tokenize(query)
+        if not len(ids) or not tokens or len(tokens) > max_terms or scores[0] < min_score:
+            return False
+        if any(t not in self.vocab for t in tokens):
+            return False
+        if not all(self._contains(self.vocab[t], ids[0]) for t in tokens):
+            return False
+        return len(scores) == 1 or scores[0] >= margin * scores[1]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Merge ranked id lists; each list contributes 1 / (k + rank) per id."""
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)
+
+
+def fuse_hybrid(dense, lexical, min_similarity, lexical_min_score):
+    """Fuse dense and BM25 (ids, scores) results.
+
+    Returns (fused, relevant): every id in RRF order, and those that clear
+    either relevance bar (cosine above min_similarity or BM25 at least
+    lexical_min_score).
+    """
+    dense_scores = {int(i): s for i, s in zip(*dense)}
+    lexical_scores = {int(i): s for i, s in zip(*lexical)}
+    fused = reciprocal_rank_fusion([dense[0], lexical[0]])
+    relevant = [
+        i for i in fused
+        if dense_scores.get(i, 0.0) > min_similarity or lexical_scores.get(i, 0.0) >= lexical_min_score
+    ]
+    return fused, relevant
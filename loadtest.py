@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# --- Socket.IO load test: many concurrent simulated parents ---
+#
+# Opens N websocket Socket.IO sessions against a running app, the same way
+# static/script.js does (connect, then socket.emit('message', {message,
+# session_id})), and has each one ask a few questions from bench_questions.txt
+# with think-time in between. Reports connection setup time, round-trip time
+# to the final response (and to the first streamed delta), dropped
+# connections and timeouts, and samples the server's CPU and RSS/PSS from
+# /proc while the test runs.
+#
+#   python loadtest.py --spawn --clients 2000 --ramp 30
+#   python loadtest.py --url http://127.0.0.1:10000 --server-pid <gunicorn master pid>
+#
+# --spawn starts gunicorn (gunicorn.conf.py) with OpenAI pointed at
+# openai_standin and a throwaway DATA_DIR. Each eventlet worker accepts
+# GUNICORN_WORKER_CONNECTIONS clients (default 1000), so thousands of
+# sessions need WEB_CONCURRENCY * that to be large enough.
+#
+# The clients are green threads speaking Engine.IO 4 / Socket.IO 5 directly
+# over wsproto (already installed for flask-socketio), so a single process
+# can hold thousands of them.
+import eventlet
+eventlet.monkey_patch()
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import resource
+import tempfile
+import subprocess
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+from eventlet.queue import Queue, Empty
+from wsproto import WSConnection, ConnectionType
+from wsproto.connection import ConnectionState
+from wsproto.events import Request, RejectConnection, Message, TextMessage, Ping, CloseConnection
+from wsproto.utilities import LocalProtocolError, RemoteProtocolError
+
+from memstats import memory_usage
+from bench_replay import load_questions, summarize, git_commit, QUESTIONS_FILE
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+# ─── Minimal Socket.IO client ───────────────────────────────────────────────
+class SocketIOClient:
+    """One websocket-only Socket.IO session; events arrive on self.events.
+
+    A single green thread owns reads from the socket (eventlet allows one
+    reader per fd), so pings are answered during think-time and the socket is
+    only closed once the server has acknowledged the close.
+    """
+
+    def __init__(self, url, connect_timeout):
+        parts = urlsplit(url)
+        self.sock = socket.create_connection((parts.hostname, parts.port or 80), timeout=connect_timeout)
+        self.ws = WSConnection(ConnectionType.CLIENT)
+        self.events = Queue()
+        self.closed = False
+        self._buffer = []
+        try:
+            self.sock.sendall(self.ws.send(Request(host=parts.netloc, target="/socket.io/?EIO=4&transport=websocket")))
+            packets = self._packets()
+            # Engine.IO open packet, then join the default namespace
+            if not next(packets).startswith("0"):
+                raise ConnectionError("no Engine.IO open packet")
+            self._send_text("40")
+            if not next(packets).startswith("40"):
+                raise ConnectionError("namespace connect refused")
+        except (OSError, StopIteration, LocalProtocolError, RemoteProtocolError) as e:
+            self.sock.close()
+            raise ConnectionError(f"handshake failed: {e or type(e).__name__}")
+        self.sock.settimeout(None)
+        eventlet.spawn_n(self._read_loop, packets)
+
+    def _send_text(self, text):
+        self.sock.sendall(self.ws.send(Message(data=text)))
+
+    def _packets(self):
+        """Yield complete text messages; answers websocket pings and closes."""
+        while True:
+            data = self.sock.recv(65536)
+            self.ws.receive_data(data or None)
+            for event in self.ws.events():
+                if isinstance(event, RejectConnection):
+                    raise ConnectionError(f"websocket upgrade rejected ({event.status_code})")
+                if isinstance(event, Ping):
+                    self.sock.sendall(self.ws.send(event.response()))
+                elif isinstance(event, CloseConnection):
+                    if self.ws.state == ConnectionState.REMOTE_CLOSING:
+                        self.sock.sendall(self.ws.send(event.response()))
+                    return
+                elif isinstance(event, TextMessage):
+                    self._buffer.append(event.data)
+                    if event.message_finished:
+                        yield "".join(self._buffer)
+                        self._buffer = []
+            if not data:
+                return
+
+    def _read_loop(self, packets):
+        try:
+            for packet in packets:
+                if packet == "2":  # Engine.IO ping
+                    self._send_text("3")
+                elif packet.startswith("42"):
+                    name, payload = json.loads(packet[2:])
+                    self.events.put((name, payload, time.perf_counter()))
+                elif packet.startswith("41") or packet == "1":
+                    break
+        except (OSError, ValueError, LocalProtocolError, RemoteProtocolError):
+            pass
+        self.closed = True
+        self.sock.close()
+        self.events.put(("_closed", None, time.perf_counter()))
+
+    def emit(self, name, payload):
+        self._send_text("42" + json.dumps([name, payload]))
+
+    def close(self):
+        """Leave the namespace and start the websocket close handshake."""
+        if self.closed:
+            return
+        try:
+            self._send_text("41")
+            self.sock.sendall(self.ws.send(CloseConnection(code=1000)))
+        except (OSError, LocalProtocolError):
+            pass
+
+
+# ─── Simulated parent ───────────────────────────────────────────────────────
+class Results:
+    def __init__(self):
+        self.connect = []
+        self.rtt = []
+        self.first_delta = []
+        self.outcomes = {}
+        self.connect_failed = 0
+        self.dropped = 0
+        self.timeouts = 0
+        self.active = 0
+        self.completed = 0
+
+
+def parent_session(n, args, questions, results):
+    rng = random.Random(args.seed + n)
+    session_id = f"load-{n}-{rng.getrandbits(32):08x}"
+
+    start = time.perf_counter()
+    try:
+        client = SocketIOClient(args.url, args.timeout)
+    except (ConnectionError, OSError) as e:
+        results.connect_failed += 1
+        if results.connect_failed <= 5:
+            print(f"⚠️  Client {n} could not connect: {e}")
+        return
+    results.connect.append(time.perf_counter() - start)
+    results.active += 1
+
+    try:
+        for turn in range(args.messages):
+            if turn:
+                eventlet.sleep(rng.expovariate(1.0 / args.think) if args.think > 0 else 0)
+            sent = time.perf_counter()
+            client.emit("message", {"message": rng.choice(questions), "session_id": session_id})
+            first_delta = None
+            while True:
+                remaining = args.timeout - (time.perf_counter() - sent)
+                try:
+                    name, payload, at = client.events.get(timeout=max(remaining, 0.001))
+                except Empty:
+                    results.timeouts += 1
+                    return
+                if name == "_closed":
+                    results.dropped += 1
+                    return
+                if name == "response_delta" and first_delta is None:
+                    first_delta = at - sent
+                elif name in ("response", "response_done"):
+                    break
+            results.rtt.append(at - sent)
+            if first_delta is not None:
+                results.first_delta.append(first_delta)
+            kind = "streamed" if name == "response_done" else "direct"
+            message = payload.get("message", "") if isinstance(payload, dict) else ""
+            if message.startswith("We're busy"):
+                kind = "shed"
+            elif message.startswith("You're sending messages"):
+                kind = "rate_limited"
+            results.outcomes[kind] = results.outcomes.get(kind, 0) + 1
+            results.completed += 1
+    finally:
+        results.active -= 1
+        client.close()
+
+
+# ─── Server resource sampling (/proc) ───────────────────────────────────────
+def _stat(pid):
+    """(ppid, cpu seconds) from /proc/<pid>/stat, or None."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            fields = f.read().rpartition(")")[2].split()
+    except OSError:
+        return None
+    return int(fields[1]), (int(fields[11]) + int(fields[12])) / CLK_TCK
+
+
+def server_pids(master):
+    """The gunicorn master and its workers."""
+    pids = [master]
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            stat = _stat(name)
+            if stat and stat[0] == master:
+                pids.append(int(name))
+    return pids
+
+
+def sample_server(master, interval, results, timeline, stop):
+    started = time.perf_counter()
+    last_cpu, last_at, last_completed = {}, started, 0
+    while not stop:
+        eventlet.sleep(interval)
+        now = time.perf_counter()
+        row = {"t": round(now - started, 2), "active": results.active,
+               "messages_per_sec": (results.completed - last_completed) / (now - last_at),
+               "processes": {}}
+        for pid in server_pids(master):
+            stat = _stat(pid)
+            usage = memory_usage(pid)
+            if stat is None:
+                continue
+            cpu = stat[1]
+            row["processes"][pid] = {
+                "cpu_percent": 100.0 * (cpu - last_cpu.get(pid, cpu)) / (now - last_at),
+                "rss": (usage or {}).get("rss", 0),
+                "pss": (usage or {}).get("pss", 0),
+            }
+            last_cpu[pid] = cpu
+        timeline.append(row)
+        last_at, last_completed = now, results.completed
+
+
+# ─── Spawned server ─────────────────────────────────────────────────────────
+def spawn_server(url, args):
+    port = urlsplit(url).port or 80
+    env = dict(os.environ,
+               OPENAI_STANDIN="1",
+               OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "standin"),
+               DATA_DIR=tempfile.mkdtemp(prefix="loadtest-"),
+               KB_RELOAD_INTERVAL="0",
+               STANDIN_CHAT_LATENCY=str(args.chat_latency),
+               STANDIN_TOKEN_LATENCY=str(args.token_latency),
+               STANDIN_EMBED_LATENCY=str(args.embed_latency))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "app:app"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=open(args.server_log, "w"))
+    # The port opens before the workers finish importing the app, so wait
+    # until a worker actually answers a request
+    health_url = f"http://127.0.0.1:{port}/cache-stats"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited early, see {args.server_log}")
+        try:
+            with urlopen(health_url, timeout=2) as response:
+                if response.status == 200:
+                    return proc
+        except OSError:
+            pass
+        eventlet.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not start within 60s")
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+# ─── Report ─────────────────────────────────────────────────────────────────
+def print_report(report):
+    s = report["summary"]
+    print(f"\nClients {s['clients']}: connected {s['connected']}, connect failures {s['connect_failed']}, "
+          f"dropped {s['dropped']}, timeouts {s['timeouts']}, messages {s['messages']} "
+          f"in {s['wall_seconds']:.1f}s")
+    print("  replies: " + ", ".join(f"{kind} {n}" for kind, n in sorted(s["outcomes"].items())))
+    print(f"  {'series':<16} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label in ("connect", "rtt", "first_delta"):
+        stats = report[label]
+        if stats.get("count"):
+            print(f"  {label:<16} {stats['count']:>7} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+                  f"{stats['p99_ms']:>9.1f}")
+
+    if report["timeline"]:
+        print(f"\n  {'t s':>6} {'active':>7} {'msg/s':>7} {'cpu %':>7} {'rss MB':>8} {'pss MB':>8}")
+        for row in report["timeline"]:
+            procs = row["processes"].values()
+            print(f"  {row['t']:>6.1f} {row['active']:>7} {row['messages_per_sec']:>7.1f} "
+                  f"{sum(p['cpu_percent'] for p in procs):>7.1f} "
+                  f"{sum(p['rss'] for p in procs) / 1e6:>8.1f} {sum(p['pss'] for p in procs) / 1e6:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO load test with concurrent simulated parents")
+    parser.add_argument("--url", default="http://127.0.0.1:10000")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds over which clients connect")
+    parser.add_argument("--messages", type=int, default=3, help="questions per parent")
+    parser.add_argument("--think", type=float, default=5.0, help="mean think-time between questions (s)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for a connect or answer")
+    parser.add_argument("--questions", default=QUESTIONS_FILE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--server-pid", type=int, help="gunicorn master pid to sample CPU/RSS from")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--spawn", action="store_true", help="start gunicorn with the OpenAI stand-in")
+    parser.add_argument("--server-log", default=os.path.join(tempfile.gettempdir(), "loadtest-server.log"))
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="stand-in seconds per embeddings call")
+    parser.add_argument("--chat-latency", type=float, default=0.3, help="stand-in seconds to first token")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="stand-in seconds per streamed token")
+    parser.add_argument("--out", help="also write the full report as JSON")
+    args = parser.parse_args()
+
+    fd_limit = raise_fd_limit()
+    if args.clients + 64 > fd_limit:
+        print(f"⚠️  Open file limit is {fd_limit}; {args.clients} clients may fail to connect")
+
+    questions = load_questions(args.questions)
+    commit = git_commit()
+    server = spawn_server(args.url, args) if args.spawn else None
+    master = server.pid if server else args.server_pid
+
+    results, timeline, stop = Results(), [], []
+    if master:
+        sampler = eventlet.spawn(sample_server, master, args.sample_interval, results, timeline, stop)
+    pool = eventlet.GreenPool(args.clients)
+    started = time.perf_counter()
+    try:
+        for n in range(args.clients):
+            pool.spawn_n(parent_session, n, args, questions, results)
+            if args.ramp > 0:
+                eventlet.sleep(args.ramp / args.clients)
+        pool.waitall()
+    finally:
+        wall = time.perf_counter() - started
+        stop.append(True)
+        if master:
+            sampler.wait()
+        if server:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "commit": commit,
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "server_log")},
+        "summary": {
+            "clients": args.clients,
+            "connected": len(results.connect),
+            "connect_failed": results.connect_failed,
+            "dropped": results.dropped,
+            "timeouts": results.timeouts,
+            "messages": results.completed,
+            "outcomes": results.outcomes,
+            "wall_seconds": wall,
+        },
+        "connect": summarize(results.connect, wall),
+        "rtt": summarize(results.rtt, wall),
+        "first_delta": summarize(results.first_delta, wall),
+        "timeline": timeline,
+    }
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# --- Process memory breakdown (Linux) ---
+#
+# Reads /proc/<pid>/smaps_rollup so we can tell how much of a worker's RSS is
+# still shared with the gunicorn master (copy-on-write pages not yet touched)
+# versus private to that worker.
+
+_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def memory_usage(pid="self"):
+    """Return memory figures in bytes for pid, or None where smaps_rollup is unavailable."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    usage = {}
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in _FIELDS:
+            usage[_FIELDS[name]] = int(rest.split()[0]) * 1024
+    usage["shared"] = usage.get("shared_clean", 0) + usage.get("shared_dirty", 0)
+    usage["private"] = usage.get("private_clean", 0) + usage.get("private_dirty", 0)
+    return usage
+
+
+def format_usage(usage):
+    if usage is None:
+        return "memory usage unavailable"
+    mb = lambda n: f"{n / (1 << 20):.1f} MB"
+    return (f"RSS {mb(usage.get('rss', 0))}, shared {mb(usage['shared'])}, "
+            f"private {mb(usage['private'])}, PSS {mb(usage.get('pss', 0))}")
@@ -0,0 +1,225 @@
+# --- Lightweight pipeline metrics, aggregated across gunicorn workers ---
+#
+# Each worker keeps plain in-memory counters and fixed-bucket histograms
+# (recording is a dict lookup, a bisect and a few adds under a lock) and
+# writes them to METRICS_DIR/metrics-<pid>.json every few seconds. /metrics,
+# served by whichever worker gets the request, merges every worker's file and
+# renders Prometheus text format. Files from exited workers keep counting, as
+# Prometheus counters must not go backwards; gunicorn.conf.py clears the
+# directory when the master starts (without importing this module).
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+
+from memstats import memory_usage
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR    = os.getenv("METRICS_DIR", os.path.join(os.getenv("DATA_DIR", "/data"), "metrics"))
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+# Upper bounds in seconds; +Inf is implied
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DESCRIPTIONS = {
+    "chat_request_seconds": ("histogram", "Time to handle a chat message, by outcome"),
+    "chat_stage_seconds": ("histogram", "Time spent in each chat pipeline stage"),
+    "openai_requests_total": ("counter", "OpenAI API calls, by endpoint and result"),
+    "openai_retries_total": ("counter", "OpenAI API calls retried, by endpoint"),
+    "openai_tokens_total": ("counter", "OpenAI tokens used, by endpoint and kind"),
+    "admission_rejected_total": ("counter", "Chat messages turned away, by reason"),
+    "admission_wait_seconds": ("histogram", "Time admitted chat messages waited for an upstream slot"),
+    "admission_in_flight": ("gauge", "Chat messages holding an upstream slot, summed over live workers"),
+    "admission_queue_depth": ("gauge", "Chat messages waiting for an upstream slot, summed over live workers"),
+}
+
+
+class Metrics:
+    def __init__(self, directory=METRICS_DIR, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self._counters = {}    # (name, labels) -> value
+        self._gauges = {}      # (name, labels) -> current value
+        self._listeners = []   # fn(name, seconds, labels), e.g. bench_replay's raw samples
+
+    # Counts recorded before a fork belong to the parent; start clean per pid.
+    # The lock is made per pid too: one created before eventlet patched
+    # threading (gunicorn's master) would block the worker's only OS thread
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._lock = threading.Lock()
+            self._histograms = {}
+            self._counters = {}
+            self._gauges = {}
+            self._pid = os.getpid()
+        # Started outside the lock, as a green Thread.start() yields
+        if self.flush_interval > 0:
+            threading.Thread(target=self._flush_loop, name="metrics-flusher", daemon=True).start()
+
+    def observe(self, name, seconds, **labels):
+        self._ensure_started()
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0] * (len(BUCKETS) + 3)
+            hist[bisect.bisect_left(BUCKETS, seconds)] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+        for listener in self._listeners:
+            listener(name, seconds, labels)
+
+    def add_listener(self, fn):
+        """Also pass every observation to fn(name, seconds, labels)."""
+        self._listeners.append(fn)
+
+    def inc(self, name, value=1, **labels):
+        self._ensure_started()
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        """Set a gauge; /metrics sums it over the workers still running."""
+        self._ensure_started()
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "histograms": [[name, list(labels), hist[:]] for (name, labels), hist in self._histograms.items()],
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "gauges": [[name, list(labels), value] for (name, labels), value in self._gauges.items()],
+            }
+
+    def flush(self):
+        """Write this worker's snapshot where the other workers can read it."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def collect(self):
+        """Merge every worker's latest snapshot (this one's taken fresh)."""
+        self._ensure_started()
+        snapshots = {os.getpid(): self.snapshot()}
+        try:
+            self.flush()
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        for name in names:
+            if not (name.startswith("metrics-") and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.setdefault(snapshot.get("pid"), snapshot)
+
+        histograms, counters, gauges = {}, {}, {}
+        for pid, snapshot in snapshots.items():
+            for name, labels, hist in snapshot["histograms"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                merged = histograms.setdefault(key, [0] * len(hist))
+                for i, value in enumerate(hist):
+                    merged[i] += value
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0) + value
+            # Unlike counters, an exited worker's gauges no longer describe anything
+            if pid is not None and os.path.exists(f"/proc/{pid}"):
+                for name, labels, value in snapshot.get("gauges", ()):
+                    key = (name, tuple(tuple(pair) for pair in labels))
+                    gauges[key] = gauges.get(key, 0) + value
+        return histograms, counters, gauges, sorted(p for p in snapshots if p is not None)
+
+    def render(self):
+        """Prometheus text exposition of the merged metrics."""
+        histograms, counters, gauges, pids = self.collect()
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described:
+                described.add(name)
+                kind, text = DESCRIPTIONS.get(name, ("untyped", name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), hist in sorted(histograms.items()):
+            describe(name)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), hist):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {hist[-2]}")
+            lines.append(f"{name}_count{_labels(labels)} {hist[-1]}")
+
+        for (name, labels), value in sorted(counters.items()) + sorted(gauges.items()):
+            describe(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        # Memory of the workers still alive (gauges, read at scrape time)
+        lines.append("# HELP worker_memory_bytes Worker memory from smaps_rollup, by kind")
+        lines.append("# TYPE worker_memory_bytes gauge")
+        for pid in pids:
+            usage = memory_usage(pid)
+            for kind in ("rss", "pss", "shared", "private"):
+                if usage is not None and kind in usage:
+                    lines.append(f'worker_memory_bytes{{pid="{pid}",kind="{kind}"}} {usage[kind]}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+registry = Metrics()
+observe = registry.observe
+inc = registry.inc
+gauge = registry.gauge
+timer = registry.timer
+render = registry.render
@@ -0,0 +1,163 @@
+# --- Shared OpenAI client ---
+#
+# One client per worker process, reusing a pooled keep-alive HTTP connection
+# pool across requests. The SDK's own retries are disabled in favour of a
+# bounded retry budget with jittered backoff, so a slow or failing upstream
+# produces at most a small fraction of extra traffic and can't pin every
+# greenlet. Under eventlet.monkey_patch() the socket, lock and sleep calls
+# used here are all green.
+import os
+import time
+import random
+import logging
+import threading
+
+import httpx
+from openai import OpenAI, APIConnectionError, APITimeoutError, RateLimitError, InternalServerError
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT     = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT        = float(os.getenv("OPENAI_READ_TIMEOUT", "20"))
+MAX_RETRIES         = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+RETRY_BUDGET_RATIO  = float(os.getenv("OPENAI_RETRY_BUDGET_RATIO", "0.1"))
+RETRY_MIN_PER_SEC   = float(os.getenv("OPENAI_RETRY_MIN_PER_SEC", "1"))
+BACKOFF_BASE        = 0.25
+BACKOFF_CAP         = 4.0
+POOL_CONNECTIONS    = int(os.getenv("OPENAI_POOL_CONNECTIONS", "50"))
+POOL_KEEPALIVE      = int(os.getenv("OPENAI_POOL_KEEPALIVE", "20"))
+# Serve every call from openai_standin's local, fixed-latency fake (benchmarks only)
+USE_STANDIN         = os.getenv("OPENAI_STANDIN", "0") == "1"
+
+RETRYABLE = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+
+class RetryBudget:
+    """Allow retries up to ratio × recent requests, plus a small per-second floor."""
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, min_per_sec=RETRY_MIN_PER_SEC, cap=None):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.cap = cap if cap is not None else max(10.0, 10 * min_per_sec)
+        self._tokens = self.cap
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.cap, self._tokens + (now - self._updated) * self.min_per_sec)
+        self._updated = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.cap, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+retry_budget = RetryBudget()
+
+
+def _make_client():
+    if USE_STANDIN:
+        from openai_standin import StandinClient
+        return StandinClient.from_env()
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=POOL_CONNECTIONS,
+            max_keepalive_connections=POOL_KEEPALIVE,
+            keepalive_expiry=60,
+        ),
+    )
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=http_client,
+        max_retries=0,
+    )
+
+
+def get_client():
+    """Return this process's client, creating it on first use after fork."""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = _make_client()
+                _client_pid = os.getpid()
+    return _client
+
+
+def set_client(client):
+    """Replace the process-wide client (used by offline benchmarks)."""
+    global _client, _client_pid
+    with _lock:
+        _client, _client_pid = client, os.getpid()
+
+
+def _retry_delay(error, attempt):
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            delay = max(delay, float(response.headers.get("retry-after", 0)))
+        except (TypeError, ValueError):
+            pass
+    return min(delay, BACKOFF_CAP)
+
+
+def _endpoint(fn):
+    """Metrics label for an SDK method, e.g. "embeddings" or "completions"."""
+    return type(getattr(fn, "__self__", None)).__name__.lower().lstrip("_")
+
+
+def record_usage(endpoint, usage):
+    """Count the prompt/completion tokens reported by an API response."""
+    if usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if tokens:
+            metrics.inc("openai_tokens_total", tokens, endpoint=endpoint, kind=kind)
+
+
+def call_with_retry(fn, *args, **kwargs):
+    """Call fn, retrying transient OpenAI errors within the shared budget."""
+    endpoint = _endpoint(fn)
+    retry_budget.deposit()
+    attempt = 0
+    while True:
+        try:
+            result = fn(*args, **kwargs)
+        except RETRYABLE as e:
+            if attempt >= MAX_RETRIES or not retry_budget.withdraw():
+                metrics.inc("openai_requests_total", endpoint=endpoint, result=type(e).__name__)
+                raise
+            delay = _retry_delay(e, attempt)
+            logger.warning(f"OpenAI {type(e).__name__}, retry {attempt + 1}/{MAX_RETRIES} in {delay:.2f}s")
+            metrics.inc("openai_retries_total", endpoint=endpoint)
+            time.sleep(delay)
+            attempt += 1
+        except Exception as e:
+            metrics.inc("openai_requests_total", endpoint=endpoint, result=type(e).__name__)
+            raise
+        else:
+            metrics.inc("openai_requests_total", endpoint=endpoint, result="ok")
+            record_usage(endpoint, getattr(result, "usage", None))
+            return result
+
+
+def create_embeddings(input, model):
+    return call_with_retry(get_client().embeddings.create, input=input, model=model)
@@ -0,0 +1,119 @@
+# --- Deterministic local stand-in for the OpenAI client ---
+#
+# Implements just the two calls the app makes (embeddings.create and streaming
+# chat.completions.create) with fixed, configurable latency and no network,
+# so benchmarks and load tests measure our code rather than OpenAI's.
+#
+# Question vectors come from a recorded file (bench_replay.py --record) when
+# one is given. Any other text gets a synthetic vector: the BM25-weighted mix
+# of the knowledge-base rows it shares terms with, plus seeded noise, so
+# retrieval behaves roughly like it does with real embeddings. Enable it in
+# the app with OPENAI_STANDIN=1 (see openai_client.get_client).
+import os
+import time
+import hashlib
+from types import SimpleNamespace
+
+import numpy as np
+
+from embed_cache import normalize_question
+
+EMBED_LATENCY = float(os.getenv("STANDIN_EMBED_LATENCY", "0.05"))
+CHAT_LATENCY  = float(os.getenv("STANDIN_CHAT_LATENCY", "0.3"))   # time to first token
+TOKEN_LATENCY = float(os.getenv("STANDIN_TOKEN_LATENCY", "0.01"))
+ANSWER_WORDS  = 40
+
+
+def _seed(text):
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+
+
+def load_recorded_vectors(path):
+    """Return {normalized question: vector} from an .npz written by --record."""
+    with np.load(path, allow_pickle=False) as data:
+        return {str(q): v for q, v in zip(data["questions"], data["vectors"])}
+
+
+class _Embeddings:
+    def __init__(self, standin):
+        self._standin = standin
+
+    def create(self, input, model, **kwargs):
+        time.sleep(self._standin.embed_latency)
+        texts = [input] if isinstance(input, str) else list(input)
+        data = [SimpleNamespace(index=i, embedding=self._standin.vector(t).tolist()) for i, t in enumerate(texts)]
+        tokens = sum(len(t.split()) for t in texts)
+        return SimpleNamespace(data=data, model=model,
+                               usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens))
+
+
+class _Completions:
+    def __init__(self, standin):
+        self._standin = standin
+
+    def create(self, model, messages, stream=False, **kwargs):
+        time.sleep(self._standin.chat_latency)
+        words = self._standin.answer_words(messages)
+        prompt_tokens = sum(len(m.get("content", "").split()) for m in messages)
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(words),
+                                total_tokens=prompt_tokens + len(words))
+        if not stream:
+            message = SimpleNamespace(role="assistant", content=" ".join(words))
+            return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message)], usage=usage)
+        return self._stream(words, usage)
+
+    def _stream(self, words, usage):
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self._standin.token_latency)
+            delta = SimpleNamespace(content=word if i == 0 else " " + word)
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+
+class StandinClient:
+    def __init__(self, vectors_path=None, kb_dir=None, embed_latency=EMBED_LATENCY,
+                 chat_latency=CHAT_LATENCY, token_latency=TOKEN_LATENCY, dim=1536):
+        self.embed_latency = embed_latency
+        self.chat_latency = chat_latency
+        self.token_latency = token_latency
+        self.recorded = load_recorded_vectors(vectors_path) if vectors_path else {}
+        self.kb = None
+        self.lexical = None
+        if kb_dir is not None:
+            from kb_index import load_index
+            from lexical_index import BM25Index
+            self.kb = load_index(kb_dir)
+            self.lexical = BM25Index([m.get("text", "") for m in self.kb.metadata])
+            dim = self.kb.dim
+        self.dim = dim
+        self.embeddings = _Embeddings(self)
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    @classmethod
+    def from_env(cls):
+        from kb_index import BASE_DIR
+        return cls(vectors_path=os.getenv("STANDIN_VECTORS") or None,
+                   kb_dir=os.getenv("STANDIN_KB_DIR", BASE_DIR))
+
+    def vector(self, text):
+        """The recorded vector for text, else a deterministic synthetic one."""
+        recorded = self.recorded.get(normalize_question(text))
+        if recorded is not None:
+            return np.asarray(recorded, dtype=np.float32)
+        rng = np.random.default_rng(_seed(text))
+        noise = rng.normal(size=self.dim).astype(np.float32)
+        if self.lexical is not None:
+            scores, _ = self.lexical.scores(text)
+            if scores.any():
+                mix = (scores / scores.sum()) @ np.asarray(self.kb.embeddings, dtype=np.float32)
+                mix /= np.linalg.norm(mix)
+                return mix + noise * (0.5 / np.sqrt(self.dim))
+        return noise / np.linalg.norm(noise)
+
+    def answer_words(self, messages):
+        """A fixed-length answer built from the start of the supplied context."""
+        system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+        _, _, context = system.partition("Context:")
+        words = context.split()[:ANSWER_WORDS]
+        return words or ["I", "don't", "know."]
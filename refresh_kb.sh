@@ -6,7 +6,7 @@ cd "$(dirname "$0")"
 VENV_PY="./venv/bin/python"
 
 echo "[$(date)] Running site_scraper…"
-"$VENV_PY" site_scraper.py
+"$VENV_PY" site_scraper.py --incremental
 
 echo "[$(date)] Regenerating embeddings…"
 "$VENV_PY" generate_embeddings.py
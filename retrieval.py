@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# --- Retrieval backends over the normalized embedding matrix ---
+#
+# Every backend answers the same question: given unit-length query vector(s),
+# which k rows of the index score highest by inner product (= cosine, since the
+# rows are normalized by kb_index). "exact" is a brute-force scan with
+# argpartition top-k selection; the faiss-* backends trade a little recall for
+# sub-linear search once the index holds many thousands of chunks.
+#
+# Select with RETRIEVAL_BACKEND=exact|faiss-flat|faiss-ivf|faiss-hnsw.
+import os
+import json
+import time
+
+import numpy as np
+
+BACKENDS = ("exact", "faiss-flat", "faiss-ivf", "faiss-hnsw")
+
+FAISS_INDEX_FILE = "kb_index.faiss"
+# Written next to the FAISS file: which kind it is and which vectors it indexes
+FAISS_META_FILE = "kb_index.faiss.json"
+
+
+def top_k(scores, k):
+    """Return (ids, scores) of the k highest scores, best first."""
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if k < scores.shape[-1]:
+        ids = np.argpartition(scores, -k)[-k:]
+    else:
+        ids = np.arange(scores.shape[-1])
+    ids = ids[np.argsort(scores[ids])[::-1]]
+    return ids, scores[ids]
+
+
+def top_k_batch(scores, k):
+    """Row-wise top_k over a (queries × rows) score matrix."""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        ids = np.argpartition(scores, -k, axis=1)[:, -k:]
+    else:
+        ids = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    part = np.take_along_axis(scores, ids, axis=1)
+    order = np.argsort(part, axis=1)[:, ::-1]
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+class ExactBackend:
+    """Brute-force inner product over the whole (memory-mapped) matrix."""
+
+    name = "exact"
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def search(self, query, k):
+        return top_k(self.embeddings @ query, k)
+
+    def search_batch(self, queries, k):
+        return top_k_batch(queries @ self.embeddings.T, k)
+
+
+def _require_faiss():
+    try:
+        import faiss
+    except ImportError:
+        raise RuntimeError("faiss is not installed; pip install faiss-cpu or use RETRIEVAL_BACKEND=exact")
+    return faiss
+
+
+def build_faiss_index(embeddings, kind="faiss-flat", nlist=None, hnsw_m=32):
+    """Build an inner-product FAISS index over already-normalized rows."""
+    faiss = _require_faiss()
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    dim = matrix.shape[1]
+
+    if kind == "faiss-flat":
+        index = faiss.IndexFlatIP(dim)
+    elif kind == "faiss-hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+    elif kind == "faiss-ivf":
+        # ~sqrt(n) lists keeps both training and probing cheap
+        nlist = nlist or max(1, int(np.sqrt(matrix.shape[0])))
+        nlist = min(nlist, matrix.shape[0])
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(matrix)
+    else:
+        raise ValueError(f"Unknown FAISS index kind {kind!r}")
+
+    index.add(matrix)
+    return index
+
+
+def write_faiss_index(kb, kind, base_dir):
+    """Build a FAISS index over a loaded KBIndex's rows and save it beside the index."""
+    index = build_faiss_index(kb.embeddings, kind)
+    path = os.path.join(base_dir, FAISS_INDEX_FILE)
+    faiss = _require_faiss()
+    faiss.write_index(index, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    meta = {"kind": kind, "rows": int(index.ntotal), "vectors_sha256": kb.manifest.get("vectors_sha256")}
+    with open(f"{path}.json.tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(f"{path}.json.tmp", os.path.join(base_dir, FAISS_META_FILE))
+    return path
+
+
+def prebuilt_index_path(kb, kind, base_dir):
+    """Path of a saved FAISS index of this kind built from exactly kb's vectors, else None."""
+    try:
+        with open(os.path.join(base_dir, FAISS_META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    sha = kb.manifest.get("vectors_sha256")
+    if meta.get("kind") != kind or not sha or meta.get("vectors_sha256") != sha:
+        return None
+    return os.path.join(base_dir, FAISS_INDEX_FILE)
+
+
+class FaissBackend:
+    """FAISS-backed search; reuses a prebuilt index file when it matches."""
+
+    def __init__(self, embeddings, kind, index_path=None, nprobe=8, ef_search=64):
+        faiss = _require_faiss()
+        self.name = kind
+        self.index = None
+
+        if index_path and os.path.exists(index_path):
+            index = faiss.read_index(index_path)
+            if index.ntotal == embeddings.shape[0] and index.d == embeddings.shape[1]:
+                self.index = index
+        if self.index is None:
+            self.index = build_faiss_index(embeddings, kind)
+
+        if hasattr(self.index, "nprobe"):
+            self.index.nprobe = nprobe
+        if hasattr(self.index, "hnsw"):
+            self.index.hnsw.efSearch = ef_search
+
+    def search(self, query, k):
+        ids, scores = self.search_batch(query.reshape(1, -1), k)
+        return ids[0], scores[0]
+
+    def search_batch(self, queries, k):
+        k = min(k, self.index.ntotal)
+        scores, ids = self.index.search(np.ascontiguousarray(queries, dtype=np.float32), k)
+        # FAISS pads with -1 when fewer than k neighbours are reachable
+        if (ids < 0).any():
+            scores = np.where(ids < 0, -np.inf, scores)
+        return ids, scores
+
+
+def make_backend(kb, name=None, base_dir=None):
+    """Create the backend selected by name or RETRIEVAL_BACKEND for a KBIndex."""
+    name = name or os.getenv("RETRIEVAL_BACKEND", "exact")
+    if name not in BACKENDS:
+        raise ValueError(f"RETRIEVAL_BACKEND must be one of {', '.join(BACKENDS)}, got {name!r}")
+    if name == "exact":
+        return ExactBackend(kb.embeddings)
+
+    # Only trust a prebuilt file that was built from these exact vectors
+    index_path = prebuilt_index_path(kb, name, base_dir) if base_dir else None
+    return FaissBackend(
+        kb.embeddings,
+        name,
+        index_path=index_path,
+        nprobe=int(os.getenv("FAISS_NPROBE", "8")),
+        ef_search=int(os.getenv("FAISS_EF_SEARCH", "64")),
+    )
+
+
+# --- Recall / latency parity check against the exact path ---
+def _jitter(rng, rows, noise):
+    """Add gaussian noise of total norm ~noise to unit rows and re-normalize."""
+    scale = noise / np.sqrt(rows.shape[1])
+    rows = rows + rng.normal(scale=scale, size=rows.shape).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def parity_report(embeddings, backend_names, k=5, n_queries=200, noise=0.3, seed=0):
+    """Compare each backend with exact search on perturbed copies of index rows."""
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, embeddings.shape[0], size=n_queries)
+    queries = _jitter(rng, np.asarray(embeddings[rows], dtype=np.float32), noise)
+
+    exact = ExactBackend(embeddings)
+    truth = [set(exact.search(q, k)[0].tolist()) for q in queries]
+
+    report = []
+    for name in backend_names:
+        backend = exact if name == "exact" else FaissBackend(embeddings, name)
+        latencies, hits = [], 0
+        for q, expected in zip(queries, truth):
+            start = time.perf_counter()
+            ids, _ = backend.search(q, k)
+            latencies.append(time.perf_counter() - start)
+            hits += len(expected & set(ids.tolist()))
+        latencies = np.array(latencies) * 1000
+        report.append({
+            "backend": name,
+            "recall_at_k": hits / (len(queries) * min(k, embeddings.shape[0])),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+        })
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from kb_index import load_index
+
+    parser = argparse.ArgumentParser(description="Check ANN backends against exact search.")
+    parser.add_argument("backends", nargs="*", default=list(BACKENDS))
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="grow the index to N rows with jittered copies to test at scale")
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    args = parser.parse_args()
+
+    matrix = np.asarray(load_index().embeddings)
+    if args.synthetic > matrix.shape[0]:
+        rng = np.random.default_rng(1)
+        extra = matrix[rng.integers(0, matrix.shape[0], size=args.synthetic - matrix.shape[0])]
+        matrix = np.vstack([matrix, _jitter(rng, extra, 0.6)])
+
+    print(f"Index: {matrix.shape[0]} rows × {matrix.shape[1]} dims, k={args.k}")
+    failed = False
+    for row in parity_report(matrix, args.backends, k=args.k, n_queries=args.queries):
+        ok = row["recall_at_k"] >= args.min_recall
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {row['backend']:<11} recall@{args.k}={row['recall_at_k']:.3f}  "
+              f"p50={row['p50_ms']:.3f}ms  p95={row['p95_ms']:.3f}ms")
+    raise SystemExit(1 if failed else 0)
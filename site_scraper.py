@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
+import io
 import os
-import pickle
+import sys
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from readability import Document
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
@@ -14,6 +23,13 @@ load_dotenv()
 KB_FOLDER = os.path.join(os.path.dirname(__file__), "kb_chunks")
 os.makedirs(KB_FOLDER, exist_ok=True)
 
+CACHE_FILE     = os.path.join(os.path.dirname(__file__), "scrape_cache.json")
+FETCH_WORKERS  = int(os.getenv("SCRAPER_WORKERS", "8"))
+PER_HOST_LIMIT = int(os.getenv("SCRAPER_PER_HOST", "2"))      # concurrent requests per host
+HOST_DELAY     = float(os.getenv("SCRAPER_HOST_DELAY", "0.2"))  # min seconds between request starts per host
+PDF_WORKERS    = int(os.getenv("SCRAPER_PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_MIN_PAGES  = 4  # pages per worker below which a PDF is parsed inline
+
 # ─── Full list of pages to scrape ─────────────────────────────────────────────
 URLS = [
     "https://www.morehouse.org.uk/",
@@ -74,55 +90,202 @@ def text_to_chunks(text):
         start += CHUNK_SIZE - CHUNK_OVERLAP
     return chunks
 
-# ─── Scrape & chunk ─────────────────────────────────────────────────────────—
-metadata = []
+# ─── Pooled, polite, conditional fetching ────────────────────────────────────
+def make_session(pool_size=FETCH_WORKERS):
+    """One keep-alive connection pool for every fetch, with retries on 429/5xx."""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET",), respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "MoreHouseKBScraper/1.0"
+    return session
+
+
+class HostLimiter:
+    """Caps concurrent requests per host and spaces out their start times."""
+
+    def __init__(self, limit=PER_HOST_LIMIT, delay=HOST_DELAY):
+        self.limit = limit
+        self.delay = delay
+        self._hosts = {}
+        self._lock = threading.Lock()
 
-for url in URLS:
-    print("Fetching:", url)
+    def _host(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = [threading.Semaphore(self.limit), threading.Lock(), 0.0]
+            return self._hosts[host]
+
+    def fetch(self, session, url, **kwargs):
+        state = self._host(urlparse(url).netloc)
+        with state[0]:
+            with state[1]:
+                wait = state[2] - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                state[2] = time.monotonic() + self.delay
+            return session.get(url, **kwargs)
+
+
+def load_cache(path=CACHE_FILE):
     try:
-        res = requests.get(url, timeout=10)
-        res.raise_for_status()
-    except Exception as e:
-        print("  ⚠️ fetch failed:", e)
-        continue
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    # Extract full text
-    if url.lower().endswith(".pdf"):
+
+def save_cache(cache, path=CACHE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def fetch_all(urls, cache=None, workers=FETCH_WORKERS):
+    """Fetch urls concurrently; return {url: response, or None if it failed}.
+
+    With a cache, requests carry If-None-Match / If-Modified-Since from the
+    previous run, so unchanged pages come back as cheap 304s.
+    """
+    session = make_session(workers)
+    limiter = HostLimiter()
+
+    def fetch(url):
+        headers = {}
+        entry = (cache or {}).get(url, {})
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
         try:
-            with open("temp.pdf", "wb") as f:
-                f.write(res.content)
-            text = ""
-            with pdfplumber.open("temp.pdf") as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() + "\n"
-        finally:
-            os.remove("temp.pdf")
-        full_text = text
+            res = limiter.fetch(session, url, headers=headers, timeout=10)
+            if res.status_code != 304:
+                res.raise_for_status()
+            return res
+        except Exception as e:
+            print(f"  ⚠️ fetch failed: {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        responses = dict(zip(urls, pool.map(fetch, urls)))
+    session.close()
+    return responses
+
+
+# ─── Text extraction ─────────────────────────────────────────────────────────
+def _extract_pdf_range(args):
+    content, start, end = args
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def extract_pdf_text(content, workers=PDF_WORKERS):
+    """Extract PDF text from an in-memory buffer, splitting pages across processes."""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        n_pages = len(pdf.pages)
+    workers = max(1, min(workers, n_pages // PDF_MIN_PAGES))
+    if workers == 1:
+        pages = _extract_pdf_range((content, 0, n_pages))
     else:
-        soup_full = BeautifulSoup(res.text, "html.parser")
-        tables = []
-        for table in soup_full.find_all("table"):
-            rows = []
-            for tr in table.find_all("tr"):
-                cols = [td.get_text(strip=True) for td in tr.find_all(["td","th"])]
-                if cols:
-                    rows.append(" | ".join(cols))
-            if rows:
-                tables.append("TABLE:\n" + "\n".join(rows))
-
-        doc = Document(res.text)
-        article_html = doc.summary()
-        article_text = BeautifulSoup(article_html, "html.parser").get_text(separator="\n").strip()
-        full_text = "\n\n".join(tables + [article_text])
-
-    # Chunking
-    chunks = text_to_chunks(full_text)
-    print(f"  → {len(chunks)} chunks")
-
-    for chunk in chunks:
-        metadata.append({"text": chunk, "url": url})
-
-# ─── Save metadata.pkl ─────────────────────────────────────────────────────────
-with open("metadata.pkl", "wb") as f:
-    pickle.dump(metadata, f)
-print(f"Saved metadata ({len(metadata)} chunks) to metadata.pkl")
+        step = -(-n_pages // workers)
+        ranges = [(content, start, min(start + step, n_pages)) for start in range(0, n_pages, step)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pages = [text for part in pool.map(_extract_pdf_range, ranges) for text in part]
+    return "".join(text + "\n" for text in pages)
+
+
+def extract_html_text(html):
+    soup_full = BeautifulSoup(html, "html.parser")
+    tables = []
+    for table in soup_full.find_all("table"):
+        rows = []
+        for tr in table.find_all("tr"):
+            cols = [td.get_text(strip=True) for td in tr.find_all(["td","th"])]
+            if cols:
+                rows.append(" | ".join(cols))
+        if rows:
+            tables.append("TABLE:\n" + "\n".join(rows))
+
+    doc = Document(html)
+    article_html = doc.summary()
+    article_text = BeautifulSoup(article_html, "html.parser").get_text(separator="\n").strip()
+    return "\n\n".join(tables + [article_text])
+
+
+def extract_text(url, res):
+    if url.lower().endswith(".pdf"):
+        return extract_pdf_text(res.content)
+    return extract_html_text(res.text)
+
+
+def kb_filename(url):
+    """kb_chunks file name for a URL, e.g. admissions/fees/ -> admissions_fees.txt."""
+    slug = urlparse(url).path.strip("/").replace("/", "_") or "home"
+    return slug + (".pdf" if url.lower().endswith(".pdf") else ".txt")
+
+
+# ─── Scrape → kb_chunks/ (incremental: only changed pages) ───────────────────
+# Only text files are written here; the build scripts turn kb_chunks/ into the
+# index (embeddings.npy, metadata.pkl, manifest) through kb_index.write_index.
+def scrape_incremental(force=False):
+    """Refresh kb_chunks/ from the site, rewriting only pages that changed (every page if force)."""
+    start = time.monotonic()
+    cache = load_cache()
+    # A page whose file has gone missing must be fetched in full, not as a 304
+    cache = {url: entry for url, entry in cache.items()
+             if os.path.exists(os.path.join(KB_FOLDER, entry.get("file", kb_filename(url))))}
+    responses = fetch_all(URLS, {} if force else cache)
+    changed, unchanged, failed = [], 0, 0
+
+    for url in URLS:
+        res = responses[url]
+        entry = cache.get(url, {})
+        if res is None:
+            failed += 1
+            continue
+        if res.status_code == 304:
+            unchanged += 1
+            continue
+        digest = hashlib.sha256(res.content).hexdigest()
+        path = os.path.join(KB_FOLDER, kb_filename(url))
+        if force or digest != entry.get("sha256") or not os.path.exists(path):
+            try:
+                text = extract_text(url, res)
+            except Exception as e:
+                print(f"  ⚠️ extract failed: {url}: {e}")
+                failed += 1
+                continue
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            changed.append(url)
+        else:
+            unchanged += 1
+        cache[url] = {
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+            "sha256": digest,
+            "file": kb_filename(url),
+        }
+
+    # Pages dropped from URLS: remove the files this scraper wrote for them
+    for url in [u for u in cache if u not in URLS]:
+        path = os.path.join(KB_FOLDER, cache.pop(url).get("file", kb_filename(url)))
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"  🗑️ removed {path}")
+
+    save_cache(cache)
+    for url in changed:
+        print(f"  ✏️ changed: {url}")
+    print(f"✅ {len(changed)} changed, {unchanged} unchanged, {failed} failed "
+          f"in {time.monotonic() - start:.1f}s")
+    return changed
+
+
+# Default: re-fetch and rewrite every page; --incremental: conditional
+# requests, rewriting only pages whose content changed
+if __name__ == "__main__":
+    scrape_incremental(force="--incremental" not in sys.argv[1:])
@@ -1,4 +1,3 @@
-cat > static/script.js << 'EOF'
 console.log("🚀 script.js loaded");
 document.addEventListener("DOMContentLoaded", () => {
   const toggle = document.getElementById("penai-toggle");
@@ -20,9 +19,34 @@ document.addEventListener("DOMContentLoaded", () => {
   });
   socket.on("response", (data) => {
       removeThinking();
-      const html = renderParagraphs(data.message.replace(/(https?:\/\/[^\s]+)/g, '<a href="$1" target="_blank">$1</a>'));
+      const html = renderParagraphs(data.message.replace(/(^|[^"'>])(https?:\/\/[^\s<]+)/g, '$1<a href="$2" target="_blank">$2</a>'));
       renderBot(html, "bot", false, detectCategory(data.message));
   });
+  // Streamed answers: grow one bubble per message id, then swap in the final HTML
+  const streams = {};
+  socket.on("response_delta", (data) => {
+      let stream = streams[data.id];
+      if (!stream) {
+          removeThinking();
+          const d = document.createElement("div");
+          d.className = "penai-message penai-bot";
+          d.innerHTML = `<strong><span class="penai-prefix">More House Chatbot:</span></strong> <span class="penai-stream"></span>`;
+          msgs.appendChild(d);
+          stream = streams[data.id] = { div: d, text: "" };
+      }
+      stream.text += data.delta;
+      stream.div.querySelector(".penai-stream").innerHTML = renderParagraphs(escapeHtml(stream.text));
+      msgs.scrollTop = msgs.scrollHeight;
+  });
+  socket.on("response_done", (data) => {
+      removeThinking();
+      const stream = streams[data.id];
+      if (stream) {
+          if (msgs.contains(stream.div)) msgs.removeChild(stream.div);
+          delete streams[data.id];
+      }
+      renderBot(renderParagraphs(data.message), "bot", false, detectCategory(data.message));
+  });
   let chatHistory = [];
   let welcomed = false;
   const usedQueries = new Set();
@@ -59,6 +83,9 @@ document.addEventListener("DOMContentLoaded", () => {
   function renderParagraphs(text) {
       return text.split(/\n{2,}/).map(p => `<p>${p.trim()}</p>`).join("");
   }
+  function escapeHtml(text) {
+      return text.replace(/[&<>"']/g, c => ({ "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c]));
+  }
   function detectCategory(text) {
       const t = text.toLowerCase();
       if (/(register|registration|admission|fee|prospectus)/.test(t)) return "admissions";
@@ -211,4 +238,3 @@ document.addEventListener("DOMContentLoaded", () => {
       }
   });
 });
-EOF
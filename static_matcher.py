@@ -0,0 +1,68 @@
+# --- Compiled fuzzy matcher for STATIC_QAS keys ---
+#
+# fuzz.ratio(a, b) is 2·M / (len(a) + len(b)) where M counts matched
+# characters, so M can never exceed the multiset overlap of the two strings'
+# characters. Keys are lower-cased once and stored as a (keys × alphabet)
+# character-count matrix — a dense inverted index on characters — so one
+# vectorized np.minimum gives that upper bound for every key at once. Only
+# keys whose bound clears the threshold are scored, best bound first, and
+# scoring stops as soon as no remaining key can beat the best score found.
+# The result is the same best match a full fuzz.ratio scan would return.
+import numpy as np
+from fuzzywuzzy import fuzz
+
+
+class StaticMatcher:
+    def __init__(self, keys, threshold=70):
+        self.threshold = threshold
+        self.keys = list(keys)
+        self._normalized = [k.lower() for k in self.keys]
+        self._exact = {}
+        for i, k in enumerate(self._normalized):
+            self._exact.setdefault(k, i)
+
+        alphabet = sorted(set("".join(self._normalized)))
+        self._char_ids = {c: i for i, c in enumerate(alphabet)}
+        self._counts = np.zeros((len(self.keys), len(alphabet)), dtype=np.int32)
+        for row, key in enumerate(self._normalized):
+            for c in key:
+                self._counts[row, self._char_ids[c]] += 1
+        self._lengths = np.array([len(k) for k in self._normalized], dtype=np.int32)
+
+    def _query_counts(self, text):
+        counts = np.zeros(self._counts.shape[1], dtype=np.int32)
+        for c in text:
+            i = self._char_ids.get(c)
+            if i is not None:
+                counts[i] += 1
+        return counts
+
+    def shortlist(self, text):
+        """Return (key ids, score upper bounds) that could clear the threshold."""
+        overlap = np.minimum(self._counts, self._query_counts(text)).sum(axis=1)
+        bounds = 200.0 * overlap / (self._lengths + len(text))
+        ids = np.flatnonzero(bounds > self.threshold)
+        # Highest bound first; ties keep table order
+        ids = ids[np.argsort(-bounds[ids], kind="stable")]
+        return ids, bounds[ids]
+
+    def match(self, question):
+        """Return (key, score) of the best key scoring above threshold, else (None, 0)."""
+        text = question.lower()
+        if not text or not self.keys:
+            return None, 0
+        exact = self._exact.get(text)
+        if exact is not None:
+            return self.keys[exact], 100
+
+        best_id, best_score = None, 0
+        ids, bounds = self.shortlist(text)
+        for i, bound in zip(ids.tolist(), bounds.tolist()):
+            if best_id is not None and round(bound) < best_score:
+                break
+            score = fuzz.ratio(text, self._normalized[i])
+            if score > self.threshold and (score > best_score or (score == best_score and i < best_id)):
+                best_id, best_score = i, score
+        if best_id is None:
+            return None, 0
+        return self.keys[best_id], best_score
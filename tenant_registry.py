@@ -0,0 +1,221 @@
+# --- Per-business knowledge bases for the multi-tenant service ---
+#
+# Each business in businesses.json has its own chunk directory (kb_dir) and
+# its own index (index_dir, default kb_indexes/<business_id>). A tenant is
+# loaded once into a KBSnapshot (memory-mapped matrix, metadata, retrieval
+# backend, BM25) and served from memory after that. The chunk directory and
+# manifest are re-stat'ed at most every poll interval; a tenant is rebuilt
+# (unchanged chunks reuse their stored embeddings) and reloaded only when
+# they changed. Loaded tenants are kept in LRU order and the least recently
+# used are dropped once their estimated footprint passes the memory budget;
+# requests already holding an evicted snapshot finish against it.
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from kb_index import write_index, read_manifest, BASE_DIR, MANIFEST_FILE
+from kb_reload import load_snapshot
+
+logger = logging.getLogger(__name__)
+
+EMB_MODEL     = "text-embedding-3-small"
+INDEX_ROOT    = os.getenv("TENANT_INDEX_ROOT", os.path.join(BASE_DIR, "kb_indexes"))
+CACHE_MB      = float(os.getenv("TENANT_CACHE_MB", "512"))
+POLL_INTERVAL = float(os.getenv("TENANT_POLL_INTERVAL", "30"))
+
+
+class UnknownTenant(KeyError):
+    pass
+
+
+def directory_stamp(directory):
+    """Names, sizes and mtimes of the chunk files; changes when any file does."""
+    try:
+        entries = sorted(
+            (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in os.scandir(directory)
+            if entry.is_file() and not entry.name.startswith(".")
+        )
+    except OSError:
+        return None
+    return repr(entries)
+
+
+def _manifest_stamp(index_dir):
+    try:
+        st = os.stat(os.path.join(index_dir, MANIFEST_FILE))
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def footprint(snapshot):
+    """Rough resident bytes: the matrix plus chunk text held by metadata and BM25."""
+    text_bytes = sum(len(m.get("text", "")) for m in snapshot.metadata)
+    return int(snapshot.embeddings.nbytes) + 3 * text_bytes
+
+
+def build_tenant_index(business_id, kb_dir, index_dir, source_stamp, model=EMB_MODEL):
+    """Chunk kb_dir, embed new chunks through the shared store and write the index."""
+    from generate_embeddings import load_and_chunk_text
+    from embedding_store import EmbeddingStore, format_report
+    from batch_embedder import embed_texts
+
+    chunks = load_and_chunk_text(kb_dir)
+    if not chunks:
+        raise ValueError(f"No chunks found in {kb_dir}")
+    store = EmbeddingStore()
+    try:
+        token_counts = {c["text"]: c["tokens"] for c in chunks}
+
+        def embed(texts):
+            return embed_texts(texts, model, token_counts=[token_counts[t] for t in texts],
+                               on_batch=store.checkpoint(model))
+
+        items = [(f"{c['source']}::c{c['chunk']}", c["text"]) for c in chunks]
+        vectors, report = store.sync(f"tenant:{business_id}", items, model, embed)
+    finally:
+        store.close()
+    logger.info(f"Tenant {business_id}: {format_report(report)}")
+
+    kept = [(v, c) for v, c in zip(vectors, chunks) if v is not None]
+    os.makedirs(index_dir, exist_ok=True)
+    write_index([v for v, _ in kept], [c for _, c in kept], model, out_dir=index_dir,
+                extra={"business_id": business_id, "source_stamp": source_stamp})
+
+
+class Tenant:
+    __slots__ = ("business_id", "kb_dir", "index_dir", "snapshot", "stamp", "checked_at", "bytes", "lock")
+
+    def __init__(self, business_id, kb_dir, index_dir):
+        self.business_id = business_id
+        self.kb_dir = kb_dir
+        self.index_dir = index_dir
+        self.snapshot = None
+        self.stamp = None
+        self.checked_at = 0.0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+
+class TenantRegistry:
+    def __init__(self, businesses, model=EMB_MODEL, max_bytes=CACHE_MB * (1 << 20),
+                 poll_interval=POLL_INTERVAL, index_root=INDEX_ROOT, builder=build_tenant_index):
+        self.model = model
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self.builder = builder
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()  # business_id -> Tenant, least recently used first
+        self._tenants = {}
+        for business_id, config in businesses.items():
+            kb_dir = os.path.join(BASE_DIR, config.get("kb_dir", os.path.join("kb_chunks", business_id)))
+            index_dir = os.path.join(BASE_DIR, config.get("index_dir", os.path.join(index_root, business_id)))
+            self._tenants[business_id] = Tenant(business_id, kb_dir, index_dir)
+
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, business_id):
+        """The tenant's current snapshot; read it once per request and keep using it."""
+        tenant = self._tenants.get(business_id)
+        if tenant is None:
+            raise UnknownTenant(business_id)
+
+        snapshot = tenant.snapshot
+        if snapshot is None or time.monotonic() - tenant.checked_at >= self.poll_interval:
+            snapshot = self._refresh(tenant)
+        with self._lock:
+            if business_id in self._loaded:
+                self._loaded.move_to_end(business_id)
+        return snapshot
+
+    def _stamp(self, tenant):
+        return (directory_stamp(tenant.kb_dir), _manifest_stamp(tenant.index_dir))
+
+    def _refresh(self, tenant):
+        """Load (building first if the chunks changed) unless nothing on disk moved."""
+        with tenant.lock:
+            if tenant.snapshot is not None and time.monotonic() - tenant.checked_at < self.poll_interval:
+                return tenant.snapshot
+            stamp = self._stamp(tenant)
+            tenant.checked_at = time.monotonic()
+            if tenant.snapshot is not None and stamp == tenant.stamp:
+                return tenant.snapshot
+
+            try:
+                if self._needs_build(tenant, stamp[0]):
+                    logger.info(f"Building index for tenant {tenant.business_id} from {tenant.kb_dir}")
+                    self.builder(tenant.business_id, tenant.kb_dir, tenant.index_dir, stamp[0], self.model)
+                    stamp = self._stamp(tenant)
+                snapshot = load_snapshot(tenant.index_dir, self.model)
+            except Exception as e:
+                if tenant.snapshot is None:
+                    raise
+                logger.error(f"Reloading tenant {tenant.business_id} failed, keeping current version: {e}")
+                return tenant.snapshot
+
+            tenant.snapshot = snapshot
+            tenant.stamp = stamp
+            tenant.bytes = footprint(snapshot)
+            self.loads += 1
+            logger.info(f"Tenant {tenant.business_id} loaded: {len(snapshot.kb)} chunks, "
+                        f"~{tenant.bytes / (1 << 20):.1f} MB")
+
+        with self._lock:
+            self._loaded[tenant.business_id] = tenant
+            self._loaded.move_to_end(tenant.business_id)
+            self._evict(keep=tenant.business_id)
+        return snapshot
+
+    def _needs_build(self, tenant, source_stamp):
+        try:
+            manifest = read_manifest(tenant.index_dir)
+        except (OSError, ValueError):
+            return True
+        return manifest.get("source_stamp") != source_stamp or manifest.get("model") != self.model
+
+    def _evict(self, keep):
+        total = sum(t.bytes for t in self._loaded.values())
+        for business_id in list(self._loaded):
+            if total <= self.max_bytes:
+                break
+            if business_id == keep:
+                continue
+            tenant = self._loaded.pop(business_id)
+            total -= tenant.bytes
+            tenant.snapshot = None
+            tenant.bytes = 0
+            self.evictions += 1
+            logger.info(f"Evicted tenant {business_id} from the cache")
+
+    def stats(self):
+        with self._lock:
+            loaded = {
+                business_id: {"chunks": len(t.snapshot.kb) if t.snapshot else 0, "bytes": t.bytes}
+                for business_id, t in self._loaded.items()
+            }
+        return {
+            "tenants": len(self._tenants),
+            "loaded": loaded,
+            "bytes": sum(t["bytes"] for t in loaded.values()),
+            "max_bytes": int(self.max_bytes),
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+
+# Build (or refresh) tenant indexes ahead of time: python tenant_registry.py [business_id ...]
+if __name__ == "__main__":
+    import sys
+    import json
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with open(os.path.join(BASE_DIR, "businesses.json"), encoding="utf-8") as f:
+        businesses = json.load(f)
+    registry = TenantRegistry(businesses, poll_interval=0)
+    for business_id in sys.argv[1:] or businesses:
+        snapshot = registry.get(business_id)
+        print(f"✅ {business_id}: {len(snapshot.kb)} chunks, index version {snapshot.version[:12]}")
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The app's modules live flat at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep metrics in memory; nothing here should write snapshot files
+os.environ.setdefault("METRICS_FLUSH_INTERVAL", "0")
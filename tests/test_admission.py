@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+import admission
+from admission import AdmissionGate, Overloaded, SessionRateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limiter_allows_a_burst_then_refills(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    limiter = SessionRateLimiter(rate_per_min=6, burst=3)
+    assert [limiter.allow("s") for _ in range(4)] == [True, True, True, False]
+    assert limiter.allow("other")  # buckets are per session
+    clock.now += 10                # one token every 10 s
+    assert limiter.allow("s")
+    assert not limiter.allow("s")
+
+
+def test_rate_limiter_forgets_idlest_sessions():
+    limiter = SessionRateLimiter(rate_per_min=1, burst=1, max_sessions=2)
+    assert limiter.allow("a") and limiter.allow("b") and limiter.allow("c")
+    assert list(limiter._buckets) == ["b", "c"]
+    assert limiter.allow("a")  # forgotten, so it starts with a full bucket again
+
+
+def test_zero_rate_disables_the_limit():
+    limiter = SessionRateLimiter(rate_per_min=0, burst=1)
+    assert all(limiter.allow("s") for _ in range(100))
+
+
+def test_gate_admits_up_to_limit_then_queues_then_sheds():
+    gate = AdmissionGate(limit=1, max_queue=1, timeout=5)
+    gate.acquire()
+    waiter_admitted = threading.Event()
+
+    def waiter():
+        with gate.slot():
+            waiter_admitted.set()
+
+    t = threading.Thread(target=waiter)
+    t.start()
+    deadline = time.monotonic() + 5
+    while gate.waiting < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert gate.stats()["waiting"] == 1
+
+    with pytest.raises(Overloaded) as shed:
+        gate.acquire()
+    assert shed.value.reason == "queue_full"
+
+    gate.release()
+    t.join(5)
+    assert waiter_admitted.is_set()
+    assert gate.stats() == {"active": 0, "waiting": 0, "limit": 1, "max_queue": 1}
+
+
+def test_gate_times_out_without_holding_a_slot():
+    gate = AdmissionGate(limit=1, max_queue=5, timeout=0.05)
+    with gate.slot():
+        with pytest.raises(Overloaded) as shed:
+            gate.acquire()
+    assert shed.value.reason == "timeout"
+    assert gate.active == 0 and gate.waiting == 0
+
+
+def test_slot_is_released_when_the_body_raises():
+    gate = AdmissionGate(limit=1, max_queue=0, timeout=0)
+    with pytest.raises(ValueError):
+        with gate.slot():
+            raise ValueError
+    with gate.slot():
+        assert gate.active == 1
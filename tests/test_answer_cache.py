@@ -0,0 +1,46 @@
+import numpy as np
+
+from answer_cache import SemanticAnswerCache
+
+
+def unit(*values):
+    v = np.array(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def test_near_vectors_hit_and_far_vectors_miss():
+    cache = SemanticAnswerCache(3, max_entries=4, max_distance=0.05)
+    cache.put(unit(1, 0, 0), "fees", 0)
+    assert cache.get(unit(1, 0.1, 0), 0) == "fees"
+    assert cache.get(unit(1, 1, 0), 0) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticAnswerCache(3, max_entries=2)
+    cache.put(unit(1, 0, 0), "a", 0)
+    cache.put(unit(0, 1, 0), "b", 0)
+    cache.get(unit(1, 0, 0), 0)
+    cache.put(unit(0, 0, 1), "c", 0)
+    assert cache.get(unit(0, 1, 0), 0) is None
+    assert cache.get(unit(1, 0, 0), 0) == "a"
+    assert cache.get(unit(0, 0, 1), 0) == "c"
+
+
+def test_newer_version_drops_entries():
+    cache = SemanticAnswerCache(3)
+    cache.put(unit(1, 0, 0), "old answer", 0)
+    assert cache.get(unit(1, 0, 0), 1) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_older_version_is_ignored_during_a_reload():
+    cache = SemanticAnswerCache(3)
+    cache.put(unit(1, 0, 0), "new answer", 2)
+    # Requests still on the previous snapshot interleave with new ones
+    for _ in range(3):
+        assert cache.get(unit(1, 0, 0), 1) is None
+        cache.put(unit(1, 0, 0), "stale answer", 1)
+        assert cache.get(unit(1, 0, 0), 2) == "new answer"
+    assert cache.stats()["invalidations"] == 0
+    assert cache.stats()["entries"] == 1
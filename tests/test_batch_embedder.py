@@ -0,0 +1,82 @@
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import BadRequestError, RateLimitError
+
+import batch_embedder
+from batch_embedder import MAX_INPUT_TOKENS, embed_texts, pack_batches
+
+
+def api_error(cls, status, headers=None):
+    response = httpx.Response(status, headers=headers or {}, request=httpx.Request("POST", "https://api.test"))
+    return cls("error", response=response, body=None)
+
+
+class FakeEmbeddings:
+    """embed_fn stand-in: vector [len(text)]; can fail per text or for the first calls."""
+
+    def __init__(self, bad=(), rate_limited_calls=0):
+        self.bad = set(bad)
+        self.rate_limited_calls = rate_limited_calls
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, input, model):
+        with self._lock:
+            self.calls.append(list(input))
+            if self.rate_limited_calls:
+                self.rate_limited_calls -= 1
+                raise api_error(RateLimitError, 429, {"retry-after": "0"})
+        if self.bad & set(input):
+            raise api_error(BadRequestError, 400)
+        data = [SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=data[::-1])
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(batch_embedder, "BACKOFF_BASE", 0.0)
+
+
+def test_pack_batches_respects_both_limits():
+    assert pack_batches([5, 5, 5, 5], max_tokens=10, max_inputs=10) == [[0, 1], [2, 3]]
+    assert pack_batches([1, 1, 1], max_tokens=100, max_inputs=2) == [[0, 1], [2]]
+    # A single input over the token budget still gets a batch of its own
+    assert pack_batches([50, 1], max_tokens=10, max_inputs=10) == [[0], [1]]
+    assert pack_batches([]) == []
+
+
+def test_vectors_come_back_in_input_order():
+    texts = [f"text {'x' * i}" for i in range(10)]
+    fake = FakeEmbeddings()
+    vectors = embed_texts(texts, "m", token_counts=[1] * 10, embed_fn=fake, max_inputs=3, concurrency=3)
+    assert vectors == [[float(len(t))] for t in texts]
+    assert sorted(len(call) for call in fake.calls) == [1, 3, 3, 3]
+
+
+def test_over_limit_texts_are_skipped():
+    vectors = embed_texts(["ok", "huge"], "m", token_counts=[1, MAX_INPUT_TOKENS + 1], embed_fn=FakeEmbeddings())
+    assert vectors == [[2.0], None]
+
+
+def test_bad_input_is_isolated_from_its_batch():
+    fake = FakeEmbeddings(bad={"bad"})
+    batches = []
+    vectors = embed_texts(["a", "bad", "ccc"], "m", token_counts=[1, 1, 1], embed_fn=fake,
+                          on_batch=lambda texts, vecs: batches.append(list(texts)))
+    assert vectors == [[1.0], None, [3.0]]
+    assert sorted(batches) == [["a"], ["ccc"]]
+
+
+def test_rate_limits_are_retried():
+    fake = FakeEmbeddings(rate_limited_calls=2)
+    assert embed_texts(["a", "bb"], "m", token_counts=[1, 1], embed_fn=fake) == [[1.0], [2.0]]
+    assert len(fake.calls) == 3
+
+
+def test_retries_that_run_out_re_raise(monkeypatch):
+    monkeypatch.setattr(batch_embedder, "MAX_RETRIES", 1)
+    with pytest.raises(RateLimitError):
+        embed_texts(["a"], "m", token_counts=[1], embed_fn=FakeEmbeddings(rate_limited_calls=5))
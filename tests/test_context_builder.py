@@ -0,0 +1,52 @@
+from context_builder import SEPARATOR, SEPARATOR_TOKENS, build_context, select_chunks, shingles
+
+
+def chunk(text, tokens):
+    return {"text": text, "tokens": tokens}
+
+
+METADATA = [
+    chunk("Fees for the sixth form are reviewed every year by the governors.", 100),
+    chunk("The school day starts at 8.15am and ends at 3.45pm for all year groups.", 100),
+    chunk("Fees for the sixth form are reviewed every year by the governors today.", 100),
+    chunk("Our netball and hockey teams play fixtures against other London schools.", 600),
+    chunk("Bursaries are means-tested and can cover up to the full fees.", 100),
+    chunk("", 0),
+]
+
+
+def test_chunks_come_back_in_index_order_within_budget():
+    ids, used = select_chunks(METADATA, [4, 1, 3], budget=1000)
+    assert ids == [1, 3, 4]
+    assert used == 100 + 100 + 600 + 3 * SEPARATOR_TOKENS
+
+
+def test_chunks_over_the_remaining_budget_are_skipped():
+    ids, _ = select_chunks(METADATA, [1, 3, 4], budget=250)
+    assert ids == [1, 4]
+
+
+def test_best_chunk_is_kept_even_over_budget():
+    ids, _ = select_chunks(METADATA, [3, 1], budget=50)
+    assert ids == [3]
+
+
+def test_near_duplicates_and_empty_chunks_are_dropped():
+    ids, _ = select_chunks(METADATA, [0, 2, 5, 4], budget=1000)
+    assert ids == [0, 4]
+
+
+def test_max_chunks_and_stable_prompt_for_the_same_set():
+    assert select_chunks(METADATA, [4, 1, 0], budget=1000, max_chunks=2)[0] == [1, 4]
+    assert select_chunks(METADATA, [1, 4], budget=1000)[0] == select_chunks(METADATA, [4, 1], budget=1000)[0]
+
+
+def test_missing_token_counts_are_counted():
+    ids, used = select_chunks([{"text": "short chunk without a stored count"}], [0], budget=1000)
+    assert ids == [0] and used > SEPARATOR_TOKENS
+
+
+def test_shingles_and_context():
+    assert shingles("One two") == {("one", "two")}
+    assert len(shingles("a b c d e f")) == 2
+    assert build_context([{"text": "a"}, {"text": "b"}]) == "a" + SEPARATOR + "b"
@@ -0,0 +1,81 @@
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from embed_batcher import EmbeddingDispatcher
+
+
+class FakeEmbeddings:
+    """embed_fn stand-in: each text's vector is [len(text), 1], rows returned shuffled."""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, input, model):
+        self.calls.append(list(input))
+        if self.fail:
+            raise RuntimeError("upstream down")
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), 1.0]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=data[::-1])
+
+
+def submit_all(dispatcher, texts):
+    results, errors = [None] * len(texts), [None] * len(texts)
+
+    def run(i, text):
+        try:
+            results[i] = dispatcher.submit(text)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i, t)) for i, t in enumerate(texts)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results, errors
+
+
+def expected_row(text):
+    row = np.array([len(text), 1.0], dtype=np.float32)
+    return row / np.linalg.norm(row)
+
+
+def test_concurrent_questions_share_one_request():
+    fake = FakeEmbeddings()
+    dispatcher = EmbeddingDispatcher(fake, "m", window_ms=200, max_batch=64)
+    texts = ["a", "bb", "ccc", "bb"]
+    results, errors = submit_all(dispatcher, texts)
+    assert errors == [None] * 4
+    assert len(fake.calls) == 1
+    assert sorted(fake.calls[0]) == ["a", "bb", "ccc"]  # duplicates share a slot
+    for text, row in zip(texts, results):
+        assert np.allclose(row, expected_row(text))
+
+
+def test_max_batch_splits_requests():
+    fake = FakeEmbeddings()
+    dispatcher = EmbeddingDispatcher(fake, "m", window_ms=200, max_batch=2)
+    results, errors = submit_all(dispatcher, ["a", "bb", "ccc", "dddd", "eeeee"])
+    assert errors == [None] * 5
+    assert all(len(call) <= 2 for call in fake.calls)
+    assert sum(len(call) for call in fake.calls) == 5
+    assert dispatcher.stats()["batched_questions"] == 5
+
+
+def test_postprocess_sees_the_batch_matrix():
+    dispatcher = EmbeddingDispatcher(FakeEmbeddings(), "m", window_ms=1,
+                                     postprocess=lambda matrix: [("row", r.shape) for r in matrix])
+    assert dispatcher.submit("a") == ("row", (2,))
+
+
+def test_errors_reach_every_waiter():
+    dispatcher = EmbeddingDispatcher(FakeEmbeddings(fail=True), "m", window_ms=50)
+    results, errors = submit_all(dispatcher, ["a", "bb"])
+    assert results == [None, None]
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    with pytest.raises(RuntimeError):
+        dispatcher.submit("ccc")
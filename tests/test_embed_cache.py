@@ -0,0 +1,79 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+import embed_cache
+from embed_cache import EmbeddingCache, normalize_question
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(embed_cache.time, "time", clock)
+    return clock
+
+
+def rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [q for (q,) in conn.execute("SELECT question FROM query_embeddings ORDER BY created_at")]
+    finally:
+        conn.close()
+
+
+def test_normalized_questions_share_a_vector(db_path):
+    assert normalize_question("  What are the  FEES?? ") == "what are the fees"
+    cache = EmbeddingCache(db_path, "m")
+    cache.put("What are the fees?", [1.0, 0.0])
+    assert np.array_equal(cache.get("what are the fees"), [1.0, 0.0])
+    assert cache.stats()["hits_memory"] == 1
+
+
+def test_disk_tier_is_shared_and_keyed_by_model(db_path):
+    EmbeddingCache(db_path, "m").put("open day", [0.0, 1.0])
+    other = EmbeddingCache(db_path, "m")
+    assert np.array_equal(other.get("Open day"), [0.0, 1.0])
+    assert other.stats()["hits_disk"] == 1
+    assert EmbeddingCache(db_path, "other-model").get("open day") is None
+
+
+def test_expired_disk_rows_are_misses(db_path, clock):
+    EmbeddingCache(db_path, "m", ttl_seconds=60).put("open day", [0.0, 1.0])
+    clock.now += 61
+    cache = EmbeddingCache(db_path, "m", ttl_seconds=60)
+    assert cache.get("open day") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_prune_drops_expired_then_oldest_rows(db_path, clock):
+    cache = EmbeddingCache(db_path, "m", max_rows=3, ttl_seconds=100, prune_every=5)
+    cache.put("stale", [1.0])
+    clock.now += 200
+    for i in range(4):
+        clock.now += 1
+        cache.put(f"q{i}", [float(i)])
+    # The fifth put prunes: "stale" has expired and only the newest 3 are kept
+    assert rows(db_path) == ["q1", "q2", "q3"]
+
+
+def test_memory_tier_is_bounded_lru(db_path):
+    cache = EmbeddingCache(db_path, "m", memory_size=2)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")
+    cache.put("c", [3.0])
+    assert list(cache._memory) == ["a", "c"]
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import embedding_store
+from embedding_store import EmbeddingStore, content_key
+
+MODEL = "m"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store.db"))
+    yield store
+    store.close()
+
+
+class Embedder:
+    """Vectors from text length; texts in fail come back as None."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [None if t in self.fail else np.full(3, len(t), dtype=np.float32) for t in texts]
+
+
+def stored_keys(store):
+    return {key for (key,) in store.conn.execute("SELECT key FROM vectors")}
+
+
+def test_only_new_or_changed_texts_are_embedded(store):
+    embed = Embedder()
+    _, report = store.sync("ns", [("a", "alpha"), ("b", "beta")], MODEL, embed)
+    assert report["embedded"] == 2 and sorted(report["changed_ids"]) == ["a", "b"]
+
+    vectors, report = store.sync("ns", [("a", "alpha"), ("b", "beta two"), ("c", "alpha")], MODEL, embed)
+    assert embed.calls[-1] == ["beta two"]
+    assert report["reused"] == 2
+    assert sorted(report["changed_ids"]) == ["b", "c"]
+    assert report["vanished_ids"] == []
+    assert np.array_equal(vectors[2], np.full(3, 5.0))
+
+    _, report = store.sync("ns", [("a", "alpha")], MODEL, embed)
+    assert sorted(report["vanished_ids"]) == ["b", "c"]
+    assert report["deleted_vectors"] == 1  # "beta two"; "alpha" is still referenced
+
+
+def test_failed_change_keeps_the_previous_key(store):
+    store.sync("ns", [("a", "alpha"), ("b", "beta")], MODEL, Embedder())
+    vectors, report = store.sync("ns", [("a", "alpha v2"), ("b", "beta"), ("n", "new")], MODEL,
+                                 Embedder(fail={"alpha v2", "new"}))
+    assert vectors[0] is None and vectors[2] is None
+    assert report["failed"] == 2
+    assert report["changed_ids"] == [] and report["vanished_ids"] == []
+    assert report["members"] == {"a": content_key("alpha", MODEL), "b": content_key("beta", MODEL)}
+    assert content_key("alpha", MODEL) in stored_keys(store)
+
+
+def test_deferred_commit_leaves_membership_until_committed(store):
+    store.sync("ns", [("a", "alpha")], MODEL, Embedder())
+    _, report = store.sync("ns", [("a", "alpha v2")], MODEL, Embedder(), commit=False)
+    # An uncommitted (e.g. failed) push is reported as changed again next time
+    _, again = store.sync("ns", [("a", "alpha v2")], MODEL, Embedder(), commit=False)
+    assert report["changed_ids"] == again["changed_ids"] == ["a"]
+
+    store.commit_members("ns", again)
+    _, after = store.sync("ns", [("a", "alpha v2")], MODEL, Embedder())
+    assert after["changed_ids"] == []
+    assert content_key("alpha", MODEL) not in stored_keys(store)
+
+
+def test_other_namespaces_and_fresh_checkpoints_survive_gc(store):
+    store.sync("one", [("a", "shared"), ("b", "only one")], MODEL, Embedder())
+    store.sync("two", [("x", "shared")], MODEL, Embedder())
+    store.checkpoint(MODEL)(["interrupted build"], [np.ones(3)])
+
+    _, report = store.sync("one", [], MODEL, Embedder())
+    keys = stored_keys(store)
+    assert report["deleted_vectors"] == 1
+    assert content_key("shared", MODEL) in keys
+    assert content_key("interrupted build", MODEL) in keys
+    assert content_key("only one", MODEL) not in keys
+
+
+def test_unclaimed_checkpoints_expire(store, monkeypatch):
+    store.checkpoint(MODEL)(["interrupted build"], [np.ones(3)])
+    monkeypatch.setattr(embedding_store, "ORPHAN_MAX_DAYS", 0)
+    store.sync("ns", [], MODEL, Embedder())
+    assert stored_keys(store) == set()
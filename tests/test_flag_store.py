@@ -0,0 +1,127 @@
+import sqlite3
+
+import pytest
+
+from flag_store import FlagStore, SCHEMA_VERSION
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "flags.db")
+
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM flagged_questions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def insert(path, rows):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO flagged_questions (session_id, question, timestamp) VALUES (?, ?, ?)", rows)
+    conn.close()
+
+
+def test_add_is_committed_by_the_writer(db_path):
+    store = FlagStore(db_path, flush_interval=0.01)
+    store.init_schema()
+    store.add("a", "queued", "2025-01-01T09:00:00")
+    # Writes are applied in order, so a waited-on write implies the add landed
+    store.set_session_status("nobody", "dismissed")
+    page, _ = store.list_flags()
+    assert [r["question"] for r in page] == ["queued"]
+
+
+def test_burst_of_adds_is_written_in_batches(db_path):
+    store = FlagStore(db_path, batch_size=10, flush_interval=0.01)
+    store.init_schema()
+    for i in range(95):
+        store.add(f"s{i}", f"q{i}", f"2025-01-01T09:00:{i:02d}")
+    store.set_session_status("nobody", "dismissed")
+    assert count_rows(db_path) == 95
+    assert store.pending() == 0
+
+
+def test_waited_write_raises_the_batch_error(db_path):
+    store = FlagStore(db_path, flush_interval=0.01)
+    # No schema: the UPDATE fails in the writer and is reported to the caller
+    with pytest.raises(sqlite3.OperationalError):
+        store.set_status(1, "answered")
+
+
+def test_rejects_unknown_status(db_path):
+    store = FlagStore(db_path)
+    with pytest.raises(ValueError):
+        store.set_status(1, "closed")
+
+
+def test_migrates_v0_table(db_path):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("CREATE TABLE flagged_questions (session_id TEXT, question TEXT, timestamp TEXT)")
+        conn.executemany("INSERT INTO flagged_questions VALUES (?, ?, ?)", [
+            ("b", "second", "2025-01-02T09:00:00"),
+            ("a", "first", "2025-01-01T09:00:00"),
+            (None, "no session", "2025-01-03T09:00:00"),
+        ])
+    conn.close()
+
+    store = FlagStore(db_path)
+    store.init_schema()
+    store.init_schema()  # idempotent once migrated
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    rows = conn.execute("SELECT id, session_id, question, status FROM flagged_questions ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [
+        (1, "a", "first", "open"),
+        (2, "b", "second", "open"),
+        (3, "", "no session", "open"),
+    ]
+
+def test_paging_walks_every_row_newest_first(db_path):
+    store = FlagStore(db_path)
+    store.init_schema()
+    # Several rows share a timestamp, so the id breaks ties across pages
+    rows = [(f"s{i}", f"q{i}", f"2025-01-{1 + i // 3:02d}T09:00:00") for i in range(20)]
+    insert(db_path, rows)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.list_flags(cursor=cursor, limit=7)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert [r["question"] for r in seen] == [f"q{i}" for i in reversed(range(20))]
+
+
+def test_filters_and_status_updates(db_path):
+    store = FlagStore(db_path)
+    store.init_schema()
+    insert(db_path, [
+        ("a", "q1", "2025-01-01T09:00:00"),
+        ("a", "q2", "2025-01-02T09:00:00"),
+        ("b", "q3", "2025-01-03T09:00:00"),
+    ])
+
+    page, _ = store.list_flags(since="2025-01-02", until="2025-01-02")
+    assert [r["question"] for r in page] == ["q2"]
+
+    store.set_session_status("a", "answered", "Replied by email")
+    open_rows, _ = store.list_flags(status="open")
+    answered, _ = store.list_flags(status="answered")
+    assert [r["question"] for r in open_rows] == ["q3"]
+    assert [(r["question"], r["human_response"]) for r in answered] == [
+        ("q2", "Replied by email"), ("q1", "Replied by email")]
+
+
+def test_cursor_round_trip_and_malformed_cursor():
+    from flag_store import encode_cursor, decode_cursor
+    assert decode_cursor(encode_cursor("2025-01-01T09:00:00+00:00", 42)) == ("2025-01-01T09:00:00+00:00", 42)
+    assert decode_cursor("garbage") is None
+    assert decode_cursor(None) is None
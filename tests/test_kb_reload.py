@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+
+from kb_index import IndexFormatError, MANIFEST_FILE, METADATA_FILE, VECTORS_FILE, write_index
+from kb_reload import KBHolder
+
+MODEL = "test-model"
+
+
+def write(directory, rows, dim=8, seed=0, model=MODEL):
+    vectors = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    write_index(vectors, [{"text": f"chunk {i}"} for i in range(rows)], model, out_dir=str(directory))
+
+
+@pytest.fixture
+def holder(tmp_path):
+    write(tmp_path, 5)
+    return KBHolder(str(tmp_path), MODEL, poll_interval=0)
+
+
+def test_reload_swaps_in_a_new_version(holder, tmp_path):
+    old = holder.current
+    write(tmp_path, 7, seed=1)
+    assert holder.reload() is True
+    new = holder.current
+    assert len(new.kb) == 7 and new.version != old.version
+    assert new.generation == old.generation + 1
+    # A request that took the old snapshot keeps a consistent view
+    assert len(old.kb) == 5 and len(old.metadata) == 5
+    assert holder.stats()["reloads"] == 1
+
+
+def test_unchanged_index_is_not_swapped(holder):
+    old = holder.current
+    assert holder.reload() is False
+    assert holder.current is old
+
+
+@pytest.mark.parametrize("breakage", ["dim", "model", "checksum", "missing"])
+def test_bad_index_keeps_the_current_snapshot(holder, tmp_path, breakage):
+    old = holder.current
+    if breakage == "dim":
+        write(tmp_path, 5, dim=4, seed=1)
+    elif breakage == "model":
+        write(tmp_path, 5, seed=1, model="other-model")
+    elif breakage == "checksum":
+        write(tmp_path, 5, seed=1)
+        with open(tmp_path / METADATA_FILE, "ab") as f:
+            f.write(b"corrupt")
+    else:
+        os.remove(tmp_path / MANIFEST_FILE)
+        os.remove(tmp_path / VECTORS_FILE)
+    with pytest.raises((IndexFormatError, OSError)):
+        holder.reload()
+    assert holder.current is old
+    assert holder.stats()["failed_reloads"] == 1
+    assert holder.stats()["last_error"]
@@ -0,0 +1,25 @@
+from keyword_engine import KeywordEngine
+
+
+def make_engine():
+    engine = KeywordEngine()
+    engine.add("abuse", "sensitive", whole_word=False)
+    engine.add("school bus", "topic")
+    engine.add("bus", "topic")
+    return engine
+
+
+def test_rebuild_gives_same_matches():
+    engine = make_engine()
+    text = "Is the school bus safe from abuse?"
+    first = engine.build().scan(text)
+    assert [m.pattern for m in first] == ["school bus", "bus", "abuse"]
+    assert engine.build().scan(text) == first
+    assert engine.build().build().scan(text) == first
+
+
+def test_add_after_build_does_not_duplicate():
+    engine = make_engine().build()
+    engine.add("safe", "topic")
+    matches = engine.scan("school bus safe")
+    assert [m.pattern for m in matches] == ["school bus", "bus", "safe"]
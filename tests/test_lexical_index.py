@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+
+from lexical_index import BM25Index, fuse_hybrid, reciprocal_rank_fusion, tokenize
+
+DOCS = [
+    "Our EHCP support is led by the SENCo, who meets every family.",
+    "Fees for the sixth form are set each year; see the fees page.",
+    "The 11+ entrance exam is sat in January. Entrance exam results follow in February.",
+    "Sport at More House includes netball, hockey and swimming.",
+    "",
+]
+
+
+def naive_bm25(texts, query, k1=1.2, b=0.75):
+    """Textbook BM25 over the same tokenizer, one document at a time."""
+    docs = [tokenize(t) for t in texts]
+    avg = max(sum(map(len, docs)) / len(docs), 1.0)
+    terms = set(tokenize(query))
+    scores = []
+    for doc in docs:
+        score = 0.0
+        for term in terms:
+            tf = doc.count(term)
+            if not tf:
+                continue
+            df = sum(term in d for d in docs)
+            idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg))
+        scores.append(score)
+    return np.array(scores)
+
+
+def test_scores_match_textbook_bm25():
+    index = BM25Index(DOCS)
+    for query in ("EHCP", "entrance exam", "sixth form fees", "11+ exam results", "unknown words", "fees fees"):
+        scores, _ = index.scores(query)
+        assert np.allclose(scores, naive_bm25(DOCS, query), atol=1e-5), query
+
+
+def test_tokenize_keeps_exam_names_and_drops_stopwords():
+    assert tokenize("What is the 11+ exam?") == ["11+", "exam"]
+
+
+def test_search_returns_only_matching_documents():
+    ids, scores = BM25Index(DOCS).search("entrance exam", 5)
+    assert ids.tolist() == [2]
+    assert scores[0] > 0
+    assert BM25Index(DOCS).search("", 5)[0].size == 0
+
+
+def test_is_decisive():
+    index = BM25Index(DOCS)
+    decide = lambda q, min_score=0.5, margin=1.5, max_terms=3: index.is_decisive(
+        q, *index.search(q, 5), min_score, margin, max_terms)
+    assert decide("EHCP")
+    assert not decide("EHCP", min_score=100)                  # too weak
+    assert not decide("EHCP hockey")                          # top hit lacks a term
+    assert not decide("EHCP zebra")                           # unknown term
+    assert not decide("EHCP support SENCo family", max_terms=3)
+
+
+def test_is_decisive_needs_a_clear_margin():
+    index = BM25Index(["netball club", "netball team"])
+    assert not index.is_decisive("netball", *index.search("netball", 5), 0.0, 1.5, 3)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    assert reciprocal_rank_fusion([[1, 2, 3], [3, 1]]) == [1, 3, 2]
+
+
+def test_fuse_hybrid_keeps_ids_clearing_either_bar():
+    dense = (np.array([0, 1, 2]), np.array([0.8, 0.5, 0.4]))
+    lexical = (np.array([2, 3]), np.array([6.0, 1.0]))
+    fused, relevant = fuse_hybrid(dense, lexical, min_similarity=0.6, lexical_min_score=4.0)
+    assert sorted(fused) == [0, 1, 2, 3]
+    assert fused[0] == 2
+    assert relevant == [2, 0]
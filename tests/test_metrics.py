@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# metrics is imported before monkey-patching, as gunicorn's master does, and
+# the first observations in the (green) worker race to start the flusher
+FIRST_OBSERVATIONS = textwrap.dedent("""
+    import metrics
+    import eventlet
+    eventlet.monkey_patch()
+
+    pool = eventlet.GreenPool()
+    for i in range(5):
+        pool.spawn(metrics.observe, "chat_stage_seconds", 0.01 * i, stage="test")
+    pool.waitall()
+    metrics.inc("openai_requests_total", endpoint="test")
+    histograms, counters, _, _ = metrics.registry.collect()
+    print(sum(h[-1] for h in histograms.values()), sum(counters.values()))
+""")
+
+
+def test_concurrent_first_observations_under_eventlet(tmp_path):
+    env = dict(os.environ, METRICS_DIR=str(tmp_path), METRICS_FLUSH_INTERVAL="5", PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", FIRST_OBSERVATIONS], env=env, cwd=ROOT,
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["5", "1"]
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from retrieval import ExactBackend, FaissBackend, parity_report, top_k
+
+
+def random_unit_rows(n, dim, seed=0):
+    rows = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def clustered_unit_rows(n, dim, clusters=40, seed=0):
+    """Rows around a few topics, like chunk embeddings; ANN indexes rely on that structure."""
+    rng = np.random.default_rng(seed)
+    centres = random_unit_rows(clusters, dim, seed=seed + 100)
+    rows = centres[rng.integers(0, clusters, size=n)] + rng.normal(scale=0.15, size=(n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def brute_force(embeddings, query, k):
+    return np.argsort(-(embeddings @ query), kind="stable")[:k]
+
+
+def test_top_k_matches_full_sort():
+    scores = np.random.default_rng(1).normal(size=200).astype(np.float32)
+    for k in (0, 1, 5, 200, 500):
+        ids, values = top_k(scores, k)
+        assert ids.tolist() == np.argsort(-scores)[:k].tolist()
+        assert np.array_equal(values, scores[ids])
+
+
+def test_exact_backend_matches_brute_force():
+    embeddings = random_unit_rows(500, 32)
+    queries = random_unit_rows(20, 32, seed=1)
+    backend = ExactBackend(embeddings)
+    ids, _ = backend.search_batch(queries, 5)
+    for q, batch_ids in zip(queries, ids):
+        expected = brute_force(embeddings, q, 5).tolist()
+        assert backend.search(q, 5)[0].tolist() == expected
+        assert batch_ids.tolist() == expected
+
+
+def test_faiss_flat_matches_exact():
+    pytest.importorskip("faiss")
+    embeddings = random_unit_rows(500, 32)
+    backend = FaissBackend(embeddings, "faiss-flat")
+    for q in random_unit_rows(20, 32, seed=2):
+        assert set(backend.search(q, 5)[0].tolist()) == set(brute_force(embeddings, q, 5).tolist())
+
+
+@pytest.mark.parametrize("kind", ["faiss-ivf", "faiss-hnsw"])
+def test_approximate_backends_recall(kind):
+    pytest.importorskip("faiss")
+    embeddings = clustered_unit_rows(2000, 32)
+    report = parity_report(embeddings, [kind], k=5, n_queries=100)
+    assert report[0]["recall_at_k"] >= 0.9
+
+
+def test_prebuilt_faiss_index_only_trusted_for_its_vectors(tmp_path):
+    pytest.importorskip("faiss")
+    from kb_index import load_index, write_index
+    from retrieval import make_backend, prebuilt_index_path, write_faiss_index
+
+    embeddings = random_unit_rows(50, 16)
+    write_index(embeddings, [{"text": str(i)} for i in range(50)], "test-model", out_dir=str(tmp_path))
+    kb = load_index(str(tmp_path))
+    write_faiss_index(kb, "faiss-flat", str(tmp_path))
+    assert prebuilt_index_path(kb, "faiss-flat", str(tmp_path)) is not None
+    assert prebuilt_index_path(kb, "faiss-hnsw", str(tmp_path)) is None
+    assert make_backend(kb, "faiss-flat", str(tmp_path)).index.ntotal == 50
+
+    # A rebuilt index no longer matches the saved FAISS file
+    write_index(random_unit_rows(50, 16, seed=3), kb.metadata, "test-model", out_dir=str(tmp_path))
+    assert prebuilt_index_path(load_index(str(tmp_path)), "faiss-flat", str(tmp_path)) is None
@@ -0,0 +1,38 @@
+from fuzzywuzzy import fuzz
+
+from static_matcher import StaticMatcher
+from static_qas import STATIC_QAS
+
+THRESHOLD = 70
+
+
+def scan(keys, question, threshold=THRESHOLD):
+    """The original matcher: fuzz.ratio against every key, first best wins."""
+    best_key, best_score = None, 0
+    for key in keys:
+        score = fuzz.ratio(question.lower(), key.lower())
+        if score > threshold and score > best_score:
+            best_key, best_score = key, score
+    return best_key, best_score
+
+
+def questions():
+    keys = list(STATIC_QAS)
+    yield from keys
+    yield from (k.upper() for k in keys)
+    yield from (k[:-1] for k in keys if len(k) > 3)
+    yield from (k[1:] + "s" for k in keys)
+    yield from (k.replace("e", "a", 1) for k in keys)
+    yield from ("", "what time does school start", "fees please", "is there a bus", "xyz")
+
+
+def test_matches_full_scan_on_static_keys():
+    matcher = StaticMatcher(STATIC_QAS, threshold=THRESHOLD)
+    for question in questions():
+        assert matcher.match(question) == scan(STATIC_QAS, question), question
+
+
+def test_ties_keep_table_order():
+    keys = ["abcd", "abce", "abcf"]
+    matcher = StaticMatcher(keys, threshold=50)
+    assert matcher.match("abcx") == scan(keys, "abcx", threshold=50) == ("abcd", 75)
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pytest
+
+from kb_index import write_index
+from tenant_registry import TenantRegistry, UnknownTenant, footprint
+
+MODEL = "test-model"
+
+
+class FakeBuilder:
+    """One row per chunk file, so tests can see what was (re)built."""
+
+    def __init__(self):
+        self.builds = []
+        self.fail = False
+
+    def __call__(self, business_id, kb_dir, index_dir, source_stamp, model):
+        self.builds.append(business_id)
+        if self.fail:
+            raise RuntimeError("embedding API down")
+        names = sorted(os.listdir(kb_dir))
+        rng = np.random.default_rng(len(self.builds))
+        os.makedirs(index_dir, exist_ok=True)
+        write_index(rng.normal(size=(len(names), 8)).astype(np.float32),
+                    [{"text": open(os.path.join(kb_dir, n)).read(), "source": n} for n in names],
+                    model, out_dir=index_dir, extra={"source_stamp": source_stamp})
+
+
+@pytest.fixture
+def setup(tmp_path):
+    businesses = {}
+    for business_id in ("alpha", "beta", "gamma"):
+        kb_dir = tmp_path / "kb" / business_id
+        kb_dir.mkdir(parents=True)
+        (kb_dir / "about.txt").write_text(f"{business_id} " * 200)
+        businesses[business_id] = {"kb_dir": str(kb_dir)}
+    builder = FakeBuilder()
+
+    def make(**kwargs):
+        kwargs.setdefault("poll_interval", 0)
+        return TenantRegistry(businesses, model=MODEL, index_root=str(tmp_path / "indexes"),
+                              builder=builder, **kwargs)
+    return make, builder, tmp_path
+
+
+def test_builds_once_and_serves_from_memory(setup):
+    make, builder, _ = setup
+    registry = make()
+    first = registry.get("alpha")
+    assert registry.get("alpha") is first
+    assert builder.builds == ["alpha"]
+    # A fresh registry (new process) reuses the index already on disk
+    make().get("alpha")
+    assert builder.builds == ["alpha"]
+
+
+def test_changed_chunks_are_rebuilt_and_reloaded(setup):
+    make, builder, tmp_path = setup
+    registry = make()
+    old = registry.get("alpha")
+    (tmp_path / "kb" / "alpha" / "fees.txt").write_text("fees")
+    new = registry.get("alpha")
+    assert builder.builds == ["alpha", "alpha"]
+    assert len(old.kb) == 1 and len(new.kb) == 2
+
+
+def test_failed_rebuild_keeps_serving_the_loaded_version(setup):
+    make, builder, tmp_path = setup
+    registry = make()
+    old = registry.get("alpha")
+    builder.fail = True
+    (tmp_path / "kb" / "alpha" / "fees.txt").write_text("fees")
+    assert registry.get("alpha") is old
+    with pytest.raises(RuntimeError):
+        registry.get("beta")
+
+
+def test_least_recently_used_tenants_are_evicted(setup):
+    make, _, _ = setup
+    registry = make(max_bytes=1)  # room for one tenant at a time
+    registry.get("alpha")
+    registry.get("beta")
+    assert list(registry.stats()["loaded"]) == ["beta"]
+    registry.get("gamma")
+    assert list(registry.stats()["loaded"]) == ["gamma"]
+    assert registry.stats()["evictions"] == 2
+
+
+def test_recently_used_tenant_survives_eviction(setup):
+    make, _, _ = setup
+    # Room for two tenants (alpha and gamma are the largest, at the same size)
+    registry = make(max_bytes=2 * footprint(make().get("alpha")))
+    registry.get("alpha")
+    registry.get("beta")
+    registry.get("alpha")
+    registry.get("gamma")
+    assert sorted(registry.stats()["loaded"]) == ["alpha", "gamma"]
+
+
+def test_unknown_tenant(setup):
+    make, _, _ = setup
+    with pytest.raises(UnknownTenant):
+        make().get("nobody")